@@ -10,7 +10,8 @@ db = SQLAlchemy()
 
 def create_app():
     app = Flask(__name__)
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///afcs.db"
+    from utils.storage import sqlite_storage_config, configure_sqlite_engines
+    app.config.update(sqlite_storage_config("sqlite:///afcs.db"))
     app.config['SQLALCHEMY_ECHO'] = False
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SWAGGER'] = {
@@ -18,10 +19,12 @@ def create_app():
         'uiversion': 3
     }
     db.init_app(app)
+    configure_sqlite_engines(app)
     Migrate(app, db)
     Swagger(app)
     
     from routes import bp as main_bp
+    from utils.telemetry_frame import decode_telemetry_frame, decode_telemetry_batch
     app.register_blueprint(main_bp)
     
     MQTT_BROKER = 'localhost'
@@ -33,19 +36,41 @@ def create_app():
         client.subscribe(MQTT_TELEMETRY_TOPIC)
         client.subscribe(MQTT_MISSION_TOPIC)
         
+    # сообщения только разбираются в потоке paho, обработка выполняется пулом
     def on_telemetry_message(client, userdata, msg):
-        query_string = msg.payload.decode()
-        query_params = parse_qs(query_string)
-        single_value_params = {k: v[0] for k, v in query_params.items()}
-        with app.app_context():
-            regular_request(handler_func=telemetry_handler, **single_value_params)
+        samples = decode_telemetry_batch(msg.payload)
+        if samples is not None:
+            # измерения пакета группируются по БПЛА с сохранением порядка
+            by_uav = {}
+            for sample in samples:
+                by_uav.setdefault(sample.pop('id'), []).append(sample)
+            for id, uav_samples in by_uav.items():
+                mqtt_ingest_pool.submit_samples(id, telemetry_batch_handler, uav_samples)
+            return
+        params = decode_telemetry_frame(msg.payload)
+        if params is None:
+            # прежний текстовый формат id=..&lat=..
+            try:
+                query_string = msg.payload.decode()
+            except UnicodeDecodeError:
+                mqtt_ingest_pool.drop()
+                return
+            query_params = parse_qs(query_string)
+            params = {k: v[0] for k, v in query_params.items()}
+        id = params.pop('id', None)
+        mqtt_ingest_pool.submit_samples(id, telemetry_batch_handler, [params])
             
     def on_mission_message(client, userdata, msg):
-        payload = json.loads(msg.payload.decode())
-        with app.app_context():
-            regular_request(handler_func=fmission_ms_handler, **payload)
+        try:
+            payload = json.loads(msg.payload.decode())
+        except ValueError:
+            return
+        mqtt_ingest_pool.submit(payload.get('id'), fmission_ms_handler, payload)
 
 
+    # кэш состояния заполняется до начала приема телеметрии
+    vehicle_state_cache.start(app)
+    mqtt_ingest_pool.start(app)
     mqtt_client.on_connect = on_connect
     mqtt_client.message_callback_add(MQTT_TELEMETRY_TOPIC, on_telemetry_message)
     mqtt_client.message_callback_add(MQTT_MISSION_TOPIC, on_mission_message)
@@ -53,6 +78,8 @@ def create_app():
     with app.app_context():
         mqtt_client.loop_start()
     
+    telemetry_buffer.start(app)
+    
     return app
 
 from utils.api_handlers import *
@@ -60,7 +87,10 @@ from utils.api_handlers import *
 def clean_app_db(app):
     with app.app_context():
         db.create_all()
-        clean_db([UavTelemetry, MissionStep, Mission, MissionSenderPublicKeys, UavPublicKeys, Uav, User])
+        clean_db([UavTelemetryRollup, UavTelemetry, MissionStep, Mission, MissionSenderPublicKeys, UavPublicKeys, Uav, User])
+        invalidate_public_key()
+        telemetry_buffer.clear()
+        vehicle_state_cache.clear()
         generate_user(User)
 
 
@@ -0,0 +1,41 @@
+"""
+Сравнение времени подписи полным возведением в степень и по китайской теореме
+об остатках (sign). Запуск из каталога afcs/afcs:
+
+    python benchmarks/sign_benchmark.py [число сообщений]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# сервер импортируется первым, см. tests/conftest.py
+import afcs_server  # noqa: F401
+from utils.utils import AFCS_KEY_SIZE, generate_keys, get_sha256_hex, loaded_keys, sign
+
+KEY_GROUP = 'benchmark'
+
+
+def main(count: int = 200):
+    generate_keys(AFCS_KEY_SIZE, KEY_GROUP)
+    key = loaded_keys[KEY_GROUP]
+    messages = [f'$FlightInfo {idx}' for idx in range(count)]
+    hashes = [int(get_sha256_hex(message), 16) for message in messages]
+
+    started = time.perf_counter()
+    for hash in hashes:
+        pow(hash, key.d, key.n)
+    full_exponent_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for message in messages:
+        sign(message, KEY_GROUP)
+    crt_time = time.perf_counter() - started
+
+    print(f'sign: {full_exponent_time / count * 1e6:.0f} us, CRT: {crt_time / count * 1e6:.0f} us, '
+          f'speedup {full_exponent_time / crt_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,111 @@
+"""
+Сравнение записи телеметрии и выгрузки CSV при одновременной работе с файлом SQLite
+с параметрами Flask-SQLAlchemy по умолчанию (default) и с настройками utils.storage (tuned).
+Потоки записи имитируют поток сброса телеметрии каждого БПЛА (пакеты по 10 записей),
+потоки чтения - выгрузку всей телеметрии. Запуск из каталога afcs/afcs:
+
+    python benchmarks/storage_benchmark.py [default|tuned] [число БПЛА] [число выгрузок]
+"""
+import datetime
+import os
+import sys
+import tempfile
+import time
+from threading import Lock, Thread
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# сервер импортируется первым, см. tests/conftest.py
+import afcs_server  # noqa: F401
+from flask import Flask
+from sqlalchemy import insert, select
+from afcs_server import db
+from models import Uav, UavTelemetry
+from utils.storage import sqlite_storage_config, configure_sqlite_engines, read_engine
+
+DURATION_SEC = 5.0
+INITIAL_ROWS = 20000
+WRITE_BATCH_ROWS = 10
+WRITE_INTERVAL_SEC = 0.01
+EXPORT_CHUNK_ROWS = 1000
+
+
+def make_app(path: str, mode: str) -> Flask:
+    app = Flask(__name__)
+    uri = f'sqlite:///{path}'
+    if mode == 'tuned':
+        app.config.update(sqlite_storage_config(uri))
+    else:
+        app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    db.init_app(app)
+    if mode == 'tuned':
+        configure_sqlite_engines(app)
+    return app
+
+
+def telemetry_rows(uav_id: str, start: int, count: int) -> list:
+    base = datetime.datetime(2024, 1, 1)
+    return [{'uav_id': uav_id, 'record_time': base + datetime.timedelta(seconds=start + idx),
+             'lat': 55.0, 'lon': 37.0, 'speed': 10.0} for idx in range(count)]
+
+
+def main(mode: str = 'tuned', vehicles: int = 8, readers: int = 2):
+    table = UavTelemetry.__table__
+    app = make_app(os.path.join(tempfile.mkdtemp(), 'afcs.db'), mode)
+    with app.app_context():
+        db.create_all()
+        for idx in range(vehicles):
+            db.session.add(Uav(id=str(idx), is_armed=False, state='В сети', kill_switch_state=False))
+        for idx in range(vehicles):
+            db.session.execute(insert(table), telemetry_rows(str(idx), 0, INITIAL_ROWS // vehicles))
+        db.session.commit()
+        engine = read_engine()
+
+    stop = time.monotonic() + DURATION_SEC
+    lock = Lock()
+    written, failed, export_times = [0], [0], []
+
+    def writer(uav_id: str):
+        start = INITIAL_ROWS
+        with app.app_context():
+            while time.monotonic() < stop:
+                try:
+                    db.session.execute(insert(table), telemetry_rows(uav_id, start, WRITE_BATCH_ROWS))
+                    db.session.commit()
+                    with lock:
+                        written[0] += WRITE_BATCH_ROWS
+                except Exception:
+                    db.session.rollback()
+                    with lock:
+                        failed[0] += 1
+                start += WRITE_BATCH_ROWS
+                time.sleep(WRITE_INTERVAL_SEC)
+            db.session.remove()
+
+    def reader():
+        while time.monotonic() < stop:
+            started = time.monotonic()
+            with engine.connect() as connection:
+                rows = connection.execution_options(stream_results=True).execute(select(table))
+                for _ in rows.partitions(EXPORT_CHUNK_ROWS):
+                    pass
+            with lock:
+                export_times.append(time.monotonic() - started)
+
+    threads = [Thread(target=writer, args=(str(idx),)) for idx in range(vehicles)] + \
+        [Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    export_times.sort()
+    export_p50 = export_times[len(export_times) // 2] * 1e3 if export_times else 0
+    print(f'{mode}: vehicles {vehicles}, readers {readers}: write {written[0] / DURATION_SEC:.0f} rows/s, '
+          f'failed commits {failed[0]}, exports {len(export_times)}, export p50 {export_p50:.0f} ms')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'tuned',
+         int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+         int(sys.argv[3]) if len(sys.argv) > 3 else 2)
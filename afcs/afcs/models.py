@@ -13,7 +13,7 @@ class User(db.Model):
     __tablename__ = 'user'
     username = db.Column(db.String(64), index=True, primary_key=True)
     password_hash = db.Column(db.String(128))
-    access_token = db.Column(db.String(128))
+    access_token = db.Column(db.String(128), index=True)
 
     def __repr__(self):
         return '<User {}>'.format(self.username)
@@ -151,4 +151,47 @@ class UavTelemetry(db.Model):
     )
     
     def __repr__(self):
-        return f'UAV id={self.uav_id}, lat={self.lat}, lon={self.lon}, alt={self.alt}, azimuth={self.azimuth}'
\ No newline at end of file
+        return f'UAV id={self.uav_id}, lat={self.lat}, lon={self.lon}, alt={self.alt}, azimuth={self.azimuth}'
+
+
+class UavTelemetryRollup(db.Model):
+    """
+    Модель агрегатов телеметрии БПЛА за интервал времени.
+    Агрегаты обновляются при записи телеметрии, среднее значение равно сумме, деленной на count.
+
+    Attributes:
+        uav_id: идентификатор БПЛА (первичный ключ, внешний ключ)
+        resolution: длительность интервала в секундах (первичный ключ)
+        bucket_start: начало интервала (первичный ключ)
+        count: число измерений за интервал
+        lat_min, lat_max, lat_sum: минимум, максимум и сумма широты
+        lon_min, lon_max, lon_sum: минимум, максимум и сумма долготы
+        alt_min, alt_max, alt_sum: минимум, максимум и сумма высоты
+        speed_min, speed_max, speed_sum: минимум, максимум и сумма скорости
+    """
+    __tablename__ = 'uav_telemetry_rollup'
+    uav_id = db.Column(db.String(64), db.ForeignKey('uav.id'))
+    resolution = db.Column(db.Integer)
+    bucket_start = db.Column(db.DateTime)
+    count = db.Column(db.Integer)
+    lat_min = db.Column(db.Float(precision=8))
+    lat_max = db.Column(db.Float(precision=8))
+    lat_sum = db.Column(db.Float(precision=8))
+    lon_min = db.Column(db.Float(precision=8))
+    lon_max = db.Column(db.Float(precision=8))
+    lon_sum = db.Column(db.Float(precision=8))
+    alt_min = db.Column(db.Float(precision=8))
+    alt_max = db.Column(db.Float(precision=8))
+    alt_sum = db.Column(db.Float(precision=8))
+    speed_min = db.Column(db.Float(precision=8))
+    speed_max = db.Column(db.Float(precision=8))
+    speed_sum = db.Column(db.Float(precision=8))
+
+    __table_args__ = (
+        db.PrimaryKeyConstraint(
+            uav_id, resolution, bucket_start
+        ),
+    )
+
+    def __repr__(self):
+        return f'UAV id={self.uav_id}, resolution={self.resolution}, bucket_start={self.bucket_start}, count={self.count}'
@@ -506,7 +506,8 @@ def get_telemetry():
 @bp.route('/logs/get_telemetry_csv')
 def get_telemetry_csv():
     """
-    Получает всю телеметрию для указанного БПЛА в формате CSV.
+    Получает телеметрию для указанного БПЛА в формате CSV.
+    Ответ передается по частям, по мере чтения из БД.
     ---
     tags:
       - logs
@@ -516,6 +517,31 @@ def get_telemetry_csv():
         type: string
         required: true
         description: Идентификатор БПЛА.
+      - name: start
+        in: query
+        type: string
+        required: false
+        description: Начало интервала времени измерений в формате ISO 8601 (UTC), включительно.
+      - name: end
+        in: query
+        type: string
+        required: false
+        description: Конец интервала времени измерений в формате ISO 8601 (UTC), включительно.
+      - name: step
+        in: query
+        type: integer
+        required: false
+        description: Прореживание - в выгрузку попадает каждая step-я строка интервала.
+      - name: resolution
+        in: query
+        type: integer
+        required: false
+        description: Уровень хранения - 0 (исходные записи) или длительность интервала агрегата в секундах (1, 10, 60). Агрегаты содержат число измерений, среднее, минимум и максимум величин.
+      - name: max_points
+        in: query
+        type: integer
+        required: false
+        description: Если resolution не задан, выбирается самый подробный уровень, на котором в интервал попадает не больше max_points строк.
     responses:
       200:
         description: Телеметрия БПЛА в формате CSV.
@@ -531,10 +557,24 @@ def get_telemetry_csv():
           example: "Wrong id"
     """
     id = cast_wrapper(request.args.get('id'), str)
-    if id:
-        return regular_request(handler_func=get_telemetry_csv_handler, id=id)
-    else:
+    start = cast_wrapper(request.args.get('start'), datetime.datetime.fromisoformat)
+    end = cast_wrapper(request.args.get('end'), datetime.datetime.fromisoformat)
+    step = cast_wrapper(request.args.get('step'), int)
+    resolution = cast_wrapper(request.args.get('resolution'), int)
+    max_points = cast_wrapper(request.args.get('max_points'), int)
+    if not id:
         return bad_request('Wrong id')
+    elif (request.args.get('start') and start is None) or (request.args.get('end') and end is None):
+        return bad_request('Wrong time range')
+    elif request.args.get('step') and (step is None or step < 1):
+        return bad_request('Wrong step')
+    elif request.args.get('resolution') and resolution not in (0, *TELEMETRY_ROLLUP_RESOLUTIONS_SEC):
+        return bad_request('Wrong resolution')
+    elif request.args.get('max_points') and (max_points is None or max_points < 1):
+        return bad_request('Wrong max_points')
+    else:
+        return regular_request(handler_func=get_telemetry_csv_handler, id=id, start=start, end=end, step=step,
+                               resolution=resolution, max_points=max_points)
 
 
 @bp.route('/admin/get_waiter_number')
@@ -561,6 +601,79 @@ def get_waiter_number():
     return authorized_request(handler_func=get_waiter_number_handler, token=token)
 
 
+@bp.route('/admin/mqtt_ingest_stats')
+def mqtt_ingest_stats():
+    """
+    Получает статистику обработки сообщений MQTT.
+    ---
+    tags:
+      - admin
+    parameters:
+      - name: token
+        in: query
+        type: string
+        required: true
+        description: Токен аутентификации.
+    responses:
+      200:
+        description: Число принятых, обработанных, отброшенных и завершившихся ошибкой сообщений, число пакетов, глубина очередей рабочих потоков.
+        schema:
+          type: object
+          example: {"submitted": 120, "processed": 118, "dropped": 0, "failed": 0, "batches": 40, "queue_depths": [1, 0, 1, 0], "max_queue_depth": 5}
+    """
+    token = request.args.get('token')
+    return authorized_request(handler_func=get_mqtt_ingest_stats_handler, token=token)
+
+
+@bp.route('/admin/fleet_snapshot')
+def fleet_snapshot():
+    """
+    Получает состояние, состояние миссии, задержку и последнюю телеметрию всех БПЛА одним запросом.
+    ---
+    tags:
+      - admin
+    parameters:
+      - name: token
+        in: query
+        type: string
+        required: true
+        description: Токен аутентификации.
+      - name: since
+        in: query
+        type: integer
+        required: false
+        description: Версия из предыдущего ответа - вернуть только БПЛА, изменившиеся после нее.
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag предыдущего ответа - при отсутствии изменений возвращается 304.
+    responses:
+      200:
+        description: Версия состояния (также в заголовке ETag), признак полного состояния, число БПЛА, ожидающих решения об арме, поля и строки БПЛА.
+        schema:
+          type: object
+          example: {"version": 42, "full": false, "waiters": 0, "fields": ["id", "state", "is_armed", "kill_switch", "delay", "mission_state", "lat", "lon", "alt", "azimuth", "dop", "sats", "speed"], "vehicles": [["1", "В поездке", true, false, 5, "0", 46.61, 142.81, 10.0, 90.0, 1.2, 12, 36.0]]}
+      304:
+        description: Состояние не изменилось с версии из If-None-Match.
+      400:
+        description: Какие-то параметры неверные
+        schema:
+          type: string
+          example: "Wrong since"
+    """
+    token = request.args.get('token')
+    since = cast_wrapper(request.args.get('since'), int)
+    if request.args.get('since') and since is None:
+        return bad_request('Wrong since')
+    answer, ret_code = authorized_request(handler_func=fleet_snapshot_handler, token=token, since=since,
+                                          etag=request.headers.get('If-None-Match'))
+    if ret_code == 200:
+        # код ответа (200 или 304) задается обработчиком
+        return answer
+    return answer, ret_code
+
+
 @bp.route('/admin/get_id_list')
 def get_id_list():
     """
@@ -808,6 +921,88 @@ def delete_forbidden_zone():
         return authorized_request(handler_func=delete_forbidden_zone_handler, token=token, name=name)
     else:
         return bad_request('Wrong name')
+
+
+@bp.route('/admin/check_forbidden_zones')
+def check_forbidden_zones():
+    """
+    Проверяет точку по всем запрещенным для полета зонам.
+    ---
+    tags:
+      - admin
+    parameters:
+      - name: lat
+        in: query
+        type: number
+        required: true
+        description: Широта в градусах.
+      - name: lon
+        in: query
+        type: number
+        required: true
+        description: Долгота в градусах.
+      - name: token
+        in: query
+        type: string
+        required: true
+        description: Токен аутентификации.
+    responses:
+      200:
+        description: Имена зон, в которые попадает точка.
+        schema:
+          type: string
+          example: "['test1']"
+      400:
+        description: Какие-то параметры неверные
+        schema:
+          type: string
+          example: "Wrong coordinates"
+    """
+    lat = request.args.get('lat')
+    lon = request.args.get('lon')
+    token = request.args.get('token')
+    if lat and lon:
+        return authorized_request(handler_func=check_forbidden_zones_handler, token=token, lat=lat, lon=lon)
+    else:
+        return bad_request('Wrong coordinates')
+
+
+@bp.route('/admin/check_mission_forbidden_zones')
+def check_mission_forbidden_zones():
+    """
+    Проверяет маршрут полетного задания БПЛА на пересечение с запрещенными для полета зонами.
+    ---
+    tags:
+      - admin
+    parameters:
+      - name: id
+        in: query
+        type: string
+        required: true
+        description: Идентификатор БПЛА.
+      - name: token
+        in: query
+        type: string
+        required: true
+        description: Токен аутентификации.
+    responses:
+      200:
+        description: Нарушения маршрута (номер отрезка и имя зоны) или $-1, если миссии нет.
+        schema:
+          type: string
+          example: "[{'segment': 1, 'zone': 'test1'}]"
+      400:
+        description: Какие-то параметры неверные
+        schema:
+          type: string
+          example: "Wrong id"
+    """
+    id = request.args.get('id')
+    token = request.args.get('token')
+    if id:
+        return authorized_request(handler_func=check_mission_forbidden_zones_handler, token=token, id=id)
+    else:
+        return bad_request('Wrong id')
   
 
 @bp.route('/admin/forbidden_zones')
@@ -1241,6 +1436,58 @@ def flight_info():
                           query_str=f'/api/flight_info?id={id}', key_group=f'kos{id}', sig=sig, id=id)
     else:
         return bad_request('Wrong id')
+
+
+@bp.route('/api/flight_info_wait')
+def flight_info_wait():
+    """
+    Обрабатывает долгий опрос информации полета от БПЛА. Ответ отправляется сразу после
+    изменения арма, аварийного выключателя, задержки или запрещенных зон, либо по истечении
+    времени ожидания.
+    ---
+    tags:
+      - api
+    parameters:
+      - name: id
+        in: query
+        type: string
+        required: true
+        description: Идентификатор БПЛА.
+      - name: version
+        in: query
+        type: integer
+        required: false
+        description: Версия состояния из предыдущего ответа. Если не указана, ответ отправляется сразу.
+      - name: sig
+        in: query
+        type: string
+        required: true
+        description: Подпись запроса.
+    responses:
+      200:
+        description: Состояние полета, хэш запретных зон, время до следующего сеанса связи и версия состояния или $-1, если БПЛА не найден.
+        schema:
+          type: string
+          example: "$Flight {status}$ForbiddenZonesHash {hash}$Delay {time in seconds}$Version {version}#{signature}"
+      400:
+        description: Неверный идентификатор или версия.
+        schema:
+          type: string
+          example: "Wrong id/version"
+      403:
+        description: Ошибка проверки подписи.
+    """
+    id = cast_wrapper(request.args.get('id'), str)
+    version_str = request.args.get('version')
+    version = cast_wrapper(version_str, int)
+    sig = request.args.get('sig')
+    if id and (version_str is None or version is not None):
+        query_str = f'/api/flight_info_wait?id={id}' if version is None else \
+            f'/api/flight_info_wait?id={id}&version={version_str}'
+        return signed_request(handler_func=flight_info_wait_handler, verifier_func=verify, signer_func=sign,
+                          query_str=query_str, key_group=f'kos{id}', sig=sig, id=id, version=version)
+    else:
+        return bad_request('Wrong id/version')
       
       
 @bp.route('/api/telemetry')
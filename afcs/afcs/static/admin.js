@@ -398,6 +398,10 @@ async function fly_accept() {
 async function status_change() {
   let state_resp = await fetch("admin/get_state?id=" + active_id + "&token=" + access_token);
   let state_text = await state_resp.text();
+  show_status(state_text);
+}
+
+function show_status(state_text) {
   document.getElementById("status").innerHTML="Статус: " + state_text;
   current_state = state_text;
   if (state_text == 'В поездке') {
@@ -407,11 +411,8 @@ async function status_change() {
   }
 }
 
-async function waiters_change() {
-  let waiter_resp = await fetch("admin/get_waiter_number" + "?token=" + access_token);
-  let waiter_text = await waiter_resp.text();
-  document.getElementById("waiters").innerHTML="Ожидают: " + waiter_text;
-  let waiters_num = parseInt(waiter_text);
+function show_waiters(waiters_num) {
+  document.getElementById("waiters").innerHTML="Ожидают: " + waiters_num;
   if (waiters_num > 0) {
     document.getElementById('arm').disabled = false;
     document.getElementById('disarm').disabled = false;
@@ -507,34 +508,23 @@ function add_or_update_vehicle_marker(id, lat, lon, alt, azimuth, speed) {
   }
 }
 
-async function get_telemetry(id) {
-  let telemetry_resp = await fetch("admin/get_telemetry?id=" + id + "&token=" + access_token);
-  if (telemetry_resp.ok) {
-    let telemetry_data = await telemetry_resp.json();
-    if ('error' in telemetry_data) {
-      return;
-    }
-    let lat = parseFloat(telemetry_data.lat);
-    let lon = parseFloat(telemetry_data.lon);
-    let alt = parseFloat(telemetry_data.alt);
-    let azimuth = parseFloat(telemetry_data.azimuth);
-    let dop = parseFloat(telemetry_data.dop);
-    let sats = parseInt(telemetry_data.sats);
-    let speed = parseFloat(telemetry_data.speed);
+function show_telemetry(id, telemetry_data) {
+  let lat = parseFloat(telemetry_data.lat);
+  let lon = parseFloat(telemetry_data.lon);
+  let alt = parseFloat(telemetry_data.alt);
+  let azimuth = parseFloat(telemetry_data.azimuth);
+  let dop = parseFloat(telemetry_data.dop);
+  let sats = parseInt(telemetry_data.sats);
+  let speed = parseFloat(telemetry_data.speed);
+  add_or_update_vehicle_marker(id, lat, lon, alt, azimuth, speed);
+  if (id === active_id) {
     document.getElementById("dop").innerHTML = "DOP: " + dop;
     document.getElementById("sats").innerHTML = "SATS: " + sats;
-    add_or_update_vehicle_marker(id, lat, lon, alt, azimuth, speed);
-    if (id === active_id) {
-      map.getView().setCenter([lon, lat]);
-    }
-  } else {
-    console.error("Failed to fetch telemetry data");
+    map.getView().setCenter([lon, lat]);
   }
 }
 
-async function get_mission_state(id) {
-  let mission_state_resp = await fetch("admin/get_mission_state?id=" + id + "&token=" + access_token);
-  let mission_state_text = await mission_state_resp.text();
+function show_mission_state(mission_state_text) {
   if (mission_state_text == '0') {
     document.getElementById('mission_checkbox').checked = true;
   } else if (mission_state_text == '1')  {
@@ -552,38 +542,79 @@ async function change_active_id(new_id) {
   active_id = new_id;
   current_mission = null;
   clear_markers()
-  status_change();
   get_mission(new_id);
   for(let idx = 0; idx < ids.length; idx++) {
-    get_telemetry(ids[idx]);
+    if (fleet[ids[idx]]) {
+      show_vehicle(fleet[ids[idx]]);
+    }
   }
-  get_mission_state(new_id);
-  get_delay();
 }
 
+// состояние всех БПЛА из admin/fleet_snapshot по идентификаторам
+let fleet = {};
+let fleet_version = null;
 
-async function get_ids() {
-  let ids_resp = await fetch("admin/get_id_list" + "?token=" + access_token);
-  let ids_text = await ids_resp.text();
-  let new_ids = JSON.parse(ids_text.replace(/'/g, '"'));
-  let old_ids_len = ids.length;
-  ids = new_ids;
-  if (active_id == null && ids.length > 0) {
-    change_active_id(ids[0]);
+function show_vehicle(vehicle) {
+  if (vehicle.lat != null) {
+    show_telemetry(vehicle.id, vehicle);
   }
+  if (vehicle.id === active_id) {
+    show_status(vehicle.state);
+    show_mission_state(vehicle.mission_state);
+    document.getElementById("delay").innerHTML = "Delay: " + vehicle.delay;
+  }
+}
 
-  let id_select = document.getElementById("id_select");
+async function get_fleet_snapshot() {
+  // после первого ответа запрашиваются только изменившиеся БПЛА
+  let query_str = "admin/fleet_snapshot?token=" + access_token;
+  if (fleet_version != null) {
+    query_str += "&since=" + fleet_version;
+  }
+  let snapshot_resp = await fetch(query_str);
+  if (!snapshot_resp.ok) {
+    console.error("Failed to fetch fleet snapshot");
+    return;
+  }
+  let snapshot = await snapshot_resp.json();
+  fleet_version = snapshot.version;
+  if (snapshot.full) {
+    fleet = {};
+  }
+  let new_ids = [];
+  for (let idx = 0; idx < snapshot.vehicles.length; idx++) {
+    let vehicle = {};
+    for (let field_idx = 0; field_idx < snapshot.fields.length; field_idx++) {
+      vehicle[snapshot.fields[field_idx]] = snapshot.vehicles[idx][field_idx];
+    }
+    fleet[vehicle.id] = vehicle;
+    if (!ids.includes(vehicle.id)) {
+      new_ids.push(vehicle.id);
+    }
+  }
+  add_ids(new_ids);
+  show_waiters(snapshot.waiters);
+  for (let idx = 0; idx < snapshot.vehicles.length; idx++) {
+    show_vehicle(fleet[snapshot.vehicles[idx][0]]);
+  }
+}
 
-  for (var i = old_ids_len; i<ids.length; i++){
-    var opt = document.createElement('option');
-    opt.value = ids[i];
-    opt.innerHTML = ids[i];
+function add_ids(new_ids) {
+  let id_select = document.getElementById("id_select");
+  for (let idx = 0; idx < new_ids.length; idx++) {
+    ids.push(new_ids[idx]);
+    let opt = document.createElement('option');
+    opt.value = new_ids[idx];
+    opt.innerHTML = new_ids[idx];
     id_select.appendChild(opt);
   }
-
+  if (active_id == null && ids.length > 0) {
+    change_active_id(ids[0]);
+  }
 }
 
 
+
 async function updateForbiddenZones() {
   await createGeoJSONLayer();
 }
@@ -610,26 +641,12 @@ async function set_delay() {
   }
 }
 
-async function get_delay() {
-  if (active_id != null) {
-    let delay_resp = await fetch(`admin/get_delay?id=${active_id}&token=${access_token}`);
-    let delay_text = await delay_resp.text();
-    document.getElementById("delay").innerHTML = "Delay: " + delay_text;
-  }
-}
-
 setInterval(async function() {
-  get_ids();
+  // состояние, миссии, задержки и телеметрия всех БПЛА - одним запросом
+  await get_fleet_snapshot();
   get_display_mode();
   if (active_id != null) {
-    status_change();
-    waiters_change();
     get_mission(active_id);
-    for(let idx = 0; idx < ids.length; idx++) {
-      get_telemetry(ids[idx]);
-    }
-    get_mission_state(active_id);
-    get_delay();
   }
   if (forbidden_zones_display) {
     await updateForbiddenZones();
@@ -4,6 +4,7 @@ document.getElementById('submit-events').onclick = submitEvents;
 
 
 let chartInstance = null;
+const CHART_MAX_POINTS = 2000;
 
 async function submit() {
     let id = document.getElementById('id').value;
@@ -38,16 +39,21 @@ async function submitSpeed() {
         document.getElementById('logs-container').innerHTML = "";
         document.getElementById('events-container').innerHTML = "";
 
-        let response = await fetch('logs/get_telemetry_csv?id=' + id);
+        // сервер выбирает уровень хранения (исходные записи или агрегаты), при котором
+        // точек не больше, чем нужно графику
+        let response = await fetch('logs/get_telemetry_csv?id=' + id + '&max_points=' + CHART_MAX_POINTS);
         let csv = await response.text();
-        let rows = csv.split('\n').slice(1);
+        let lines = csv.split('\n');
+        let header = lines[0].split(',');
+        let timeIdx = header.indexOf('record_time');
+        let speedIdx = header.indexOf('speed');
         let times = [];
         let speeds = [];
-        rows.forEach(row => {
+        lines.slice(1).forEach(row => {
             let cols = row.split(',');
-            if (cols.length >= 7) {
-                times.push(new Date(cols[0]));
-                speeds.push(parseFloat(cols[7]));
+            if (cols.length === header.length) {
+                times.push(new Date(cols[timeIdx]));
+                speeds.push(parseFloat(cols[speedIdx]));
             }
         });
         drawChart(times, speeds);
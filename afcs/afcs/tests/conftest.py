@@ -0,0 +1,4 @@
+# сервер импортируется первым, как при запуске (afcs_server.wsgi): utils/__init__.py
+# импортирует utils.utils, и при другом порядке обработчики запросов загружаются
+# до моделей и утилит и остаются без их имен
+import afcs_server  # noqa: F401
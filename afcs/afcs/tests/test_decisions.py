@@ -0,0 +1,39 @@
+import time
+from threading import Thread
+from utils.decisions import DecisionRegistry
+
+
+def test_resolve_wakes_waiter():
+    registry = DecisionRegistry()
+    results = []
+    waiter = Thread(target=lambda: results.append(registry.wait('1')))
+    waiter.start()
+    while '1' not in registry:
+        time.sleep(1e-3)
+    assert len(registry) == 1
+    started = time.perf_counter()
+    assert registry.resolve('1', 0)
+    waiter.join(timeout=1)
+    assert results == [0]
+    assert time.perf_counter() - started < 0.05
+    assert '1' not in registry
+
+
+def test_resolve_without_waiter():
+    registry = DecisionRegistry()
+    assert not registry.resolve('1', 0)
+
+
+def test_wait_timeout():
+    registry = DecisionRegistry()
+    assert registry.wait('1', timeout=0.01, default=1) == 1
+    assert '1' not in registry
+    assert not registry.resolve('1', 0)
+
+
+def test_waiters_share_decision():
+    registry = DecisionRegistry()
+    first = registry.register('1')
+    assert registry.register('1') is first
+    registry.resolve('1', 1)
+    assert first.result(0) == 1
@@ -0,0 +1,84 @@
+import time
+from flask import Flask
+from afcs_server import db
+from utils.mqtt_ingest import MqttIngestPool
+
+
+def make_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    return app
+
+
+def test_per_vehicle_order():
+    pool = MqttIngestPool(workers=3)
+    received = []
+    for idx in range(200):
+        pool.submit(str(idx % 5), lambda id, idx: received.append((id, idx)), {'id': str(idx % 5), 'idx': idx})
+    pool.start(make_app())
+    while pool.stats()['processed'] < 200:
+        time.sleep(1e-3)
+    for id in map(str, range(5)):
+        indexes = [idx for vehicle_id, idx in received if vehicle_id == id]
+        assert indexes == sorted(indexes) and len(indexes) == 40
+    assert pool.stats()['batches'] < 200
+
+
+def test_backpressure():
+    pool = MqttIngestPool(workers=1, queue_size=2)
+    assert pool.submit('1', print, {})
+    assert pool.submit('1', print, {})
+    assert not pool.submit('1', print, {})
+    stats = pool.stats()
+    assert stats['submitted'] == 2 and stats['dropped'] == 1
+    assert stats['queue_depths'] == [2] and stats['max_queue_depth'] == 2
+
+
+def test_failed_handler_does_not_stop_batch():
+    pool = MqttIngestPool(workers=1)
+    received = []
+
+    def handler(value):
+        if value == 1:
+            raise ValueError('bad message')
+        received.append(value)
+
+    with make_app().app_context():
+        pool.process_batch([(handler, {'value': value}, False) for value in range(3)])
+    assert received == [0, 2]
+    assert pool.stats()['failed'] == 1
+
+
+def test_samples_grouped_by_vehicle():
+    pool = MqttIngestPool(workers=1)
+    calls = []
+    samples_handler = lambda id, samples: calls.append((id, samples))
+    for idx in range(3):
+        pool.submit_samples('1', samples_handler, [idx])
+        pool.submit_samples('2', samples_handler, [idx])
+    pool.submit('1', lambda id: calls.append((id, 'mission')), {'id': '1'})
+    pool.submit_samples('1', samples_handler, [3, 4])
+
+    with make_app().app_context():
+        pool.process_batch(pool._drain(pool._queues[0]))
+    assert calls == [('1', [0, 1, 2]), ('2', [0, 1, 2]), ('1', 'mission'), ('1', [3, 4])]
+    stats = pool.stats()
+    assert stats['processed'] == 8 and stats['batches'] == 1
+
+
+def test_failed_samples_counted_per_message():
+    pool = MqttIngestPool(workers=1)
+
+    def handler(id, samples):
+        raise ValueError('bad message')
+
+    with make_app().app_context():
+        pool.process_batch([(handler, {'id': '1', 'samples': [idx]}, True) for idx in range(3)])
+    assert pool.stats()['failed'] == 3
+
+
+def test_drop():
+    pool = MqttIngestPool(workers=1)
+    pool.drop()
+    assert pool.stats()['dropped'] == 1 and pool.stats()['submitted'] == 0
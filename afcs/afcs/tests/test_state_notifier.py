@@ -0,0 +1,40 @@
+import time
+from threading import Thread
+from utils.state_notifier import StateNotifier
+
+
+def test_notify_wakes_waiter():
+    notifier = StateNotifier()
+    results = []
+    waiter = Thread(target=lambda: results.append(notifier.wait('1', 0, timeout=5)))
+    waiter.start()
+    while notifier.waiters == 0:
+        time.sleep(1e-3)
+    notifier.notify('2')
+    time.sleep(0.01)
+    assert results == []
+    notifier.notify('1')
+    waiter.join(timeout=1)
+    assert results == [notifier.version('1')]
+    assert notifier.version('2') == 1
+
+
+def test_global_change_bumps_all_vehicles():
+    notifier = StateNotifier()
+    notifier.notify('1')
+    notifier.notify()
+    assert notifier.version('1') == notifier.version('2') == 2
+
+
+def test_wait_returns_on_stale_version_or_timeout():
+    notifier = StateNotifier()
+    assert notifier.wait('1', 10, timeout=5) == 0
+    started = time.perf_counter()
+    assert notifier.wait('1', 0, timeout=0.01) == 0
+    assert time.perf_counter() - started < 1
+
+
+def test_max_waiters():
+    notifier = StateNotifier()
+    notifier.waiters = 3
+    assert notifier.wait('1', 0, timeout=5, max_waiters=3) == 0
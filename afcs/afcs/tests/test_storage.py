@@ -0,0 +1,68 @@
+import datetime
+import pytest
+from threading import Thread
+from flask import Flask
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import OperationalError
+from afcs_server import db
+from models import Uav, UavTelemetry
+from utils.storage import sqlite_storage_config, configure_sqlite_engines, read_engine
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config.update(sqlite_storage_config(f'sqlite:///{tmp_path / "afcs.db"}'))
+    db.init_app(app)
+    configure_sqlite_engines(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Uav(id='1', is_armed=False, state='В сети', kill_switch_state=False))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+        read_engine().dispose()
+
+
+def test_pragmas(app):
+    for engine in (db.engine, read_engine()):
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+            assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == 1
+            assert connection.exec_driver_sql('PRAGMA busy_timeout').scalar() == 5000
+    with read_engine().connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text("DELETE FROM uav"))
+
+
+def test_write_during_read(app):
+    table = UavTelemetry.__table__
+    rows = [{'uav_id': '1', 'record_time': datetime.datetime(2024, 1, 1) + datetime.timedelta(seconds=sec)}
+            for sec in range(10)]
+    db.session.execute(insert(table), rows[:5])
+    db.session.commit()
+    with read_engine().connect() as connection:
+        result = connection.execute(select(table.c.record_time))
+        assert result.fetchone() is not None
+        # в режиме WAL открытое чтение не блокирует запись
+        db.session.execute(insert(table), rows[5:])
+        db.session.commit()
+        assert len(result.fetchall()) == 4
+    assert db.session.query(UavTelemetry).count() == 10
+
+
+def test_pooled_connections_shared_between_threads(app):
+    engines = (db.engine, read_engine())
+    results = []
+
+    def read():
+        for engine in engines:
+            with engine.connect() as connection:
+                results.append(connection.execute(select(Uav.id)).scalar())
+
+    for _ in range(3):
+        thread = Thread(target=read)
+        thread.start()
+        thread.join()
+    assert results == ['1'] * 6
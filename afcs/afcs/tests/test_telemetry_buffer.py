@@ -0,0 +1,96 @@
+import datetime
+import pytest
+from sqlalchemy.exc import OperationalError
+from flask import Flask
+from afcs_server import db
+from models import Uav, UavTelemetry
+import utils.telemetry_buffer as telemetry_buffer_module
+from utils.telemetry_buffer import TelemetryBuffer
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Uav(id='1', is_armed=False, state='В сети', kill_switch_state=False))
+        db.session.commit()
+        yield app
+
+
+def make_row(idx, speed=0.0):
+    return dict(uav_id='1', lat=55.0, lon=37.0, alt=100.0, azimuth=0.0, dop=1.0, sats=10, speed=speed,
+                record_time=datetime.datetime(2024, 1, 1) + datetime.timedelta(seconds=idx))
+
+
+def test_flush_on_size(app):
+    buffer = TelemetryBuffer(max_rows=3, max_delay_sec=60)
+    buffer.add(make_row(0))
+    buffer.add(make_row(1))
+    assert UavTelemetry.query.count() == 0
+    buffer.add(make_row(2))
+    assert UavTelemetry.query.count() == 3
+    assert len(buffer) == 0
+    assert buffer.flushes == 1
+
+
+def test_flush_on_time(app):
+    buffer = TelemetryBuffer(max_rows=100, max_delay_sec=0)
+    buffer.add(make_row(0))
+    assert UavTelemetry.query.count() == 1
+
+
+def test_same_key_ignored(app):
+    buffer = TelemetryBuffer(max_rows=100, max_delay_sec=60)
+    buffer.add(make_row(0, speed=1.0))
+    buffer.add(make_row(0, speed=2.0))
+    assert buffer.flush() == 1
+    buffer.add(make_row(0, speed=3.0))
+    buffer.flush()
+    assert [t.speed for t in UavTelemetry.query.all()] == [1.0]
+
+
+def test_add_many(app):
+    buffer = TelemetryBuffer(max_rows=4, max_delay_sec=60)
+    buffer.add_many([make_row(0), make_row(1), make_row(1, speed=5.0)])
+    assert len(buffer) == 2
+    buffer.add_many([make_row(2), make_row(3)])
+    assert UavTelemetry.query.count() == 4
+    assert buffer.flushes == 1
+
+
+def test_bad_row_dropped(app):
+    buffer = TelemetryBuffer(max_rows=100, max_delay_sec=60)
+    buffer.add_many([make_row(0), dict(make_row(1), sats=object()), make_row(2)])
+    assert buffer.flush() == 2
+    assert (buffer.flushed_rows, buffer.dropped_rows) == (2, 1)
+    assert len(buffer) == 0
+    buffer.add(make_row(3))
+    assert buffer.flush() == 1
+    assert UavTelemetry.query.count() == 3
+
+
+def test_busy_database_retried(app, monkeypatch):
+    monkeypatch.setattr(telemetry_buffer_module, 'TELEMETRY_FLUSH_RETRY_DELAY_SEC', 0)
+    buffer = TelemetryBuffer(max_rows=100, max_delay_sec=60)
+    write = buffer._write
+    failures = [2]
+
+    def locked_write(rows):
+        if failures[0]:
+            failures[0] -= 1
+            raise OperationalError('INSERT', {}, Exception('database is locked'))
+        write(rows)
+
+    monkeypatch.setattr(buffer, '_write', locked_write)
+    buffer.add_many([make_row(0), make_row(1)])
+    assert buffer.flush() == 2
+    assert buffer.dropped_rows == 0
+
+    failures[0] = 100
+    buffer.add(make_row(2))
+    assert buffer.flush() == 0
+    assert buffer.dropped_rows == 1 and len(buffer) == 0
+    assert UavTelemetry.query.count() == 2
@@ -0,0 +1,55 @@
+import datetime
+import pytest
+from flask import Flask
+from afcs_server import db
+from models import Uav, UavTelemetry
+from utils.api_handlers import get_telemetry_csv_handler
+from utils.telemetry_csv import iter_csv_from_telemetry
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Uav(id='1', is_armed=False, state='В сети', kill_switch_state=False))
+        for idx in range(10):
+            db.session.add(UavTelemetry(uav_id='1', lat=55.0, lon=37.0, alt=100.0, azimuth=0.0, dop=1.0,
+                                        sats=10, speed=float(idx),
+                                        record_time=datetime.datetime(2024, 1, 1, 0, 0, idx)))
+        db.session.commit()
+        yield app
+
+
+def export(app, **kwargs):
+    with app.test_request_context():
+        response = get_telemetry_csv_handler('1', **kwargs)
+        assert response.mimetype == 'text/csv'
+        return ''.join(chunk.decode() if isinstance(chunk, bytes) else chunk for chunk in response.response)
+
+
+def speeds(csv_data):
+    return [float(line.split(',')[-1]) for line in csv_data.splitlines()[1:]]
+
+
+def test_full_export(app):
+    csv_data = export(app)
+    assert csv_data.splitlines()[0] == 'record_time,lat,lon,alt,azimuth,dop,sats,speed'
+    assert csv_data.splitlines()[1].startswith('2024-01-01 00:00:00,55.0,37.0,100.0')
+    assert speeds(csv_data) == list(range(10))
+
+
+def test_time_range_and_step(app):
+    csv_data = export(app, start=datetime.datetime(2024, 1, 1, 0, 0, 2),
+                      end=datetime.datetime(2024, 1, 1, 0, 0, 8), step=3)
+    assert speeds(csv_data) == [2, 5, 8]
+
+
+def test_csv_chunks():
+    rows = [UavTelemetry(uav_id='1', speed=float(idx), record_time=datetime.datetime(2024, 1, 1))
+            for idx in range(5)]
+    chunks = list(iter_csv_from_telemetry(rows, chunk_rows=2))
+    assert len(chunks) == 3
+    assert chunks[0].startswith('record_time,')
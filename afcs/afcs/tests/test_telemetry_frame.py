@@ -0,0 +1,36 @@
+import datetime
+from utils.telemetry_frame import TELEMETRY_FRAME_HEADER, TELEMETRY_BATCH_HEADER, decode_telemetry_frame, \
+    decode_telemetry_batch
+
+
+def make_frame(id='7', timestamp_ms=1700000000000):
+    return TELEMETRY_FRAME_HEADER.pack(0xA7, 1, 5, timestamp_ms, -353632621, 1491652374, 58409,
+                                       9050, 3600, 120, 12, len(id)) + id.encode()
+
+
+def test_decode_telemetry_frame():
+    params = decode_telemetry_frame(make_frame())
+    assert params['id'] == '7'
+    assert params['lat'] / 1e7 == -35.3632621
+    assert params['lon'] / 1e7 == 149.1652374
+    assert params['alt'] / 1e2 == 584.09
+    assert params['azimuth'] / 1e7 == 90.5
+    assert params['speed'] == 36.0
+    assert params['dop'] == 1.2
+    assert params['sats'] == 12
+    assert params['record_time'] == datetime.datetime(2023, 11, 14, 22, 13, 20)
+
+
+def test_legacy_payload_not_decoded():
+    assert decode_telemetry_frame(b'id=7&lat=-353632621&lon=1491652374') is None
+    assert decode_telemetry_frame(make_frame()[:-1]) is None
+
+
+def test_decode_telemetry_batch():
+    payload = TELEMETRY_BATCH_HEADER.pack(0xA8, 3) + make_frame('7', 1700000000000) + \
+        make_frame('7', 1700000000100) + make_frame('12', 1700000000200)
+    samples = decode_telemetry_batch(payload)
+    assert [s['id'] for s in samples] == ['7', '7', '12']
+    assert samples[1]['record_time'] == datetime.datetime(2023, 11, 14, 22, 13, 20, 100000)
+    assert decode_telemetry_batch(make_frame()) is None
+    assert decode_telemetry_batch(payload[:-1]) is None
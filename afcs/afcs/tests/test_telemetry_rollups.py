@@ -0,0 +1,87 @@
+import datetime
+import pytest
+from flask import Flask
+from afcs_server import db
+from models import Uav, UavTelemetry, UavTelemetryRollup
+from utils.api_handlers import get_telemetry_csv_handler
+from utils.telemetry_buffer import TelemetryBuffer
+from utils.telemetry_rollups import TELEMETRY_ROLLUP_RESOLUTIONS_SEC, bucket_start, choose_resolution
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Uav(id='1', is_armed=False, state='В сети', kill_switch_state=False))
+        db.session.commit()
+        yield app
+
+
+def make_row(ms, speed):
+    return dict(uav_id='1', lat=55.0, lon=37.0, alt=100.0 + speed, azimuth=0.0, dop=1.0, sats=10, speed=speed,
+                record_time=datetime.datetime(2024, 1, 1, 12, 0, 0) + datetime.timedelta(milliseconds=ms))
+
+
+def get_rollup(resolution, bucket):
+    return db.session.get(UavTelemetryRollup, ('1', resolution, bucket))
+
+
+def test_bucket_start():
+    t = datetime.datetime(2024, 1, 1, 12, 34, 56, 789000)
+    assert bucket_start(t, 1) == datetime.datetime(2024, 1, 1, 12, 34, 56)
+    assert bucket_start(t, 10) == datetime.datetime(2024, 1, 1, 12, 34, 50)
+    assert bucket_start(t, 60) == datetime.datetime(2024, 1, 1, 12, 34)
+
+
+def test_rollups_updated_incrementally(app):
+    buffer = TelemetryBuffer(max_rows=1000, max_delay_sec=60)
+    buffer.add_many([make_row(0, 10.0), make_row(500, 20.0), make_row(1500, 30.0)])
+    buffer.flush()
+    buffer.add_many([make_row(900, 3.0), make_row(12000, 40.0)])
+    buffer.flush()
+
+    second = get_rollup(1, datetime.datetime(2024, 1, 1, 12, 0, 0))
+    assert (second.count, second.speed_min, second.speed_max, second.speed_sum) == (3, 3.0, 20.0, 33.0)
+    assert second.alt_max == 120.0
+    ten_sec = get_rollup(10, datetime.datetime(2024, 1, 1, 12, 0, 0))
+    assert (ten_sec.count, ten_sec.speed_max) == (4, 30.0)
+    minute = get_rollup(60, datetime.datetime(2024, 1, 1, 12, 0, 0))
+    assert (minute.count, minute.speed_min, minute.speed_max) == (5, 3.0, 40.0)
+
+
+def test_repeated_sample_counted_once(app):
+    buffer = TelemetryBuffer(max_rows=1000, max_delay_sec=60)
+    buffer.add(make_row(0, 10.0))
+    buffer.flush()
+    # повторная доставка того же измерения, в том числе в одном пакете
+    buffer.add_many([make_row(0, 10.0), make_row(0, 10.0)])
+    buffer.flush()
+
+    for resolution in TELEMETRY_ROLLUP_RESOLUTIONS_SEC:
+        rollup = get_rollup(resolution, datetime.datetime(2024, 1, 1, 12, 0, 0))
+        assert (rollup.count, rollup.speed_sum) == (1, 10.0)
+    assert UavTelemetry.query.count() == 1
+
+
+def test_export_reads_matching_tier(app):
+    buffer = TelemetryBuffer(max_rows=1000, max_delay_sec=60)
+    buffer.add_many([make_row(ms, float(ms // 1000)) for ms in range(0, 120000, 100)])
+    buffer.flush()
+
+    assert choose_resolution(db.session, '1', max_points=2000) == 0
+    assert choose_resolution(db.session, '1', max_points=500) == 1
+    assert choose_resolution(db.session, '1', max_points=20) == 10
+    assert choose_resolution(db.session, '1', max_points=2) == 60
+
+    with app.test_request_context():
+        response = get_telemetry_csv_handler('1', max_points=20)
+        lines = ''.join(chunk.decode() if isinstance(chunk, bytes) else chunk
+                        for chunk in response.response).splitlines()
+    assert lines[0] == 'record_time,count,lat,lat_min,lat_max,lon,lon_min,lon_max,alt,alt_min,alt_max,' \
+        'speed,speed_min,speed_max'
+    assert len(lines) == 13
+    assert lines[1].split(',')[:2] == ['2024-01-01 12:00:00', '100']
+    assert lines[1].split(',')[-3:] == ['4.5', '0.0', '9.0']
@@ -0,0 +1,65 @@
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from afcs_server import db
+from models import User
+from utils.api_handlers import check_user_token, admin_auth_handler
+from utils.db_utils import generate_user
+from utils.token_cache import TokenCache, token_cache
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setenv('ADMIN_LOGIN', 'admin')
+    monkeypatch.setenv('ADMIN_PASSW', 'passw')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        generate_user(User)
+        yield app
+        token_cache.invalidate()
+
+
+@pytest.fixture
+def statements(app):
+    executed = []
+    listener = lambda conn, cursor, statement, *args: executed.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    yield executed
+    event.remove(db.engine, 'before_cursor_execute', listener)
+
+
+def test_token_checked_from_cache(app, statements):
+    token = admin_auth_handler('admin', 'passw')
+    statements.clear()
+    for _ in range(3):
+        assert check_user_token(token)
+    assert statements == []
+
+    assert not check_user_token('wrong')
+    assert not check_user_token('wrong')
+    assert len(statements) == 2
+
+
+def test_generate_user_invalidates_tokens(app):
+    token = admin_auth_handler('admin', 'passw')
+    assert check_user_token(token)
+    db.session.delete(db.session.get(User, 'admin'))
+    db.session.commit()
+    generate_user(User)
+    assert not check_user_token(token)
+    assert check_user_token(admin_auth_handler('admin', 'passw'))
+
+
+def test_token_expires(app, statements):
+    now = [0.0]
+    cache = TokenCache(ttl=10, clock=lambda: now[0])
+    token = db.session.get(User, 'admin').access_token
+    statements.clear()
+    assert cache.check(token) and cache.check(token)
+    assert len(statements) == 1
+    now[0] = 11
+    assert cache.check(token)
+    assert len(statements) == 2
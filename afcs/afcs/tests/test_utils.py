@@ -217,4 +217,29 @@ def test_point_on_horizontal_edge():
 def test_point_on_vertical_edge():
     polygon = [(0, 0), (4, 0), (4, 4), (0, 4)]
     point = (4, 2)
-    assert is_point_in_polygon(point, polygon) == True
\ No newline at end of file
+    assert is_point_in_polygon(point, polygon) == True
+
+
+def test_get_key_public_cached():
+    cache_public_key('kos_cached', '35', '3')
+    with patch('utils.utils.get_entity_by_key') as mock_get_entity:
+        assert get_key('kos_cached', private=False) == (35, 3)
+        mock_get_entity.assert_not_called()
+    invalidate_public_key('kos_cached')
+    with patch('utils.utils.get_entity_by_key', return_value=None):
+        assert get_key('kos_cached', private=False) == -1
+
+def test_verify_cached_signature():
+    message = "This is a cached message"
+    signature = sign(message, TEST_KEY_GROUP)
+    assert verify(message, signature, TEST_KEY_GROUP) == True
+    with patch('utils.utils.pow', create=True) as mock_pow:
+        assert verify(message, signature, TEST_KEY_GROUP) == True
+        mock_pow.assert_not_called()
+    assert verify(message, signature + 1, TEST_KEY_GROUP) == False
+
+def test_sign_matches_full_exponent():
+    key = loaded_keys[TEST_KEY_GROUP]
+    message = "This is a test message"
+    hash = int(get_sha256_hex(message), 16)
+    assert sign(message, TEST_KEY_GROUP) == pow(hash, key.d, key.n)
@@ -0,0 +1,135 @@
+import datetime
+import threading
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from afcs_server import db
+from models import Uav
+from utils.api_handlers import get_state_handler, get_telemetry_handler, flight_info_handler, \
+    force_disarm_handler, force_disarm_all_handler, admin_kill_switch_handler, set_delay_handler, telemetry_handler, fleet_snapshot_handler
+from utils.telemetry_buffer import telemetry_buffer
+from utils.utils import NOT_FOUND
+from utils.vehicle_state import vehicle_state_cache
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Uav(id='1', is_armed=True, state='В поездке', kill_switch_state=False, delay=5))
+        db.session.commit()
+        vehicle_state_cache.start(app)
+        yield app
+        telemetry_buffer.clear()
+        vehicle_state_cache.clear()
+
+
+@pytest.fixture
+def statements(app):
+    executed = []
+    listener = lambda conn, cursor, statement, *args: executed.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    yield executed
+    event.remove(db.engine, 'before_cursor_execute', listener)
+
+
+def test_reads_served_from_cache(app, statements):
+    assert get_state_handler('1') == 'В поездке'
+    assert flight_info_handler('1').startswith('$Flight 0')
+    assert statements == []
+
+
+def test_write_through(app):
+    force_disarm_handler('1')
+    set_delay_handler('1', 7)
+    assert vehicle_state_cache.get('1')[:4] == (False, 'В сети', False, 7)
+    assert get_state_handler('1') == 'В сети'
+
+
+def test_latest_telemetry_before_flush(app, statements):
+    for sec, speed in ((2, 20.0), (1, 10.0)):
+        telemetry_handler('1', lat=555000000, lon=370000000, alt=10000, azimuth=0, dop=1.0, sats=10, speed=speed,
+                          record_time=datetime.datetime(2024, 1, 1, 0, 0, sec))
+    assert len(telemetry_buffer) == 2
+    assert get_telemetry_handler('1').get_json()['speed'] == 20.0
+    assert statements == []
+
+
+
+def test_concurrent_writers_keep_commit_order(app, monkeypatch):
+    # первый запрос фиксирует изменения и задерживается перед обновлением кэша
+    paused, resume = threading.Event(), threading.Event()
+    update_uav = vehicle_state_cache.update_uav
+
+    def slow_update_uav(uav_entity, only_missing=False):
+        if threading.current_thread().name == 'first':
+            paused.set()
+            resume.wait(5)
+        update_uav(uav_entity, only_missing)
+
+    monkeypatch.setattr(vehicle_state_cache, 'update_uav', slow_update_uav)
+
+    def run(handler, *args):
+        with app.app_context():
+            handler(*args)
+
+    first = threading.Thread(target=run, args=(admin_kill_switch_handler, '1'), name='first')
+    second = threading.Thread(target=run, args=(force_disarm_all_handler,), name='second')
+    first.start()
+    assert paused.wait(5)
+    second.start()
+    # второй запрос ждет, пока первый не обновит кэш
+    second.join(0.2)
+    assert second.is_alive()
+    resume.set()
+    first.join(5)
+    second.join(5)
+
+    db.session.expire_all()
+    stored = db.session.get(Uav, '1')
+    assert vehicle_state_cache.get('1')[:3] == (stored.is_armed, stored.state, stored.kill_switch_state)
+    assert vehicle_state_cache.get('1').state == 'В сети'
+
+
+def test_startup_check_reloads_mismatch(app):
+    Uav.query.filter_by(id='1').update({'state': 'Kill switch ON', 'kill_switch_state': True})
+    db.session.add(Uav(id='2', is_armed=False, state='В сети', kill_switch_state=False))
+    db.session.commit()
+    assert get_state_handler('1') == 'В поездке'
+
+    assert vehicle_state_cache.check(db.session) == ['1']
+    assert get_state_handler('1') == 'Kill switch ON'
+    assert get_state_handler('2') == 'В сети'
+
+
+def test_fleet_snapshot_delta(app, statements):
+    db.session.add(Uav(id='2', is_armed=False, state='В сети', kill_switch_state=False))
+    db.session.commit()
+    vehicle_state_cache.check(db.session)
+    statements.clear()
+
+    snapshot = fleet_snapshot_handler().get_json()
+    assert snapshot['full'] and [vehicle[0] for vehicle in snapshot['vehicles']] == ['1', '2']
+    vehicle = dict(zip(snapshot['fields'], snapshot['vehicles'][0]))
+    assert (vehicle['state'], vehicle['delay'], vehicle['mission_state'], vehicle['lat']) == \
+        ('В поездке', 5, NOT_FOUND, None)
+
+    telemetry_handler('2', lat=555000000, lon=370000000, alt=10000, azimuth=0, dop=1.0, sats=10, speed=20.0,
+                      record_time=datetime.datetime(2024, 1, 1))
+    delta = fleet_snapshot_handler(since=snapshot['version']).get_json()
+    assert not delta['full'] and [vehicle[0] for vehicle in delta['vehicles']] == ['2']
+    assert dict(zip(delta['fields'], delta['vehicles'][0]))['speed'] == 20.0
+    assert statements == []
+
+    response = fleet_snapshot_handler(since=delta['version'], etag=f'"{delta["version"]}"')
+    assert response.status_code == 304 and response.get_data() == b''
+
+
+def test_fleet_snapshot_full_after_reload(app):
+    version = fleet_snapshot_handler().get_json()['version']
+    vehicle_state_cache.check(db.session)
+    snapshot = fleet_snapshot_handler(since=version).get_json()
+    assert snapshot['full'] and len(snapshot['vehicles']) == 1
@@ -0,0 +1,60 @@
+import math
+import random
+import time
+from utils.utils import get_new_polygon_feature, is_point_in_polygon
+from utils.zone_index import ForbiddenZonesIndex
+
+
+def make_zones(polygons):
+    return {
+        "type": "FeatureCollection",
+        "features": [get_new_polygon_feature(name, coordinates) for name, coordinates in polygons.items()]
+    }
+
+
+SQUARE = [[0, 0], [4, 0], [4, 4], [0, 4], [0, 0]]
+TRIANGLE = [[10, 10], [14, 10], [12, 14], [10, 10]]
+
+
+def test_point_in_zones():
+    index = ForbiddenZonesIndex(make_zones({'square': SQUARE, 'triangle': TRIANGLE}))
+    # координаты зон заданы как [lon, lat]
+    assert index.zones_containing_point(lat=2, lon=2) == ['square']
+    assert index.zones_containing_point(lat=11, lon=12) == ['triangle']
+    assert index.zones_containing_point(lat=5, lon=5) == []
+    assert index.is_point_forbidden(lat=4, lon=2)
+    assert not index.is_point_forbidden(lat=13.9, lon=10.1)
+
+def test_point_on_boundary():
+    index = ForbiddenZonesIndex(make_zones({'square': SQUARE}))
+    assert index.is_point_forbidden(lat=4, lon=4)
+    assert index.is_point_forbidden(lat=2, lon=4)
+    assert index.is_point_forbidden(lat=0, lon=2)
+
+def test_matches_ray_casting():
+    random.seed(1)
+    polygon = [[random.uniform(0, 10), random.uniform(0, 10)] for _ in range(12)]
+    polygon.sort(key=lambda p: math.atan2(p[1] - 5, p[0] - 5))
+    index = ForbiddenZonesIndex(make_zones({'zone': polygon}))
+    for _ in range(500):
+        x, y = random.uniform(-1, 11), random.uniform(-1, 11)
+        assert index.is_point_forbidden(lat=y, lon=x) == is_point_in_polygon((x, y), polygon)
+
+def test_check_path():
+    index = ForbiddenZonesIndex(make_zones({'square': SQUARE, 'triangle': TRIANGLE}))
+    # путь (lat, lon) проходит сквозь квадрат, ни одна из точек не лежит внутри
+    path = [(2, -1), (2, 5), (20, 20)]
+    assert index.check_path(path) == [(0, 'square'), (1, 'triangle')]
+    assert index.check_path([(5, 5), (9, 9)]) == []
+    assert index.check_path([(11, 12)]) == [(0, 'triangle')]
+
+def test_many_zones_query_time():
+    zones = {}
+    for i in range(5000):
+        x, y = (i % 100) * 0.01, (i // 100) * 0.01
+        zones[f'z{i}'] = [[x, y], [x + 0.005, y], [x + 0.005, y + 0.005], [x, y + 0.005], [x, y]]
+    index = ForbiddenZonesIndex(make_zones(zones))
+    started = time.perf_counter()
+    for _ in range(100):
+        assert index.zones_containing_point(lat=0.2525, lon=0.3325) == ['z2533']
+    assert (time.perf_counter() - started) / 100 < 1e-3
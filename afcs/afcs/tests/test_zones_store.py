@@ -0,0 +1,48 @@
+import json
+import utils.zones_store as zones_store
+from utils.utils import get_new_polygon_feature, generate_forbidden_zones_string, get_sha256_hex
+from utils.zones_store import ForbiddenZonesStore
+
+
+SQUARE = [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0], [0.0, 0.0]]
+TRIANGLE = [[2.0, 2.0], [3.0, 2.0], [2.5, 3.0], [2.0, 2.0]]
+
+
+def make_store(tmp_path, monkeypatch):
+    deltas = []
+    monkeypatch.setattr(zones_store.afcs_utils, 'compute_and_save_forbidden_zones_delta',
+                        lambda old, new: deltas.append((old, new)))
+    path = tmp_path / 'zones.json'
+    path.write_text(json.dumps({
+        "type": "FeatureCollection",
+        "features": [get_new_polygon_feature('square', SQUARE)]
+    }))
+    return ForbiddenZonesStore(str(path)), path, deltas
+
+
+def test_snapshot_is_cached(tmp_path, monkeypatch):
+    store, path, _ = make_store(tmp_path, monkeypatch)
+    snapshot = store.snapshot()
+    assert snapshot.version == 1
+    assert snapshot.names == ('square',)
+    assert snapshot.zones_hash == get_sha256_hex(generate_forbidden_zones_string(snapshot.zones))
+    path.unlink()
+    assert store.snapshot() is snapshot
+
+
+def test_set_and_delete_zone(tmp_path, monkeypatch):
+    store, path, deltas = make_store(tmp_path, monkeypatch)
+    store.set_zone('triangle', TRIANGLE)
+    snapshot = store.snapshot()
+    assert snapshot.version == 2
+    assert snapshot.names == ('square', 'triangle')
+    assert snapshot.coordinates_by_name['triangle'] == TRIANGLE
+    assert snapshot.index.zones_containing_point(lat=2.5, lon=2.5) == ['triangle']
+    assert json.loads(path.read_text()) == snapshot.zones
+
+    assert store.delete_zone('square')
+    assert not store.delete_zone('square')
+    assert store.snapshot().names == ('triangle',)
+    assert store.version == 3
+    assert len(deltas) == 2
+    assert all('change_type' not in zone['properties'] for zone in store.snapshot().zones['features'])
@@ -1,16 +1,40 @@
 import socket
 import time
+from itertools import chain
 from threading import Thread
-from flask import jsonify
+from flask import jsonify, Response, stream_with_context
+from afcs_server import db
 from utils.db_utils import *
 from utils.utils import *
+from utils.zones_store import forbidden_zones_store
+from utils.telemetry_buffer import telemetry_buffer
+from utils.decisions import DecisionRegistry
+from utils.state_notifier import vehicle_state_notifier
+from utils.mqtt_ingest import mqtt_ingest_pool
+from utils.telemetry_csv import TELEMETRY_CSV_CHUNK_ROWS, iter_csv_from_telemetry, telemetry_csv_header, \
+    telemetry_csv_query
+from utils.telemetry_rollups import TELEMETRY_ROLLUP_RESOLUTIONS_SEC, choose_resolution
+from utils.vehicle_state import vehicle_state_cache
+from utils.token_cache import token_cache
+from utils.storage import read_engine
 
 ENABLE_MAVLINK = False
 MAVLINK_CONNECTIONS_NUMBER = 10
 OUT_ADDR = 'localhost'
 
-arm_queue = set()
-revise_mission_queue = set()
+# время ожидания решения оператора в секундах, None - без ограничения
+ARM_DECISION_TIMEOUT_SEC = None
+REVISE_MISSION_DECISION_TIMEOUT_SEC = None
+# долгий опрос состояния: максимальное время ожидания изменения и число
+# одновременно ожидающих запросов (каждый занимает поток WSGI)
+LONG_POLL_TIMEOUT_SEC = 20
+LONG_POLL_MAX_WAITERS = 3
+# поля строки БПЛА в ответе fleet_snapshot_handler
+FLEET_SNAPSHOT_FIELDS = ['id', 'state', 'is_armed', 'kill_switch', 'delay', 'mission_state',
+                         'lat', 'lon', 'alt', 'azimuth', 'dop', 'sats', 'speed']
+
+arm_queue = DecisionRegistry()
+revise_mission_queue = DecisionRegistry()
 modes = {
     "display_only": False
 }
@@ -106,7 +130,8 @@ def authorized_request(handler_func, token: str, **kwargs):
 
 def check_user_token(token):
     """
-    Проверяет валидность токена пользователя.
+    Проверяет валидность токена пользователя. Подтвержденные токены
+    проверяются по кэшу без обращения к БД.
 
     Args:
         token (str): Токен для проверки.
@@ -114,11 +139,7 @@ def check_user_token(token):
     Returns:
         bool: True, если токен валиден, иначе False.
     """
-    users = get_entities_by_field(User, User.access_token, token)
-    if users and users.count() != 0:
-        return True
-    else:
-        return False
+    return token_cache.check(token)
 
 
 def regular_request(handler_func, **kwargs):
@@ -157,6 +178,8 @@ def key_kos_exchange_handler(id: str, n: str, e: str):
     key_entity = get_entity_by_key(UavPublicKeys, id)
     if key_entity == None:
         save_public_key(n, e, f'kos{id}')
+    else:
+        cache_public_key(f'kos{id}', key_entity.n, key_entity.e)
     afcs_n, afcs_e = get_key('afcs', private=False)
     str_to_send = f'$Key: {hex(afcs_n)[2:]} {hex(afcs_e)[2:]}'
     return str_to_send
@@ -184,6 +207,7 @@ def key_ms_exchange_handler(id: str):
         key_entity.n = n
         key_entity.e = e
         commit_changes()
+        cache_public_key(key_group, n, e)
     afcs_key_pk = get_key('afcs', private=True).publickey()
     afcs_n, afcs_e = afcs_key_pk.n, afcs_key_pk.e
     str_to_send = f'$Key: {hex(afcs_n)[2:]} {hex(afcs_e)[2:]}'
@@ -203,12 +227,13 @@ def auth_handler(id: str):
     uav_entity = get_entity_by_key(Uav, id)
     if not uav_entity:
         uav_entity = Uav(id=id, is_armed=False, state='В сети', kill_switch_state=False)
-        add_and_commit(uav_entity)
+        add_changes(uav_entity)
     else:
         uav_entity.is_armed = False
         uav_entity.state = 'В сети'
         uav_entity.kill_switch_state = False
-        commit_changes()
+    vehicle_state_cache.commit([uav_entity])
+    vehicle_state_notifier.notify(id)
     
     return f'$Auth id={id}'
 
@@ -231,15 +256,15 @@ def arm_handler(id: str):
     else:
         mission = get_entity_by_key(Mission, id)
         if mission and mission.is_accepted == True:
-            arm_queue.add(id)
+            arm_queue.register(id)
             uav_entity.state = 'Ожидает'
-            commit_changes()
+            vehicle_state_cache.commit([uav_entity])
             decision = _arm_wait_decision(id)
             if decision == ARMED:
                 uav_entity.state = 'В поездке'
             else:
                 uav_entity.state = 'В сети'
-            commit_changes()
+            vehicle_state_cache.commit([uav_entity])
             return f'$Arm {decision}$Delay {uav_entity.delay}'
         else:
             return f'$Arm {DISARMED}$Delay {uav_entity.delay}'
@@ -253,15 +278,28 @@ def _arm_wait_decision(id: str):
         id (str): Идентификатор БПЛА.
 
     Returns:
-        str: Решение об арме (ARMED или DISARMED).
+        str: Решение об арме (ARMED или DISARMED), DISARMED по истечении времени ожидания.
     """
-    while id in arm_queue:
-        time.sleep(0.1)
-    uav_entity = get_entity_by_key(Uav, id)
-    if uav_entity.is_armed:
-        return ARMED
-    else:
-        return DISARMED
+    return arm_queue.wait(id, timeout=ARM_DECISION_TIMEOUT_SEC, default=DISARMED)
+
+
+def _get_vehicle_state(id: str):
+    """
+    Возвращает последнее состояние БПЛА из кэша, при отсутствии в кэше - из БД.
+
+    Args:
+        id (str): Идентификатор БПЛА.
+
+    Returns:
+        VehicleState: Состояние БПЛА или None, если БПЛА не найден.
+    """
+    vehicle_state = vehicle_state_cache.get(id)
+    if vehicle_state is None:
+        uav_entity = get_entity_by_key(Uav, id)
+        if uav_entity:
+            vehicle_state_cache.update_uav(uav_entity, only_missing=True)
+            vehicle_state = vehicle_state_cache.get(id)
+    return vehicle_state
 
 
 def fly_accept_handler(id: str):
@@ -274,13 +312,13 @@ def fly_accept_handler(id: str):
     Returns:
         str: Статус арма БПЛА.
     """
-    uav_entity = get_entity_by_key(Uav, id)
-    if not uav_entity:
+    vehicle_state = _get_vehicle_state(id)
+    if not vehicle_state:
         return NOT_FOUND
-    elif uav_entity.is_armed:
-        return f'$Arm {ARMED}$Delay {uav_entity.delay}'
+    elif vehicle_state.is_armed:
+        return f'$Arm {ARMED}$Delay {vehicle_state.delay}'
     else:
-        return f'$Arm {DISARMED}$Delay {uav_entity.delay}'
+        return f'$Arm {DISARMED}$Delay {vehicle_state.delay}'
 
 
 def kill_switch_handler(id: str):
@@ -293,10 +331,10 @@ def kill_switch_handler(id: str):
     Returns:
         str: Состояние аварийного выключателя.
     """
-    uav_entity = get_entity_by_key(Uav, id)
-    if not uav_entity:
+    vehicle_state = _get_vehicle_state(id)
+    if not vehicle_state:
         return NOT_FOUND
-    elif uav_entity.kill_switch_state:
+    elif vehicle_state.kill_switch_state:
         return f'$KillSwitch {KILL_SWITCH_ON}'
     else:
         return f'$KillSwitch {KILL_SWITCH_OFF}'
@@ -312,23 +350,100 @@ def flight_info_handler(id: str) -> str:
     Returns:
         str: Состояние полета БПЛА.
     """
-    uav_entity = get_entity_by_key(Uav, id)
-    if not uav_entity:
+    vehicle_state = _get_vehicle_state(id)
+    if not vehicle_state:
         return NOT_FOUND
     else:
         forbidden_zones_hash = get_forbidden_zones_hash_handler(id)
-        delay = f'$Delay {uav_entity.delay}'
-        if uav_entity.kill_switch_state:
+        delay = f'$Delay {vehicle_state.delay}'
+        if vehicle_state.kill_switch_state:
             status = '$Flight -1'
-        elif uav_entity.is_armed:
+        elif vehicle_state.is_armed:
             status = '$Flight 0'
         else:
             status = '$Flight 1'
         return ''.join([status, forbidden_zones_hash, delay])
 
 
+def flight_info_wait_handler(id: str, version: int = None) -> str:
+    """
+    Обрабатывает долгий опрос информации полета БПЛА: ответ отправляется сразу
+    после изменения состояния БПЛА или запрещенных зон относительно версии,
+    известной БПЛА, либо по истечении LONG_POLL_TIMEOUT_SEC.
+
+    Args:
+        id (str): Идентификатор БПЛА.
+        version (int): Версия состояния из предыдущего ответа, None - ответить сразу.
+
+    Returns:
+        str: Состояние полета БПЛА (как в flight_info_handler) и версия состояния.
+    """
+    if version is None:
+        current_version = vehicle_state_notifier.version(id)
+    else:
+        current_version = vehicle_state_notifier.wait(id, version, LONG_POLL_TIMEOUT_SEC,
+                                                      max_waiters=LONG_POLL_MAX_WAITERS)
+    flight_info = flight_info_handler(id)
+    if flight_info == NOT_FOUND:
+        return NOT_FOUND
+    return f'{flight_info}$Version {current_version}'
+
+
+def _get_telemetry_vehicle(id: str):
+    """
+    Возвращает состояние БПЛА, приславшего телеметрию. В режиме только отображения
+    неизвестный БПЛА создается.
+
+    Args:
+        id (str): Идентификатор БПЛА.
+
+    Returns:
+        VehicleState: Состояние БПЛА или None, если он не найден.
+    """
+    vehicle_state = _get_vehicle_state(id)
+    if not vehicle_state and modes['display_only']:
+        uav_entity = Uav(id=id, is_armed=False, state='В сети', kill_switch_state=False)
+        add_changes(uav_entity)
+        vehicle_state_cache.commit([uav_entity])
+        vehicle_state = vehicle_state_cache.get(id)
+    return vehicle_state
+
+
+def _telemetry_row(uav_id: str, lat, lon, alt, azimuth, dop, sats, speed, record_time=None) -> dict:
+    """
+    Приводит значения телеметрии к записи UavTelemetry.
+
+    Args:
+        uav_id (str): Идентификатор БПЛА.
+        lat, lon: Широта и долгота в 1e-7 градуса.
+        alt: Высота в см.
+        azimuth: Азимут в 1e-7 градуса.
+        dop, sats, speed: Снижение точности, количество спутников, скорость.
+        record_time (datetime): Время измерения, по умолчанию время получения.
+
+    Returns:
+        dict: Значения столбцов UavTelemetry.
+    """
+    lat = cast_wrapper(lat, float)
+    if lat: lat /= 1e7
+    lon = cast_wrapper(lon, float)
+    if lon: lon /= 1e7
+    alt = cast_wrapper(alt, float)
+    if alt: alt /= 1e2
+    azimuth = cast_wrapper(azimuth, float)
+    if azimuth: azimuth /= 1e7
+    dop = cast_wrapper(dop, float)
+    sats = cast_wrapper(sats, int)
+    speed = cast_wrapper(speed, float)
+    if record_time is None:
+        record_time = datetime.datetime.utcnow()
+    return dict(uav_id=uav_id, lat=lat, lon=lon, alt=alt, azimuth=azimuth,
+                dop=dop, sats=sats, speed=speed, record_time=record_time)
+
+
 def telemetry_handler(id: str, lat: float, lon: float, alt: float,
-                      azimuth: float, dop: float, sats: float, speed: float):
+                      azimuth: float, dop: float, sats: float, speed: float,
+                      record_time=None):
     """
     Обрабатывает телеметрию БПЛА.
 
@@ -341,48 +456,50 @@ def telemetry_handler(id: str, lat: float, lon: float, alt: float,
         dop (float): Снижение точности.
         sats (float): Количество спутников.
         speed (float): Скорость.
+        record_time (datetime): Время измерения, по умолчанию время получения.
 
     Returns:
         str: Статус арма БПЛА.
     """
-    uav_entity = get_entity_by_key(Uav, id)
-    if not uav_entity and modes['display_only']:
-        uav_entity = Uav(id=id, is_armed=False, state='В сети', kill_switch_state=False)
-        add_and_commit(uav_entity)
-        
-    if not uav_entity:
+    vehicle_state = _get_telemetry_vehicle(id)
+    if not vehicle_state:
         return NOT_FOUND
     else:
-        lat = cast_wrapper(lat, float)
-        if lat: lat /= 1e7
-        lon = cast_wrapper(lon, float)
-        if lon: lon /= 1e7
-        alt = cast_wrapper(alt, float)
-        if alt: alt /= 1e2
-        azimuth = cast_wrapper(azimuth, float)
-        if azimuth: azimuth /= 1e7
-        dop = cast_wrapper(dop, float)
-        sats = cast_wrapper(sats, int)
-        speed = cast_wrapper(speed, float)
-        record_time = datetime.datetime.utcnow()
-        uav_telemetry_entity = get_entity_by_key(UavTelemetry, (uav_entity.id, record_time))
-        if not uav_telemetry_entity:
-            uav_telemetry_entity = UavTelemetry(uav_id=uav_entity.id, lat=lat, lon=lon, alt=alt,
-                                                azimuth=azimuth, dop=dop, sats=sats, speed=speed, record_time=record_time)
-            add_and_commit(uav_telemetry_entity)
-        else:
-            uav_telemetry_entity.lat = lat
-            uav_telemetry_entity.lon = lon
-            uav_telemetry_entity.alt = alt
-            uav_telemetry_entity.azimuth = azimuth
-            uav_telemetry_entity.dop = dop
-            uav_telemetry_entity.sats = sats
-            uav_telemetry_entity.speed = speed
-            commit_changes()
-        if not uav_entity.is_armed:
+        row = _telemetry_row(id, lat, lon, alt, azimuth, dop, sats, speed, record_time)
+        telemetry_buffer.add(row)
+        vehicle_state_cache.update_telemetry(id, [row])
+        if not vehicle_state.is_armed:
             return f'$Arm: {DISARMED}'
         else:
             return f'$Arm: {ARMED}'
+
+
+def telemetry_batch_handler(id: str, samples: list):
+    """
+    Обрабатывает пакет телеметрии одного БПЛА: БПЛА ищется один раз,
+    все измерения добавляются в буфер телеметрии вместе.
+
+    Args:
+        id (str): Идентификатор БПЛА.
+        samples (list): Аргументы telemetry_handler для каждого измерения
+            (без идентификатора БПЛА).
+
+    Returns:
+        str: Статус арма БПЛА.
+    """
+    vehicle_state = _get_telemetry_vehicle(id)
+    if not vehicle_state:
+        return NOT_FOUND
+    rows = [_telemetry_row(id, sample.get('lat'), sample.get('lon'), sample.get('alt'),
+                           sample.get('azimuth'), sample.get('dop'), sample.get('sats'), sample.get('speed'),
+                           sample.get('record_time'))
+            for sample in samples]
+    telemetry_buffer.add_many(rows)
+    vehicle_state_cache.update_telemetry(id, rows)
+    if not vehicle_state.is_armed:
+        return f'$Arm: {DISARMED}'
+    else:
+        return f'$Arm: {ARMED}'
     
 
 def fmission_kos_handler(id: str):
@@ -417,10 +534,7 @@ def get_all_forbidden_zones_handler(id: str):
         str: Строка с информацией о запрещенных зонах или NOT_FOUND.
     """
     try:
-        with open(FORBIDDEN_ZONES_PATH, 'r', encoding='utf-8') as f:
-            forbidden_zones = json.load(f)
-            result_str = generate_forbidden_zones_string(forbidden_zones)
-            return result_str
+        return forbidden_zones_store.snapshot().zones_string
 
     except Exception as e:
         print(e)
@@ -462,11 +576,8 @@ def get_forbidden_zones_hash_handler(id: str):
         str: SHA-256 хэш строки запрещенных зон или NOT_FOUND.
     """
     try:
-        with open(FORBIDDEN_ZONES_PATH, 'r', encoding='utf-8') as f:
-            forbidden_zones = json.load(f)
-            result_str = generate_forbidden_zones_string(forbidden_zones)
-            hash_value = get_sha256_hex(result_str)
-            return f'$ForbiddenZonesHash {hash_value}'
+        hash_value = forbidden_zones_store.snapshot().zones_hash
+        return f'$ForbiddenZonesHash {hash_value}'
 
     except Exception as e:
         print(e)
@@ -490,7 +601,8 @@ def fmission_ms_handler(id: str, mission_str: str):
         uav_entity = get_entity_by_key(Uav, id)
         if not uav_entity and modes['display_only']:
             uav_entity = Uav(id=id, is_armed=False, state='В сети', kill_switch_state=False)
-            add_and_commit(uav_entity)
+            add_changes(uav_entity)
+            vehicle_state_cache.commit([uav_entity])
             
         mission_entity = get_entity_by_key(Mission, id)
         if mission_entity:
@@ -504,7 +616,7 @@ def fmission_ms_handler(id: str, mission_str: str):
         for idx, cmd in enumerate(encoded_mission):
             mission_step_entity = MissionStep(mission_id=id, step=idx, operation=cmd)
             add_changes(mission_step_entity)
-        commit_changes()
+        vehicle_state_cache.commit(missions=[mission_entity])
         
     return mission_verification_status
 
@@ -523,24 +635,25 @@ def revise_mission_handler(id: str, mission: str):
     for idx, cmd in enumerate(mission_list):
         mission_step_entity = MissionStep(mission_id=id, step=idx, operation=cmd)
         add_changes(mission_step_entity)
-    commit_changes()
+    vehicle_state_cache.commit(missions=[mission_entity])
+    revise_mission_queue.register(id)
+    # задание ожидает решения (состояние миссии '2')
+    vehicle_state_cache.touch(id)
     
     uav_entity = get_entity_by_key(Uav, id)
     if uav_entity:
         uav_entity.is_armed = False
         uav_entity.state = 'Ожидает'
-        commit_changes()
+        vehicle_state_cache.commit([uav_entity])
+        vehicle_state_notifier.notify(id)
         
-    revise_mission_queue.add(id)
-    while id in revise_mission_queue:
-        time.sleep(0.1)
-        
-    mission_entity = get_entity_by_key(Mission, id)
-    if mission_entity:
-        if mission_entity.is_accepted:
-            return '$Approve 0'
-        else:
-            return '$Approve 1'
+    decision = revise_mission_queue.wait(id, timeout=REVISE_MISSION_DECISION_TIMEOUT_SEC, default=1)
+    # задание больше не ожидает решения (состояние миссии '2' в get_mission_state_handler)
+    vehicle_state_cache.touch(id)
+    if decision == 0:
+        return '$Approve 0'
+    else:
+        return '$Approve 1'
 
 
 def revise_mission_decision_handler(id: str, decision: int):
@@ -557,8 +670,9 @@ def revise_mission_decision_handler(id: str, decision: int):
             uav_entity.is_armed = False
             uav_entity.state = 'В сети'
             mission_entity.is_accepted = False
-        commit_changes()
-        revise_mission_queue.remove(id)
+        vehicle_state_cache.commit([uav_entity], [mission_entity])
+        vehicle_state_notifier.notify(id)
+        revise_mission_queue.resolve(id, decision)
         return f'$Arm: {decision}'
     else:
         return f'$Arm: -1'
@@ -624,6 +738,7 @@ def admin_auth_handler(login: str, password: str):
     else:
         password_hash = get_sha256_hex(password)
         if password_hash == user_entity.password_hash:
+            token_cache.add(user_entity.access_token)
             return user_entity.access_token
         else:
             return ''
@@ -645,8 +760,9 @@ def arm_decision_handler(id: str, decision: int):
         return NOT_FOUND
     elif id in arm_queue:
         uav_entity.is_armed = True if decision == ARMED else False
-        commit_changes()
-        arm_queue.remove(id)
+        vehicle_state_cache.commit([uav_entity])
+        vehicle_state_notifier.notify(id)
+        arm_queue.resolve(id, ARMED if decision == ARMED else DISARMED)
         return f'$Arm: {decision}'
     else:
         return f'$Arm: -1'
@@ -668,7 +784,8 @@ def force_disarm_handler(id: str):
     else:
         uav_entity.is_armed = False
         uav_entity.state = 'В сети'
-        commit_changes()
+        vehicle_state_cache.commit([uav_entity])
+        vehicle_state_notifier.notify(id)
         return OK
 
 
@@ -683,7 +800,8 @@ def force_disarm_all_handler():
     for uav_entity in uav_entities:
         uav_entity.is_armed = False
         uav_entity.state = 'В сети'
-    commit_changes()
+    vehicle_state_cache.commit(uav_entities)
+    vehicle_state_notifier.notify()
     return OK
 
 
@@ -697,11 +815,11 @@ def get_state_handler(id: str):
     Returns:
         str: Состояние БПЛА или NOT_FOUND.
     """
-    uav_entity = get_entity_by_key(Uav, id)
-    if not uav_entity:
+    vehicle_state = _get_vehicle_state(id)
+    if not vehicle_state:
         return NOT_FOUND
     else:
-        return uav_entity.state
+        return vehicle_state.state
 
 
 def get_mission_handler(id: str):
@@ -735,38 +853,69 @@ def get_telemetry_handler(id: str):
     Returns:
         json: JSON-объект с телеметрическими данными или NOT_FOUND.
     """
-    uav_telemetry_entity = get_entities_by_field_with_order(UavTelemetry, UavTelemetry.uav_id, id, UavTelemetry.record_time.desc()).first()
-    if not uav_telemetry_entity:
-        return jsonify({'error': 'NOT_FOUND'})
+    vehicle_state = _get_vehicle_state(id)
+    if vehicle_state and vehicle_state.telemetry:
+        latest = vehicle_state.telemetry
     else:
-        telemetry = {
-            'lat': uav_telemetry_entity.lat,
-            'lon': uav_telemetry_entity.lon,
-            'alt': uav_telemetry_entity.alt,
-            'azimuth': uav_telemetry_entity.azimuth,
-            'dop': uav_telemetry_entity.dop,
-            'sats': uav_telemetry_entity.sats,
-            'speed': uav_telemetry_entity.speed
-        }
-        return jsonify(telemetry)
-
-
-def get_telemetry_csv_handler(id: str):
-    """
-    Обрабатывает запрос на получение всей телеметрии БПЛА в формате CSV.
+        telemetry_buffer.flush()
+        uav_telemetry_entity = get_entities_by_field_with_order(UavTelemetry, UavTelemetry.uav_id, id, UavTelemetry.record_time.desc()).first()
+        if not uav_telemetry_entity:
+            return jsonify({'error': 'NOT_FOUND'})
+        latest = {column.name: getattr(uav_telemetry_entity, column.name) for column in UavTelemetry.__table__.columns}
+        if vehicle_state:
+            vehicle_state_cache.update_telemetry(id, [latest])
+    telemetry = {
+        'lat': latest['lat'],
+        'lon': latest['lon'],
+        'alt': latest['alt'],
+        'azimuth': latest['azimuth'],
+        'dop': latest['dop'],
+        'sats': latest['sats'],
+        'speed': latest['speed']
+    }
+    return jsonify(telemetry)
+
+
+def get_telemetry_csv_handler(id: str, start=None, end=None, step: int = None,
+                              resolution: int = None, max_points: int = None):
+    """
+    Обрабатывает запрос на получение телеметрии БПЛА в формате CSV.
+
+    Строки читаются из БД частями (fetchmany) без создания объектов ORM
+    через движок чтения и отправляются клиенту по мере формирования. Телеметрия выгружается из исходных
+    записей или из агрегатов (TELEMETRY_ROLLUP_RESOLUTIONS_SEC), уровень задается
+    явно или выбирается по предельному числу точек.
 
     Args:
         id (str): Идентификатор БПЛА.
+        start (datetime): Начало интервала времени измерений, None - без ограничения.
+        end (datetime): Конец интервала времени измерений, None - без ограничения.
+        step (int): Прореживание: каждая step-я строка, None - все строки.
+        resolution (int): 0 - исходные записи, иначе длительность интервала агрегата
+            в секундах, None - выбор по max_points.
+        max_points (int): Предельное число строк для выбора уровня, None - исходные записи.
 
     Returns:
-        str: CSV-строка с телеметрическими данными или NOT_FOUND.
+        Response: Потоковый ответ с CSV-строкой телеметрических данных.
     """
-    uav_telemetry_entities = get_entities_by_field_with_order(UavTelemetry, UavTelemetry.uav_id, id, UavTelemetry.record_time.asc())
-    if not uav_telemetry_entities:
-        return NOT_FOUND
+    telemetry_buffer.flush()
+    engine = read_engine()
+    if resolution is None:
+        with engine.connect() as connection:
+            resolution = choose_resolution(connection, id, start, end, max_points)
+    query = telemetry_csv_query(id, start, end, step, resolution)
+    header = telemetry_csv_header(resolution)
+
+    def generate():
+        with engine.connect() as connection:
+            rows = connection.execution_options(stream_results=True).execute(query)
+            try:
+                yield from iter_csv_from_telemetry(chain.from_iterable(rows.partitions(TELEMETRY_CSV_CHUNK_ROWS)),
+                                                   header=header)
+            finally:
+                rows.close()
 
-    csv_data = create_csv_from_telemetry(uav_telemetry_entities)
-    return csv_data
+    return Response(stream_with_context(generate()), mimetype='text/csv')
 
 
 def get_waiter_number_handler():
@@ -779,6 +928,16 @@ def get_waiter_number_handler():
     return str(len(arm_queue))
 
 
+def get_mqtt_ingest_stats_handler():
+    """
+    Обрабатывает запрос на получение статистики обработки сообщений MQTT.
+
+    Returns:
+        json: JSON-объект со статистикой пула обработки.
+    """
+    return jsonify(mqtt_ingest_pool.stats())
+
+
 def mission_decision_handler(id: str, decision: int):
     """
     Обрабатывает решение о принятии или отклонении миссии.
@@ -798,7 +957,7 @@ def mission_decision_handler(id: str, decision: int):
             mission_entity.is_accepted = True
         else:
             mission_entity.is_accepted = False
-        commit_changes()
+        vehicle_state_cache.commit(missions=[mission_entity])
         return OK
 
 
@@ -819,7 +978,8 @@ def admin_kill_switch_handler(id: str):
         uav_entity.is_armed = False
         uav_entity.kill_switch_state = True
         uav_entity.state = "Kill switch ON"
-        commit_changes()
+        vehicle_state_cache.commit([uav_entity])
+        vehicle_state_notifier.notify(id)
         return OK
 
 
@@ -845,19 +1005,71 @@ def get_mission_state_handler(id: str):
     Returns:
         str: Состояние миссии (принята/не принята) или NOT_FOUND.
     """
+    return _mission_state(id, _get_vehicle_state(id))
+
+
+def _mission_state(id: str, vehicle_state) -> str:
+    """
+    Возвращает состояние миссии БПЛА по его состоянию из кэша.
+
+    Args:
+        id (str): Идентификатор БПЛА.
+        vehicle_state (VehicleState): Состояние БПЛА или None.
+
+    Returns:
+        str: Состояние миссии (принята/не принята, '2' - ожидает решения по измененному заданию) или NOT_FOUND.
+    """
     if id in revise_mission_queue:
         return '2'
-    uav_entity = get_entity_by_key(Uav, id)
-    if uav_entity:
-        mission = get_entity_by_key(Mission, id)
-        if mission:
-            if mission.is_accepted:
-                return str(MISSION_ACCEPTED)
-            else:
-                return str(MISSION_NOT_ACCEPTED)
+    if vehicle_state and vehicle_state.mission_accepted is not None:
+        if vehicle_state.mission_accepted:
+            return str(MISSION_ACCEPTED)
+        else:
+            return str(MISSION_NOT_ACCEPTED)
     return NOT_FOUND
 
 
+def fleet_snapshot_handler(since: int = None, etag: str = None):
+    """
+    Обрабатывает запрос на получение состояния всех БПЛА одним ответом.
+
+    Ответ строится из кэша состояния БПЛА без обращения к БД. Если передана
+    версия since, возвращаются только БПЛА, изменившиеся после нее (если версия
+    устарела после перезагрузки кэша, возвращается полное состояние, full=true).
+    Версия передается также в заголовке ETag; при совпадении с If-None-Match
+    возвращается 304 без тела.
+
+    Args:
+        since (int): Версия из предыдущего ответа, None - полное состояние.
+        etag (str): Значение заголовка If-None-Match.
+
+    Returns:
+        Response: JSON-объект с версией, признаком полного состояния, числом БПЛА,
+            ожидающих решения об арме, списком полей и строками БПЛА.
+    """
+    version, full, states = vehicle_state_cache.snapshot(since)
+    tag = f'"{version}"'
+    if etag is not None and etag.strip() == tag:
+        response = Response(status=304)
+        response.headers['ETag'] = tag
+        return response
+    vehicles = []
+    for id, vehicle_state in states.items():
+        telemetry = vehicle_state.telemetry or {}
+        vehicles.append([id, vehicle_state.state, vehicle_state.is_armed, vehicle_state.kill_switch_state,
+                         vehicle_state.delay, _mission_state(id, vehicle_state)] +
+                        [telemetry.get(field) for field in FLEET_SNAPSHOT_FIELDS[6:]])
+    response = jsonify({
+        'version': version,
+        'full': full,
+        'waiters': len(arm_queue),
+        'fields': FLEET_SNAPSHOT_FIELDS,
+        'vehicles': vehicles
+    })
+    response.headers['ETag'] = tag
+    return response
+
+
 def change_fly_accept_handler(id: str, decision: int):
     """
     Обрабатывает запрос на изменение статуса принятия полета БПЛА.
@@ -877,7 +1089,9 @@ def change_fly_accept_handler(id: str, decision: int):
         else:
             uav_entity.is_armed = False
             uav_entity.state = 'В сети'
-        commit_changes()
+        vehicle_state_cache.commit([uav_entity])
+        vehicle_state_notifier.notify(id)
+        arm_queue.resolve(id, ARMED if decision == 0 else DISARMED)
         return OK
     return NOT_FOUND
 
@@ -892,17 +1106,9 @@ def get_forbidden_zone_handler(name: str):
     Returns:
         json: JSON-массив с координатами зоны или NOT_FOUND.
     """
-    with open(FORBIDDEN_ZONES_PATH, 'r', encoding='utf-8') as f:
-        forbidden_zones = json.load(f)
-        matching_zone = None
-        for zone in forbidden_zones['features']:
-            if zone['properties'].get('name') == name:
-                matching_zone = zone
-                break
-        if matching_zone:
-            return jsonify(matching_zone['geometry']['coordinates'][0])
-        else:
-            return NOT_FOUND
+    coordinates = forbidden_zones_store.snapshot().coordinates_by_name.get(name)
+    if coordinates:
+        return jsonify(coordinates)
     return NOT_FOUND
 
 
@@ -913,9 +1119,7 @@ def get_forbidden_zones_handler():
     Returns:
         dict: GeoJSON с запрещенными зонами
     """
-    with open(FORBIDDEN_ZONES_PATH, 'r', encoding='utf-8') as f:
-        forbidden_zones = json.load(f)
-    return forbidden_zones
+    return forbidden_zones_store.snapshot().zones
 
 
 def get_forbidden_zones_names_handler():
@@ -925,14 +1129,7 @@ def get_forbidden_zones_names_handler():
     Returns:
         json: JSON-массив с именами запрещенных зон или NOT_FOUND.
     """
-    with open(FORBIDDEN_ZONES_PATH, 'r', encoding='utf-8') as f:
-        forbidden_zones = json.load(f)
-        zones_names = []
-        for zone in forbidden_zones['features']:
-            zones_names.append(zone['properties'].get('name'))
-        return jsonify(zones_names)
-        
-    return NOT_FOUND
+    return jsonify(list(forbidden_zones_store.snapshot().names))
 
 
 def set_forbidden_zone_handler(name: str, geometry: list):
@@ -953,28 +1150,8 @@ def set_forbidden_zone_handler(name: str, geometry: list):
         geometry[idx][0] = round(geometry[idx][0], 7)
         geometry[idx][1] = round(geometry[idx][1], 7)
         
-    forbidden_zones = None
-    
-    with open(FORBIDDEN_ZONES_PATH, 'r', encoding='utf-8') as f:
-        old_zones = json.load(f)
-    
-    with open(FORBIDDEN_ZONES_PATH, 'r', encoding='utf-8') as f:
-        forbidden_zones = json.load(f)
-        existing_zone = False
-        for zone in forbidden_zones['features']:
-            if zone['properties'].get('name') == name:
-                zone['geometry']['coordinates'][0] = geometry
-                existing_zone = True
-        
-        if not existing_zone:
-            new_feature = get_new_polygon_feature(name, geometry)
-            forbidden_zones['features'].append(new_feature)
-    
-    if forbidden_zones is not None:
-        with open(FORBIDDEN_ZONES_PATH, 'w', encoding='utf-8') as f:
-            json.dump(forbidden_zones, f, ensure_ascii=False, indent=4)
-            
-        compute_and_save_forbidden_zones_delta(old_zones, forbidden_zones)
+    forbidden_zones_store.set_zone(name, geometry)
+    vehicle_state_notifier.notify()
     
     return OK
 
@@ -989,27 +1166,55 @@ def delete_forbidden_zone_handler(name: str):
     Returns:
         str: OK в случае успешного удаления или NOT_FOUND.
     """
-    forbidden_zones = None
-    
-    with open(FORBIDDEN_ZONES_PATH, 'r', encoding='utf-8') as f:
-        old_zones = json.load(f)
-    
-    with open(FORBIDDEN_ZONES_PATH, 'r', encoding='utf-8') as f:
-        forbidden_zones = json.load(f)
-        for idx, zone in enumerate(forbidden_zones['features']):
-            if zone['properties'].get('name') == name:
-                forbidden_zones['features'].pop(idx)
-                break
-        
-    if forbidden_zones != None:
-        with open(FORBIDDEN_ZONES_PATH, 'w', encoding='utf-8') as f:
-            json.dump(forbidden_zones, f, ensure_ascii=False, indent=4)
-            
-        compute_and_save_forbidden_zones_delta(old_zones, forbidden_zones)
-        
-        return OK
-    
-    return NOT_FOUND
+    if forbidden_zones_store.delete_zone(name):
+        vehicle_state_notifier.notify()
+    return OK
+
+
+def check_forbidden_zones_handler(lat: str, lon: str):
+    """
+    Обрабатывает запрос на проверку точки по всем запрещенным зонам.
+
+    Args:
+        lat (str): Широта в градусах.
+        lon (str): Долгота в градусах.
+
+    Returns:
+        json: JSON-массив с именами зон, в которые попадает точка, или сообщение об ошибке.
+    """
+    lat = cast_wrapper(lat, float)
+    lon = cast_wrapper(lon, float)
+    if lat is None or lon is None:
+        return 'Bad coordinates'
+    index = forbidden_zones_store.snapshot().index
+    return jsonify(index.zones_containing_point(lat, lon))
+
+
+def check_mission_forbidden_zones_handler(id: str):
+    """
+    Обрабатывает запрос на проверку маршрута полетного задания БПЛА по всем запрещенным зонам.
+
+    Args:
+        id (str): Идентификатор БПЛА.
+
+    Returns:
+        json: JSON-массив нарушений {"segment": номер отрезка, "zone": имя зоны} или NOT_FOUND.
+    """
+    mission = get_entity_by_key(Mission, id)
+    if not mission:
+        return NOT_FOUND
+    mission_steps = get_entities_by_field_with_order(MissionStep, MissionStep.mission_id, id, order_by_field=MissionStep.step)
+    points = []
+    for step in mission_steps:
+        cmd = parse_mission(step.operation)[0]
+        # точки маршрута задают команды дома, путевой точки и посадки
+        if cmd[0] in ('H', 'W', 'L'):
+            points.append((float(cmd[1]), float(cmd[2])))
+    if not points:
+        return NOT_FOUND
+    index = forbidden_zones_store.snapshot().index
+    violations = index.check_path(points)
+    return jsonify([{'segment': segment, 'zone': zone} for segment, zone in violations])
 
 
 def get_delay_handler(id: str):
@@ -1022,11 +1227,11 @@ def get_delay_handler(id: str):
     Returns:
         str: Время до следующего сеанса связи или NOT_FOUND.
     """
-    uav_entity = get_entity_by_key(Uav, id)
-    if not uav_entity:
+    vehicle_state = _get_vehicle_state(id)
+    if not vehicle_state:
         return NOT_FOUND
     else:
-        return str(uav_entity.delay)
+        return str(vehicle_state.delay)
 
 
 def set_delay_handler(id: str, delay: int):
@@ -1045,7 +1250,8 @@ def set_delay_handler(id: str, delay: int):
         return NOT_FOUND
     else:
         uav_entity.delay = delay
-        commit_changes()
+        vehicle_state_cache.commit([uav_entity])
+        vehicle_state_notifier.notify(id)
         return OK
     
     
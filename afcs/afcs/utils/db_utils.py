@@ -1,6 +1,7 @@
 import secrets, os
 from afcs_server import db
 from hashlib import sha256
+from utils.token_cache import token_cache
 
 
 def add_and_commit(entity: db.Model):
@@ -86,6 +87,8 @@ def generate_user(user_model: db.Model):
                        access_token=secrets.token_hex(16))
     db.session.add(user_entity)
     db.session.commit()
+    # прежние токены больше не действуют
+    token_cache.invalidate()
     
 
 def get_entities_by_field(entity: db.Model, field, field_value, order_by_field=None) -> list:
@@ -0,0 +1,83 @@
+from concurrent.futures import Future, TimeoutError
+from threading import Lock
+
+
+class DecisionRegistry:
+    """
+    Реестр ожидающих решения БПЛА.
+
+    Обработчик запроса БПЛА регистрирует ожидание и блокируется на future,
+    обработчик решения оператора передает решение напрямую ожидающему потоку,
+    без периодического опроса и повторного чтения состояния из БД.
+    Проверка `id in registry` и `len(registry)` работают как для множества.
+    """
+    def __init__(self):
+        self._lock = Lock()
+        self._pending = {}
+
+    def __contains__(self, id: str) -> bool:
+        with self._lock:
+            return id in self._pending
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def register(self, id: str) -> Future:
+        """
+        Регистрирует ожидание решения для БПЛА. Повторные запросы того же БПЛА
+        ожидают одно и то же решение.
+
+        Args:
+            id (str): Идентификатор БПЛА.
+
+        Returns:
+            Future: Будущее решение.
+        """
+        with self._lock:
+            future = self._pending.get(id)
+            if future is None:
+                future = Future()
+                self._pending[id] = future
+            return future
+
+    def resolve(self, id: str, decision) -> bool:
+        """
+        Передает решение ожидающим запросам БПЛА.
+
+        Args:
+            id (str): Идентификатор БПЛА.
+            decision: Решение.
+
+        Returns:
+            bool: True, если решение ожидалось.
+        """
+        with self._lock:
+            future = self._pending.pop(id, None)
+            if future is None:
+                return False
+            future.set_result(decision)
+            return True
+
+    def wait(self, id: str, timeout: float = None, default=None):
+        """
+        Регистрирует ожидание и блокирует поток до решения или истечения времени.
+
+        Args:
+            id (str): Идентификатор БПЛА.
+            timeout (float): Время ожидания в секундах, None - без ограничения.
+            default: Результат при истечении времени ожидания.
+
+        Returns:
+            Решение или default.
+        """
+        future = self.register(id)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            with self._lock:
+                if self._pending.get(id) is future:
+                    del self._pending[id]
+                    return default
+            # решение пришло одновременно с истечением времени
+            return future.result()
@@ -0,0 +1,185 @@
+import sys
+import zlib
+from queue import Queue, Empty, Full
+from threading import Lock, Thread
+from afcs_server import db
+
+
+# число рабочих потоков обработки сообщений MQTT
+MQTT_INGEST_WORKERS = 4
+# емкость очереди одного рабочего потока
+MQTT_INGEST_QUEUE_SIZE = 1000
+# максимальное число сообщений, обрабатываемых в одном контексте приложения
+MQTT_INGEST_BATCH_SIZE = 100
+
+
+class MqttIngestPool:
+    """
+    Пул рабочих потоков для обработки сообщений MQTT.
+
+    Поток клиента paho только разбирает сообщение и ставит его в очередь,
+    поэтому задержки БД не останавливают обмен с брокером. Сообщения одного БПЛА
+    всегда попадают в очередь одного и того же рабочего потока и обрабатываются
+    в порядке получения. Рабочий поток забирает из очереди все накопившиеся
+    сообщения (до MQTT_INGEST_BATCH_SIZE) и обрабатывает их в одном контексте
+    приложения; измерения одного БПЛА из пакета (submit_samples) передаются
+    обработчику одним вызовом. При переполнении очереди сообщение отбрасывается, чтобы не
+    блокировать поток paho; отброшенные сообщения учитываются в статистике.
+    """
+    def __init__(self, workers: int = MQTT_INGEST_WORKERS, queue_size: int = MQTT_INGEST_QUEUE_SIZE,
+                 batch_size: int = MQTT_INGEST_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._queues = [Queue(maxsize=queue_size) for _ in range(workers)]
+        self._threads = []
+        self._stats_lock = Lock()
+        self._submitted = 0
+        self._processed = 0
+        self._dropped = 0
+        self._failed = 0
+        self._batches = 0
+        self._max_depth = 0
+
+    def _queue_for(self, key: str) -> Queue:
+        return self._queues[zlib.crc32(str(key).encode()) % len(self._queues)]
+
+    def submit(self, key: str, handler_func, params: dict) -> bool:
+        """
+        Ставит сообщение в очередь обработки.
+
+        Args:
+            key (str): Ключ упорядочивания, идентификатор БПЛА.
+            handler_func (callable): Обработчик запроса.
+            params (dict): Аргументы обработчика.
+
+        Returns:
+            bool: False, если очередь переполнена и сообщение отброшено.
+        """
+        return self._put(key, (handler_func, params, False))
+
+    def submit_samples(self, key: str, handler_func, samples: list) -> bool:
+        """
+        Ставит в очередь измерения БПЛА. Идущие подряд измерения одного БПЛА
+        из одного пакета объединяются и передаются обработчику одним вызовом
+        handler_func(id=key, samples=[...]).
+
+        Args:
+            key (str): Идентификатор БПЛА.
+            handler_func (callable): Обработчик пакета измерений.
+            samples (list): Измерения в порядке получения.
+
+        Returns:
+            bool: False, если очередь переполнена и сообщение отброшено.
+        """
+        return self._put(key, (handler_func, {'id': key, 'samples': samples}, True))
+
+    def drop(self):
+        """
+        Учитывает в статистике сообщение, отброшенное до постановки в очередь.
+        """
+        with self._stats_lock:
+            self._dropped += 1
+
+    def _put(self, key: str, item: tuple) -> bool:
+        q = self._queue_for(key)
+        try:
+            q.put_nowait(item)
+        except Full:
+            self.drop()
+            return False
+        with self._stats_lock:
+            self._submitted += 1
+            self._max_depth = max(self._max_depth, q.qsize())
+        return True
+
+    def _drain(self, q: Queue) -> list:
+        batch = [q.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(q.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _group(batch: list) -> list:
+        # измерения одного БПЛА объединяются до первого другого сообщения этого БПЛА,
+        # чтобы порядок относительно остальных сообщений не менялся
+        calls = []
+        open_samples = {}
+        for handler_func, params, is_samples in batch:
+            key = params.get('id')
+            if not is_samples:
+                open_samples.pop(key, None)
+                calls.append([handler_func, params, 1])
+                continue
+            call = open_samples.get(key)
+            if call is not None and call[0] is handler_func:
+                call[1]['samples'].extend(params['samples'])
+                call[2] += 1
+            else:
+                call = [handler_func, {'id': key, 'samples': list(params['samples'])}, 1]
+                open_samples[key] = call
+                calls.append(call)
+        return calls
+
+    def process_batch(self, batch: list):
+        """
+        Обрабатывает пакет сообщений. Вызывается в контексте приложения.
+
+        Args:
+            batch (list): Элементы очереди (обработчик, аргументы, признак измерений submit_samples).
+        """
+        failed = 0
+        for handler_func, params, messages in self._group(batch):
+            try:
+                handler_func(**params)
+            except Exception as e:
+                failed += messages
+                db.session.rollback()
+                print(f'Error processing MQTT message: {e}', file=sys.stderr)
+        with self._stats_lock:
+            self._processed += len(batch)
+            self._failed += failed
+            self._batches += 1
+
+    def _worker(self, app, q: Queue):
+        while True:
+            batch = self._drain(q)
+            with app.app_context():
+                self.process_batch(batch)
+
+    def start(self, app):
+        """
+        Запускает рабочие потоки.
+
+        Args:
+            app (Flask): Приложение, в контексте которого обрабатываются сообщения.
+        """
+        if self._threads:
+            return
+        for idx, q in enumerate(self._queues):
+            thread = Thread(target=self._worker, args=(app, q), name=f'mqtt-ingest-{idx}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stats(self) -> dict:
+        """
+        Возвращает статистику обработки.
+
+        Returns:
+            dict: Число принятых, обработанных, отброшенных и завершившихся ошибкой
+                сообщений, число пакетов, текущая и максимальная глубина очередей.
+        """
+        with self._stats_lock:
+            return {
+                'submitted': self._submitted,
+                'processed': self._processed,
+                'dropped': self._dropped,
+                'failed': self._failed,
+                'batches': self._batches,
+                'queue_depths': [q.qsize() for q in self._queues],
+                'max_queue_depth': self._max_depth
+            }
+
+
+mqtt_ingest_pool = MqttIngestPool()
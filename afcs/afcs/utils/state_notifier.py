@@ -0,0 +1,78 @@
+from threading import Condition
+
+
+class StateNotifier:
+    """
+    Версии состояния БПЛА для долгого опроса.
+
+    Каждое изменение состояния, которое видит БПЛА (арм, аварийный выключатель,
+    задержка, запрещенные зоны), увеличивает общий счетчик. Версия БПЛА равна
+    номеру последнего изменения, затронувшего этот БПЛА или все БПЛА сразу.
+    Ожидающие запросы просыпаются сразу после изменения.
+    """
+    def __init__(self):
+        self._condition = Condition()
+        self._counter = 0
+        self._versions = {}
+        self._global_version = 0
+        self.waiters = 0
+
+    def _version(self, id: str) -> int:
+        return max(self._versions.get(id, 0), self._global_version)
+
+    def version(self, id: str) -> int:
+        """
+        Возвращает текущую версию состояния БПЛА.
+
+        Args:
+            id (str): Идентификатор БПЛА.
+
+        Returns:
+            int: Версия состояния.
+        """
+        with self._condition:
+            return self._version(id)
+
+    def notify(self, id: str = None):
+        """
+        Отмечает изменение состояния и будит ожидающие запросы.
+
+        Args:
+            id (str): Идентификатор БПЛА, None - изменение касается всех БПЛА.
+        """
+        with self._condition:
+            self._counter += 1
+            if id is None:
+                self._global_version = self._counter
+            else:
+                self._versions[id] = self._counter
+            self._condition.notify_all()
+
+    def wait(self, id: str, version: int, timeout: float, max_waiters: int = None) -> int:
+        """
+        Ожидает изменения состояния БПЛА относительно известной ему версии.
+        Если версия уже отличается (в том числе после перезапуска сервера),
+        возвращается сразу.
+
+        Args:
+            id (str): Идентификатор БПЛА.
+            version (int): Версия, известная БПЛА.
+            timeout (float): Максимальное время ожидания в секундах.
+            max_waiters (int): Предельное число одновременно ожидающих запросов,
+                при его достижении запрос не ждет.
+
+        Returns:
+            int: Текущая версия состояния.
+        """
+        with self._condition:
+            if max_waiters is not None and self.waiters >= max_waiters:
+                return self._version(id)
+            self.waiters += 1
+            try:
+                self._condition.wait_for(lambda: self._version(id) != version, timeout)
+            finally:
+                self.waiters -= 1
+            return self._version(id)
+
+
+vehicle_state_notifier = StateNotifier()
@@ -0,0 +1,93 @@
+from flask import current_app
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+from afcs_server import db
+from utils.mqtt_ingest import MQTT_INGEST_WORKERS
+
+
+# число потоков процесса mod_wsgi (afcs.conf, WSGIDaemonProcess threads)
+WSGI_THREADS = 5
+# ключ движка чтения в app.extensions
+SQLITE_READ_ENGINE = 'afcs_read_engine'
+# параметры соединения SQLite: журнал WAL позволяет читать во время записи,
+# synchronous=NORMAL в режиме WAL не теряет целостность при сбое процесса
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -32 * 1024,
+}
+# записывают потоки запросов, обработчики сообщений MQTT и поток буфера телеметрии
+SQLITE_WRITE_POOL_SIZE = WSGI_THREADS + MQTT_INGEST_WORKERS + 1
+# длительные чтения (выгрузка телеметрии) выполняются только потоками запросов
+SQLITE_READ_POOL_SIZE = 2
+SQLITE_POOL_TIMEOUT_SEC = 10
+# соединения пула используются разными потоками; ожидание занятой БД - busy_timeout
+SQLITE_CONNECT_ARGS = {'check_same_thread': False, 'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000}
+
+
+def sqlite_storage_config(uri: str) -> dict:
+    """
+    Возвращает настройки Flask-SQLAlchemy для базы SQLite.
+
+    Args:
+        uri (str): URI файла базы данных.
+
+    Returns:
+        dict: Значения SQLALCHEMY_DATABASE_URI и SQLALCHEMY_ENGINE_OPTIONS.
+    """
+    return {
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'SQLALCHEMY_ENGINE_OPTIONS': {
+            # SQLAlchemy 1.4 по умолчанию использует для файла SQLite NullPool без параметров пула
+            'poolclass': QueuePool,
+            'pool_size': SQLITE_WRITE_POOL_SIZE,
+            'max_overflow': WSGI_THREADS,
+            'pool_timeout': SQLITE_POOL_TIMEOUT_SEC,
+            'connect_args': SQLITE_CONNECT_ARGS,
+        },
+    }
+
+
+def _set_pragmas(engine, read_only: bool):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        if read_only:
+            cursor.execute('PRAGMA query_only=ON')
+        cursor.close()
+
+    event.listen(engine, 'connect', on_connect)
+
+
+def configure_sqlite_engines(app):
+    """
+    Устанавливает параметры SQLITE_PRAGMAS для каждого нового соединения основного
+    движка и создает движок чтения к тому же файлу БД, соединения которого открываются
+    только для чтения. Вызывается после db.init_app, до первого обращения к БД.
+
+    Args:
+        app (Flask): Приложение.
+    """
+    with app.app_context():
+        _set_pragmas(db.engine, read_only=False)
+        engine = create_engine(db.engine.url, poolclass=QueuePool, pool_size=SQLITE_READ_POOL_SIZE,
+                               max_overflow=WSGI_THREADS - SQLITE_READ_POOL_SIZE,
+                               pool_timeout=SQLITE_POOL_TIMEOUT_SEC,
+                               connect_args=SQLITE_CONNECT_ARGS)
+        _set_pragmas(engine, read_only=True)
+        app.extensions[SQLITE_READ_ENGINE] = engine
+
+
+def read_engine():
+    """
+    Возвращает движок для длительных чтений, которые не должны занимать соединения записи.
+    Если отдельный движок чтения не настроен, возвращается основной движок.
+    Вызывается в контексте приложения.
+
+    Returns:
+        Engine: Движок чтения.
+    """
+    return current_app.extensions.get(SQLITE_READ_ENGINE, db.engine)
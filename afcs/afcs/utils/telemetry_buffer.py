@@ -0,0 +1,217 @@
+import atexit
+import sys
+import time
+from threading import Lock, Thread
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
+from afcs_server import db
+# models импортирует сервер, а сервер - обработчики запросов,
+# поэтому модель телеметрии берется из модуля в момент записи
+import models
+from utils.telemetry_rollups import update_rollups
+
+
+# число накопленных записей, при котором буфер сбрасывается в БД
+TELEMETRY_FLUSH_ROWS = 500
+# максимальное время хранения записи в буфере, секунды
+TELEMETRY_FLUSH_INTERVAL_SEC = 1.0
+# число повторов записи при занятой БД и пауза между ними, секунды
+TELEMETRY_FLUSH_RETRIES = 3
+TELEMETRY_FLUSH_RETRY_DELAY_SEC = 0.1
+
+
+class TelemetryBuffer:
+    """
+    Буфер отложенной записи телеметрии.
+
+    Записи телеметрии накапливаются в памяти и записываются в БД одной транзакцией
+    (executemany) при накоплении max_rows записей или по истечении max_delay_sec
+    с момента добавления первой записи. Исходные записи только добавляются: повтор
+    измерения с тем же ключом (uav_id, record_time) - повторная доставка сообщения
+    или повтор пакета клиентом - отбрасывается: уже записанные ключи выбираются
+    в транзакции записи по интервалу времени измерений каждого БПЛА. В той же
+    транзакции агрегаты телеметрии (utils.telemetry_rollups) обновляются только
+    добавленными записями.
+
+    Если БД занята, запись повторяется до TELEMETRY_FLUSH_RETRIES раз, после чего
+    записи отбрасываются. При других ошибках записи записываются по одной,
+    записи, которые не удалось записать, отбрасываются, чтобы одна ошибочная
+    запись не блокировала запись остальной телеметрии и не копилась в памяти.
+
+    Перед чтением телеметрии из БД буфер нужно сбросить методом flush.
+
+    Attributes:
+        flushes: число выполненных сбросов
+        flushed_rows: число записанных в БД записей
+        dropped_rows: число отброшенных записей, которые не удалось записать
+    """
+    def __init__(self, max_rows: int = TELEMETRY_FLUSH_ROWS, max_delay_sec: float = TELEMETRY_FLUSH_INTERVAL_SEC):
+        self.max_rows = max_rows
+        self.max_delay_sec = max_delay_sec
+        self._lock = Lock()
+        # сброс удерживает блокировку до фиксации транзакции, чтобы чтение
+        # после flush видело все ранее добавленные записи
+        self._flush_lock = Lock()
+        self._rows = {}
+        self._first_added = None
+        self._worker = None
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.dropped_rows = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
+
+    def add(self, row: dict):
+        """
+        Добавляет запись телеметрии в буфер и сбрасывает буфер при достижении порогов.
+
+        Args:
+            row (dict): Значения столбцов UavTelemetry.
+        """
+        self.add_many([row])
+
+    def add_many(self, rows: list):
+        """
+        Добавляет несколько записей телеметрии под одной блокировкой
+        и сбрасывает буфер при достижении порогов.
+
+        Args:
+            rows (list): Значения столбцов UavTelemetry для каждой записи.
+        """
+        if not rows:
+            return
+        with self._lock:
+            for row in rows:
+                self._rows.setdefault((row['uav_id'], row['record_time']), row)
+            if self._first_added is None:
+                self._first_added = time.monotonic()
+        if self._is_due():
+            self.flush()
+
+    def _is_due(self) -> bool:
+        with self._lock:
+            if not self._rows:
+                return False
+            return len(self._rows) >= self.max_rows or \
+                time.monotonic() - self._first_added >= self.max_delay_sec
+
+    def flush(self) -> int:
+        """
+        Записывает накопленные записи и их агрегаты в БД одной транзакцией.
+        Записи, которые не удалось записать, отбрасываются (dropped_rows).
+        Вызывается в контексте приложения.
+
+        Returns:
+            int: Число записанных записей.
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows = list(self._rows.values())
+                self._rows = {}
+                self._first_added = None
+            if not rows:
+                return 0
+            written = self._write_with_retries(rows)
+            self.flushes += 1
+            self.flushed_rows += written
+            return written
+
+    def _write_with_retries(self, rows: list) -> int:
+        for attempt in range(TELEMETRY_FLUSH_RETRIES + 1):
+            try:
+                self._write(rows)
+                return len(rows)
+            except Exception as e:
+                db.session.rollback()
+                if isinstance(e, OperationalError) and _is_busy_error(e):
+                    if attempt < TELEMETRY_FLUSH_RETRIES:
+                        time.sleep(TELEMETRY_FLUSH_RETRY_DELAY_SEC)
+                        continue
+                    # поштучная запись в занятую БД ждала бы busy_timeout для каждой записи
+                    self.dropped_rows += len(rows)
+                    print(f'Telemetry buffer dropped {len(rows)} rows, database is busy: {e}', file=sys.stderr)
+                    return 0
+                print(f'Error flushing telemetry buffer: {e}', file=sys.stderr)
+                return self._write_each(rows)
+
+    def _write(self, rows: list):
+        table = models.UavTelemetry.__table__
+        # записи телеметрии пишет только сброс буфера под _flush_lock, поэтому
+        # между выбором ключей и вставкой другие записи с этими ключами не появляются
+        existing = _existing_keys(table, rows)
+        new_rows = [row for row in rows if (row['uav_id'], row['record_time']) not in existing]
+        if new_rows:
+            db.session.execute(sqlite_insert(table).on_conflict_do_nothing(), new_rows)
+            update_rollups(db.session, new_rows)
+        db.session.commit()
+
+    def _write_each(self, rows: list) -> int:
+        written = 0
+        for row in rows:
+            try:
+                self._write([row])
+                written += 1
+            except Exception as e:
+                db.session.rollback()
+                self.dropped_rows += 1
+                print(f'Telemetry row dropped ({row.get("uav_id")}, {row.get("record_time")}): {e}',
+                      file=sys.stderr)
+        return written
+
+    def clear(self):
+        """
+        Удаляет накопленные записи без записи в БД.
+        """
+        with self._lock:
+            self._rows = {}
+            self._first_added = None
+
+    def start(self, app):
+        """
+        Запускает фоновый поток, сбрасывающий буфер по времени, если новая
+        телеметрия перестала поступать. При завершении процесса буфер сбрасывается.
+
+        Args:
+            app (Flask): Приложение, в контексте которого выполняется запись.
+        """
+        if self._worker is not None:
+            return
+
+        def flush_in_context():
+            with app.app_context():
+                self.flush()
+
+        def worker():
+            while True:
+                time.sleep(self.max_delay_sec)
+                if self._is_due():
+                    flush_in_context()
+
+        self._worker = Thread(target=worker, name='telemetry-buffer', daemon=True)
+        self._worker.start()
+        atexit.register(flush_in_context)
+
+
+def _existing_keys(table, rows: list) -> set:
+    ranges = {}
+    for row in rows:
+        record_time = row['record_time']
+        low, high = ranges.get(row['uav_id'], (record_time, record_time))
+        ranges[row['uav_id']] = (min(low, record_time), max(high, record_time))
+    keys = set()
+    for uav_id, (low, high) in ranges.items():
+        query = select(table.c.uav_id, table.c.record_time) \
+            .where(table.c.uav_id == uav_id, table.c.record_time.between(low, high))
+        keys.update(tuple(key) for key in db.session.execute(query))
+    return keys
+
+
+def _is_busy_error(error: OperationalError) -> bool:
+    message = str(error.orig).lower()
+    return 'locked' in message or 'busy' in message
+
+
+telemetry_buffer = TelemetryBuffer()
@@ -0,0 +1,92 @@
+import csv
+from io import StringIO
+from sqlalchemy import func, select
+# models импортирует сервер, а сервер - обработчики запросов,
+# поэтому модель телеметрии берется из модуля в момент построения запроса
+import models
+from utils.telemetry_rollups import TELEMETRY_ROLLUP_CSV_HEADER, rollup_columns
+
+
+TELEMETRY_CSV_HEADER = ['record_time', 'lat', 'lon', 'alt', 'azimuth', 'dop', 'sats', 'speed']
+# число строк CSV в одном фрагменте потоковой выгрузки
+TELEMETRY_CSV_CHUNK_ROWS = 1000
+
+
+def telemetry_csv_header(resolution: int = 0) -> list:
+    """
+    Возвращает заголовок CSV для уровня хранения телеметрии.
+
+    Args:
+        resolution (int): 0 - исходные записи, иначе длительность интервала агрегата в секундах.
+
+    Returns:
+        list: Имена столбцов.
+    """
+    return TELEMETRY_ROLLUP_CSV_HEADER if resolution else TELEMETRY_CSV_HEADER
+
+
+def telemetry_csv_query(id: str, start=None, end=None, step: int = None, resolution: int = 0):
+    """
+    Строит запрос строк телеметрии БПЛА для выгрузки в CSV.
+
+    Args:
+        id (str): Идентификатор БПЛА.
+        start (datetime): Начало интервала времени измерений, включительно.
+        end (datetime): Конец интервала времени измерений, включительно.
+        step (int): Прореживание: в выгрузку попадает каждая step-я строка интервала.
+        resolution (int): 0 - исходные записи, иначе длительность интервала агрегата в секундах.
+
+    Returns:
+        Select: Запрос столбцов telemetry_csv_header(resolution) в порядке времени.
+    """
+    header = telemetry_csv_header(resolution)
+    if resolution:
+        columns, time_column, conditions = rollup_columns(resolution, start, end)
+        conditions.append(models.UavTelemetryRollup.__table__.c.uav_id == id)
+    else:
+        table = models.UavTelemetry.__table__
+        columns = [table.c[name] for name in header]
+        time_column = table.c.record_time
+        conditions = [table.c.uav_id == id]
+        if start is not None:
+            conditions.append(table.c.record_time >= start)
+        if end is not None:
+            conditions.append(table.c.record_time <= end)
+    if not step or step <= 1:
+        return select(*columns).where(*conditions).order_by(time_column)
+    # прореживание выполняется в БД, лишние строки не передаются в приложение
+    numbered = select(*columns, func.row_number().over(order_by=time_column).label('row_number')) \
+        .where(*conditions).subquery()
+    return select(*[numbered.c[name] for name in header]) \
+        .where((numbered.c.row_number - 1) % step == 0) \
+        .order_by(numbered.c.record_time)
+
+
+def iter_csv_from_telemetry(telemetry_rows, chunk_rows: int = TELEMETRY_CSV_CHUNK_ROWS,
+                            header: list = TELEMETRY_CSV_HEADER):
+    """
+    Формирует CSV из телеметрических данных по частям.
+
+    Args:
+        telemetry_rows (iterable): Строки телеметрии со столбцами header
+            (объекты UavTelemetry или строки результата запроса).
+        chunk_rows (int): Число строк в одном фрагменте.
+        header (list): Имена столбцов.
+
+    Returns:
+        generator: Фрагменты CSV-строки, первый содержит заголовок.
+    """
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    count = 0
+    for telemetry in telemetry_rows:
+        writer.writerow([getattr(telemetry, name) for name in header])
+        count += 1
+        if count % chunk_rows == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    chunk = output.getvalue()
+    if chunk:
+        yield chunk
@@ -0,0 +1,78 @@
+import datetime
+import struct
+
+# формат двоичного кадра телеметрии, совпадает с src/telemetry_frame.py:
+# magic, версия, номер кадра, время в мс, широта и долгота в 1e-7 градуса, высота в см,
+# азимут в сотых долях градуса, скорость в сотых долях км/ч, dop в сотых долях,
+# число спутников, длина идентификатора, далее идентификатор в UTF-8
+TELEMETRY_FRAME_MAGIC = 0xA7
+TELEMETRY_FRAME_VERSION = 1
+TELEMETRY_FRAME_HEADER = struct.Struct('<BBIqiiiHHHBB')
+# пакет кадров: magic, число кадров, далее кадры подряд
+TELEMETRY_BATCH_MAGIC = 0xA8
+TELEMETRY_BATCH_HEADER = struct.Struct('<BH')
+
+
+def decode_telemetry_frame(frame: bytes):
+    """
+    Разбирает двоичный кадр телеметрии в аргументы telemetry_handler.
+
+    Значения приводятся к масштабу прежнего текстового формата (широта и долгота
+    в 1e-7 градуса, высота в см, азимут в 1e-7 градуса), время измерения из кадра
+    используется как время записи.
+
+    Args:
+        frame (bytes): Содержимое сообщения MQTT.
+
+    Returns:
+        dict: Аргументы telemetry_handler или None, если сообщение не является кадром.
+    """
+    if len(frame) < TELEMETRY_FRAME_HEADER.size or frame[0] != TELEMETRY_FRAME_MAGIC \
+            or frame[1] != TELEMETRY_FRAME_VERSION:
+        return None
+    _, _, _, timestamp_ms, lat, lon, alt, azimuth, speed, dop, sats, id_len = \
+        TELEMETRY_FRAME_HEADER.unpack_from(frame)
+    if len(frame) != TELEMETRY_FRAME_HEADER.size + id_len:
+        return None
+    return {
+        'id': frame[TELEMETRY_FRAME_HEADER.size:].decode(),
+        'lat': lat,
+        'lon': lon,
+        'alt': alt,
+        'azimuth': azimuth * 1e5,
+        'dop': dop / 100,
+        'sats': sats,
+        'speed': speed / 100,
+        'record_time': datetime.datetime.utcfromtimestamp(timestamp_ms / 1000)
+    }
+
+
+def decode_telemetry_batch(payload: bytes):
+    """
+    Разбирает пакет двоичных кадров телеметрии.
+
+    Args:
+        payload (bytes): Содержимое сообщения MQTT.
+
+    Returns:
+        list: Аргументы telemetry_handler для каждого кадра (как в decode_telemetry_frame)
+            или None, если сообщение не является пакетом или повреждено.
+    """
+    if len(payload) < TELEMETRY_BATCH_HEADER.size or payload[0] != TELEMETRY_BATCH_MAGIC:
+        return None
+    _, count = TELEMETRY_BATCH_HEADER.unpack_from(payload)
+    samples = []
+    offset = TELEMETRY_BATCH_HEADER.size
+    for _ in range(count):
+        if len(payload) < offset + TELEMETRY_FRAME_HEADER.size:
+            return None
+        # последний байт заголовка кадра - длина идентификатора
+        end = offset + TELEMETRY_FRAME_HEADER.size + payload[offset + TELEMETRY_FRAME_HEADER.size - 1]
+        sample = decode_telemetry_frame(payload[offset:end])
+        if sample is None:
+            return None
+        samples.append(sample)
+        offset = end
+    if offset != len(payload):
+        return None
+    return samples
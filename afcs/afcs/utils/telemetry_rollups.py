@@ -0,0 +1,170 @@
+import datetime
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+# models импортирует сервер, а сервер - обработчики запросов,
+# поэтому модели берутся из модуля в момент обращения
+import models
+
+
+# длительности интервалов агрегатов телеметрии в секундах
+TELEMETRY_ROLLUP_RESOLUTIONS_SEC = (1, 10, 60)
+# величины, для которых считаются минимум, максимум и среднее
+TELEMETRY_ROLLUP_FIELDS = ('lat', 'lon', 'alt', 'speed')
+TELEMETRY_ROLLUP_CSV_HEADER = ['record_time', 'count'] + \
+    [f'{field}{suffix}' for field in TELEMETRY_ROLLUP_FIELDS for suffix in ('', '_min', '_max')]
+
+
+def bucket_start(record_time: datetime.datetime, resolution: int) -> datetime.datetime:
+    """
+    Возвращает начало интервала агрегата, содержащего момент измерения.
+
+    Args:
+        record_time (datetime): Время измерения.
+        resolution (int): Длительность интервала в секундах, делитель суток.
+
+    Returns:
+        datetime: Начало интервала.
+    """
+    seconds = record_time.hour * 3600 + record_time.minute * 60 + record_time.second
+    return record_time.replace(microsecond=0) - datetime.timedelta(seconds=seconds % resolution)
+
+
+def _merge(rollup: dict, other: dict):
+    rollup['count'] += other['count']
+    for field in TELEMETRY_ROLLUP_FIELDS:
+        if other[f'{field}_min'] < rollup[f'{field}_min']:
+            rollup[f'{field}_min'] = other[f'{field}_min']
+        if other[f'{field}_max'] > rollup[f'{field}_max']:
+            rollup[f'{field}_max'] = other[f'{field}_max']
+        rollup[f'{field}_sum'] += other[f'{field}_sum']
+
+
+def aggregate_rollups(rows: list) -> list:
+    """
+    Агрегирует записи телеметрии по БПЛА и интервалам всех уровней.
+    Записи без времени измерения или без какой-либо из величин TELEMETRY_ROLLUP_FIELDS
+    в агрегаты не попадают.
+
+    Args:
+        rows (list): Значения столбцов UavTelemetry.
+
+    Returns:
+        list: Значения столбцов UavTelemetryRollup.
+    """
+    finest, *coarser = TELEMETRY_ROLLUP_RESOLUTIONS_SEC
+    # записи агрегируются по самым мелким интервалам,
+    # более крупные интервалы собираются из мелких
+    level = {}
+    for row in rows:
+        if row.get('record_time') is None or any(row.get(field) is None for field in TELEMETRY_ROLLUP_FIELDS):
+            continue
+        key = (row['uav_id'], bucket_start(row['record_time'], finest))
+        rollup = level.get(key)
+        sample = {'count': 1}
+        for field in TELEMETRY_ROLLUP_FIELDS:
+            sample[f'{field}_min'] = sample[f'{field}_max'] = sample[f'{field}_sum'] = row[field]
+        if rollup is None:
+            level[key] = dict(sample, uav_id=key[0], resolution=finest, bucket_start=key[1])
+        else:
+            _merge(rollup, sample)
+    rollups = list(level.values())
+    for resolution in coarser:
+        next_level = {}
+        for rollup in level.values():
+            key = (rollup['uav_id'], bucket_start(rollup['bucket_start'], resolution))
+            merged = next_level.get(key)
+            if merged is None:
+                next_level[key] = dict(rollup, resolution=resolution, bucket_start=key[1])
+            else:
+                _merge(merged, rollup)
+        rollups += next_level.values()
+        level = next_level
+    return rollups
+
+
+def update_rollups(session, rows: list) -> int:
+    """
+    Добавляет записи телеметрии в агрегаты. Вызывается в транзакции записи телеметрии,
+    агрегаты каждого интервала обновляются одним запросом INSERT ... ON CONFLICT.
+    Передаются только записи, добавленные в исходную телеметрию: агрегаты
+    аддитивны, и повтор измерения был бы учтен в них дважды.
+
+    Args:
+        session (Session): Сессия БД.
+        rows (list): Значения столбцов UavTelemetry.
+
+    Returns:
+        int: Число обновленных агрегатов.
+    """
+    rollups = aggregate_rollups(rows)
+    if not rollups:
+        return 0
+    table = models.UavTelemetryRollup.__table__
+    stmt = sqlite_insert(table)
+    update = {'count': table.c.count + stmt.excluded.count}
+    for field in TELEMETRY_ROLLUP_FIELDS:
+        update[f'{field}_min'] = func.min(table.c[f'{field}_min'], stmt.excluded[f'{field}_min'])
+        update[f'{field}_max'] = func.max(table.c[f'{field}_max'], stmt.excluded[f'{field}_max'])
+        update[f'{field}_sum'] = table.c[f'{field}_sum'] + stmt.excluded[f'{field}_sum']
+    stmt = stmt.on_conflict_do_update(index_elements=['uav_id', 'resolution', 'bucket_start'], set_=update)
+    session.execute(stmt, rollups)
+    return len(rollups)
+
+
+def rollup_columns(resolution: int, start=None, end=None):
+    """
+    Возвращает столбцы и условия выборки агрегатов одного уровня.
+
+    Args:
+        resolution (int): Длительность интервала в секундах.
+        start (datetime): Начало интервала времени, включительно.
+        end (datetime): Конец интервала времени, включительно.
+
+    Returns:
+        tuple: Столбцы TELEMETRY_ROLLUP_CSV_HEADER (record_time - начало интервала,
+            значение величины - среднее), столбец времени и условия без идентификатора БПЛА.
+    """
+    table = models.UavTelemetryRollup.__table__
+    columns = [table.c.bucket_start.label('record_time'), table.c.count]
+    for field in TELEMETRY_ROLLUP_FIELDS:
+        columns += [(table.c[f'{field}_sum'] / table.c.count).label(field),
+                    table.c[f'{field}_min'], table.c[f'{field}_max']]
+    conditions = [table.c.resolution == resolution]
+    if start is not None:
+        conditions.append(table.c.bucket_start >= bucket_start(start, resolution))
+    if end is not None:
+        conditions.append(table.c.bucket_start <= end)
+    return columns, table.c.bucket_start, conditions
+
+
+def choose_resolution(session, id: str, start=None, end=None, max_points: int = None) -> int:
+    """
+    Выбирает самый подробный уровень хранения телеметрии, на котором в интервал
+    времени попадает не больше max_points точек. Число измерений оценивается
+    по самым крупным агрегатам, без обращения к исходным записям.
+
+    Args:
+        session (Session): Сессия или соединение БД.
+        id (str): Идентификатор БПЛА.
+        start (datetime): Начало интервала времени, None - с первого измерения.
+        end (datetime): Конец интервала времени, None - до последнего измерения.
+        max_points (int): Предельное число точек, None - без ограничения.
+
+    Returns:
+        int: 0 - исходные записи, иначе длительность интервала агрегата в секундах.
+    """
+    if not max_points:
+        return 0
+    coarsest = TELEMETRY_ROLLUP_RESOLUTIONS_SEC[-1]
+    table = models.UavTelemetryRollup.__table__
+    _, _, conditions = rollup_columns(coarsest, start, end)
+    samples, first, last = session.execute(
+        select(func.sum(table.c.count), func.min(table.c.bucket_start), func.max(table.c.bucket_start))
+        .where(table.c.uav_id == id, *conditions)).one()
+    if not samples or samples <= max_points:
+        return 0
+    span = ((end or last + datetime.timedelta(seconds=coarsest)) - (start or first)).total_seconds()
+    for resolution in TELEMETRY_ROLLUP_RESOLUTIONS_SEC:
+        if span / resolution <= max_points:
+            return resolution
+    return coarsest
@@ -0,0 +1,85 @@
+import time
+from hashlib import sha256
+from threading import Lock
+from afcs_server import db
+# models импортирует сервер, а сервер - обработчики запросов,
+# поэтому модели берутся из модуля в момент обращения
+import models
+
+
+# время, в течение которого подтвержденный токен не проверяется по БД
+AUTH_TOKEN_TTL_SEC = 300
+
+
+class TokenCache:
+    """
+    Кэш подтвержденных токенов доступа администратора.
+
+    Токены хранятся в виде хэша SHA-256 со сроком действия записи. Проверка
+    токена из кэша - один поиск в словаре; при промахе токен проверяется
+    одним запросом к БД и при успехе добавляется в кэш. Неверные токены не
+    кэшируются. При смене токенов в БД кэш сбрасывается явно (invalidate).
+    """
+    def __init__(self, ttl: float = AUTH_TOKEN_TTL_SEC, clock=time.monotonic):
+        self._lock = Lock()
+        self._tokens = {}
+        self._ttl = ttl
+        self._clock = clock
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return sha256(token.encode()).digest()
+
+    def add(self, token: str):
+        """
+        Добавляет подтвержденный токен в кэш.
+
+        Args:
+            token (str): Токен доступа.
+        """
+        with self._lock:
+            self._tokens[self._key(token)] = self._clock() + self._ttl
+
+    def check(self, token: str) -> bool:
+        """
+        Проверяет токен доступа по кэшу, при промахе - по БД.
+        Вызывается в контексте приложения.
+
+        Args:
+            token (str): Токен доступа.
+
+        Returns:
+            bool: True, если токен принадлежит пользователю.
+        """
+        if not token:
+            return False
+        key = self._key(token)
+        expires = self._tokens.get(key)
+        if expires is not None and expires > self._clock():
+            return True
+        user = db.session.query(models.User.username).filter(models.User.access_token == token).first()
+        if user is None:
+            with self._lock:
+                self._tokens.pop(key, None)
+            return False
+        self.add(token)
+        return True
+
+    def invalidate(self, token: str = None):
+        """
+        Удаляет токен из кэша.
+
+        Args:
+            token (str): Токен доступа, None - удалить все токены.
+        """
+        with self._lock:
+            if token is None:
+                self._tokens = {}
+            else:
+                self._tokens.pop(self._key(token), None)
+
+
+token_cache = TokenCache()
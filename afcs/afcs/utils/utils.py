@@ -3,13 +3,14 @@ import os, sys
 import time
 import json
 import ast
-import csv
-from io import StringIO
+from collections import OrderedDict
+from threading import Lock
 from hashlib import sha256
 from Cryptodome import Random
 from Cryptodome.PublicKey import RSA
 from models import *
 from utils.db_utils import *
+from utils.telemetry_csv import iter_csv_from_telemetry
 
 
 AFCS_KEY_SIZE = 1024
@@ -32,6 +33,20 @@ FORBIDDEN_ZONES_DELTA_PATH = './static/resources/forbidden_zones_delta.json'
 
 loaded_keys = {}
 
+# открытые ключи (n, e) по группам ключей, чтобы не обращаться к БД на каждый запрос
+public_keys_cache = {}
+public_keys_lock = Lock()
+
+# параметры приватных ключей для подписи по китайской теореме об остатках
+signing_keys = {}
+signing_keys_lock = Lock()
+
+# недавно проверенные подписи (n, e, хэш сообщения, подпись), повторные опросы
+# от БПЛА с той же подписью не требуют возведения в степень
+VERIFIED_SIGNATURES_CACHE_SIZE = 4096
+verified_signatures = OrderedDict()
+verified_signatures_lock = Lock()
+
 class MissionVerificationStatus:
     OK = 'Mission accepted.'
     NON_ZERO_DELAY_WAYPOINT = 'Error: The mission contains a waypoint with non-zero delay.'
@@ -256,6 +271,64 @@ def encode_mission(mission_list: list) -> list:
     return mission_list
 
 
+class CrtSigningKey:
+    """
+    Приватный ключ RSA с заранее вычисленными параметрами китайской теоремы
+    об остатках. Подпись считается двумя возведениями в степень по модулям p и q
+    половинной длины, результат совпадает с pow(hash, d, n).
+
+    Attributes:
+        key: исходный ключ PyCryptodome
+        p, q: простые множители модуля
+        dp, dq: d mod (p - 1) и d mod (q - 1)
+        qinv: q^-1 mod p
+    """
+    def __init__(self, key):
+        self.key = key
+        self.p, self.q = int(key.p), int(key.q)
+        d = int(key.d)
+        self.dp = d % (self.p - 1)
+        self.dq = d % (self.q - 1)
+        self.qinv = pow(self.q, -1, self.p)
+
+    def sign_hash(self, hash: int) -> int:
+        """
+        Подписывает хэш сообщения.
+
+        Args:
+            hash (int): Хэш сообщения.
+
+        Returns:
+            int: Цифровая подпись.
+        """
+        m1 = pow(hash, self.dp, self.p)
+        m2 = pow(hash, self.dq, self.q)
+        h = (self.qinv * (m1 - m2)) % self.p
+        return m2 + h * self.q
+
+
+def get_signing_key(key_group: str):
+    """
+    Получает ключ для подписи из указанной группы. Параметры CRT вычисляются
+    один раз для каждого загруженного ключа.
+
+    Args:
+        key_group (str): Группа ключей.
+
+    Returns:
+        CrtSigningKey: Ключ для подписи или None, если ключ группы не загружен.
+    """
+    key = get_key(key_group, private=True)
+    if key is None:
+        return None
+    with signing_keys_lock:
+        signing_key = signing_keys.get(key_group)
+        if signing_key is None or signing_key.key is not key:
+            signing_key = CrtSigningKey(key)
+            signing_keys[key_group] = signing_key
+        return signing_key
+
+
 def sign(message: str, key_group: str) -> int:
     """
     Подписывает сообщение с использованием приватного ключа.
@@ -267,11 +340,10 @@ def sign(message: str, key_group: str) -> int:
     Returns:
         int: Цифровая подпись.
     """
-    key = get_key(key_group, private=True)
-    n, d = key.n, key.d
+    key = get_signing_key(key_group)
     msg_bytes = message.encode()
     hash = int.from_bytes(sha256(msg_bytes).digest(), byteorder='big', signed=False)
-    signature = pow(hash, d, n)
+    signature = key.sign_hash(hash)
     
     return signature
 
@@ -296,8 +368,19 @@ def verify(message: str, signature: int, key_group: str) -> bool:
             return False
         msg_bytes = message.encode()
         hash = int.from_bytes(sha256(msg_bytes).digest(), byteorder='big', signed=False)
+        cache_key = (n, e, hash, signature)
+        with verified_signatures_lock:
+            if cache_key in verified_signatures:
+                verified_signatures.move_to_end(cache_key)
+                return True
         hashFromSignature = pow(signature, e, n)
-        return hash == hashFromSignature
+        if hash != hashFromSignature:
+            return False
+        with verified_signatures_lock:
+            verified_signatures[cache_key] = True
+            if len(verified_signatures) > VERIFIED_SIGNATURES_CACHE_SIZE:
+                verified_signatures.popitem(last=False)
+        return True
     except:
         return False
 
@@ -330,6 +413,10 @@ def get_key(key_group: str, private: bool):
             return None
     
     else:
+        with public_keys_lock:
+            if key_group in public_keys_cache:
+                return public_keys_cache[key_group]
+
         if 'kos' in key_group:
             id = key_group.split('kos')[1]
             key = get_entity_by_key(UavPublicKeys, id)
@@ -352,9 +439,37 @@ def get_key(key_group: str, private: bool):
             print('Wrong group')
             return -1
         
+        cache_public_key(key_group, n, e)
         return n, e
 
 
+def cache_public_key(key_group: str, n, e) -> None:
+    """
+    Сохраняет открытый ключ группы в кэше.
+
+    Args:
+        key_group (str): Группа ключей.
+        n: Модуль ключа (число или десятичная строка).
+        e: Открытая экспонента (число или десятичная строка).
+    """
+    with public_keys_lock:
+        public_keys_cache[key_group] = (int(n), int(e))
+
+
+def invalidate_public_key(key_group: str = None) -> None:
+    """
+    Удаляет открытый ключ группы из кэша, следующий запрос прочитает его заново.
+
+    Args:
+        key_group (str): Группа ключей, None - очистить весь кэш.
+    """
+    with public_keys_lock:
+        if key_group is None:
+            public_keys_cache.clear()
+        else:
+            public_keys_cache.pop(key_group, None)
+
+
 def generate_keys(keysize: int, key_group: str) -> list:
     """
     Генерирует пару ключей RSA.
@@ -369,6 +484,9 @@ def generate_keys(keysize: int, key_group: str) -> list:
     random_generator = Random.new().read
     key = RSA.generate(keysize, random_generator)
     loaded_keys[key_group] = key
+    invalidate_public_key(key_group)
+    with signing_keys_lock:
+        signing_keys.pop(key_group, None)
 
 
 def save_public_key(n: str, e: str, key_group: str) -> None:
@@ -389,6 +507,7 @@ def save_public_key(n: str, e: str, key_group: str) -> None:
     else:
         print('Wrong group in utils.save_public_key')
     add_and_commit(entity)
+    cache_public_key(key_group, n, e)
     
 
 def haversine(lat1, lon1, lat2, lon2):
@@ -503,15 +622,7 @@ def create_csv_from_telemetry(telemetry_data):
     Returns:
         str: CSV-строка с телеметрическими данными.
     """
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['record_time', 'lat', 'lon', 'alt', 'azimuth', 'dop', 'sats', 'speed'])
-
-    for telemetry in telemetry_data:
-        writer.writerow([telemetry.record_time, telemetry.lat, telemetry.lon, telemetry.alt, telemetry.azimuth, telemetry.dop, telemetry.sats, telemetry.speed])
-
-    output.seek(0)
-    return output.getvalue()
+    return ''.join(iter_csv_from_telemetry(telemetry_data))
 
 
 def compute_forbidden_zones_delta(old_zones, new_zones):
@@ -0,0 +1,259 @@
+import sys
+from collections import namedtuple
+from threading import Lock
+from sqlalchemy import func, select
+from afcs_server import db
+# models импортирует сервер, а сервер - обработчики запросов,
+# поэтому модели берутся из модуля в момент обращения
+import models
+
+
+VehicleState = namedtuple('VehicleState', ['is_armed', 'state', 'kill_switch_state', 'delay', 'mission_accepted',
+                                           'telemetry', 'version'])
+VehicleState.__doc__ = """
+Последнее известное состояние БПЛА.
+
+Attributes:
+    is_armed: состояние арма
+    state: текущее состояние БПЛА
+    kill_switch_state: состояние аварийного выключателя
+    delay: время до следующего сеанса связи в секундах
+    mission_accepted: принято ли полетное задание, None - задания нет
+    telemetry: последняя запись телеметрии (значения столбцов UavTelemetry) или None
+    version: номер последнего изменения записи
+"""
+
+
+class VehicleStateCache:
+    """
+    Кэш последнего состояния БПЛА со сквозной записью.
+
+    Обработчики, изменяющие БПЛА и полетные задания, фиксируют транзакцию методом
+    commit, который под общей блокировкой записи фиксирует изменения и сохраняет
+    новое состояние в кэше: обновления кэша применяются в порядке фиксации, и
+    конкурирующие запросы не оставляют в кэше более старое состояние, чем в БД.
+    Обработчик телеметрии передает последнее измерение (до записи буфера в БД).
+    Запросы состояния, арма, аварийного выключателя, информации полета и последней
+    телеметрии обслуживаются из памяти. Если БПЛА нет в кэше, состояние читается из БД.
+    Записи кэша неизменяемы и заменяются целиком, поэтому чтение не требует блокировки.
+
+    Каждое изменение получает номер из общего счетчика, что позволяет отдавать
+    только записи, изменившиеся после известной клиенту версии (snapshot).
+    """
+    def __init__(self):
+        self._lock = Lock()
+        # упорядочивает фиксацию транзакций и обновление кэша
+        self._commit_lock = Lock()
+        self._states = {}
+        self._version = 0
+        # версия последней полной замены содержимого кэша
+        self._reset_version = 0
+
+    def _next_version(self) -> int:
+        self._version += 1
+        return self._version
+
+    @property
+    def version(self) -> int:
+        """ номер последнего изменения кэша """
+        return self._version
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._states
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def get(self, id: str):
+        """
+        Возвращает состояние БПЛА из кэша.
+
+        Args:
+            id (str): Идентификатор БПЛА.
+
+        Returns:
+            VehicleState: Состояние БПЛА или None, если БПЛА нет в кэше.
+        """
+        return self._states.get(id)
+
+    def update_uav(self, uav_entity, only_missing: bool = False):
+        """
+        Сохраняет состояние БПЛА после фиксации изменений в БД.
+
+        Args:
+            uav_entity (Uav): БПЛА.
+            only_missing (bool): Сохранить, только если БПЛА нет в кэше (заполнение
+                кэша при чтении не должно перезаписывать более новое состояние).
+        """
+        with self._lock:
+            known = uav_entity.id in self._states
+        mission_accepted = None
+        if not known:
+            mission_entity = db.session.get(models.Mission, uav_entity.id)
+            mission_accepted = mission_entity.is_accepted if mission_entity else None
+        with self._lock:
+            current = self._states.get(uav_entity.id)
+            if only_missing and current is not None:
+                return
+            self._states[uav_entity.id] = VehicleState(
+                uav_entity.is_armed, uav_entity.state, uav_entity.kill_switch_state, uav_entity.delay,
+                current.mission_accepted if current else mission_accepted,
+                current.telemetry if current else None, self._next_version())
+
+    def commit(self, uav_entities: list = (), missions: list = ()):
+        """
+        Фиксирует транзакцию и сохраняет в кэше состояние измененных БПЛА и
+        полетных заданий. Фиксация и обновление кэша выполняются под одной
+        блокировкой, поэтому кэш обновляется в порядке фиксации транзакций.
+
+        Args:
+            uav_entities (list): Измененные БПЛА (Uav).
+            missions (list): Измененные полетные задания (Mission).
+        """
+        with self._commit_lock:
+            db.session.commit()
+            for uav_entity in uav_entities:
+                self.update_uav(uav_entity)
+            for mission_entity in missions:
+                self.update_mission(mission_entity.uav_id, mission_entity.is_accepted)
+
+    def update_mission(self, id: str, is_accepted: bool):
+        """
+        Сохраняет состояние полетного задания БПЛА после фиксации изменений в БД.
+
+        Args:
+            id (str): Идентификатор БПЛА.
+            is_accepted (bool): Принято ли полетное задание.
+        """
+        with self._lock:
+            current = self._states.get(id)
+            if current is not None:
+                self._states[id] = current._replace(mission_accepted=is_accepted, version=self._next_version())
+
+    def touch(self, id: str):
+        """
+        Отмечает изменение состояния БПЛА, которое хранится вне кэша
+        (например, ожидание решения по измененному заданию).
+
+        Args:
+            id (str): Идентификатор БПЛА.
+        """
+        with self._lock:
+            current = self._states.get(id)
+            if current is not None:
+                self._states[id] = current._replace(version=self._next_version())
+
+    def update_telemetry(self, id: str, rows: list):
+        """
+        Сохраняет последнее измерение телеметрии БПЛА. Измерения не новее
+        уже сохраненного (в том числе повторы) не учитываются, как и в исходной
+        телеметрии. Состояние БПЛА должно быть в кэше.
+
+        Args:
+            id (str): Идентификатор БПЛА.
+            rows (list): Значения столбцов UavTelemetry.
+        """
+        latest = max(rows, key=lambda row: row['record_time'], default=None)
+        if latest is None:
+            return
+        with self._lock:
+            current = self._states.get(id)
+            if current is None:
+                return
+            if current.telemetry is None or current.telemetry['record_time'] < latest['record_time']:
+                self._states[id] = current._replace(telemetry=latest, version=self._next_version())
+
+    def snapshot(self, since: int = None):
+        """
+        Возвращает состояние всех БПЛА или только изменившихся после версии since.
+
+        Args:
+            since (int): Версия, известная клиенту, None - полное состояние.
+
+        Returns:
+            tuple: Текущая версия, признак полного состояния и словарь VehicleState
+                по идентификаторам БПЛА в порядке их появления.
+        """
+        with self._lock:
+            states = self._states
+            version = self._version
+            full = since is None or since < self._reset_version or since > version
+        if full:
+            return version, True, dict(states)
+        return version, False, {id: state for id, state in states.items() if state.version > since}
+
+    def clear(self):
+        """
+        Удаляет все записи кэша.
+        """
+        with self._lock:
+            self._states = {}
+            self._reset_version = self._next_version()
+
+    def _load(self, session) -> dict:
+        telemetry_table = models.UavTelemetry.__table__
+        latest_times = select(telemetry_table.c.uav_id, func.max(telemetry_table.c.record_time).label('record_time')) \
+            .group_by(telemetry_table.c.uav_id).subquery()
+        telemetry_rows = session.execute(
+            select(telemetry_table).join(latest_times, (telemetry_table.c.uav_id == latest_times.c.uav_id) &
+                                         (telemetry_table.c.record_time == latest_times.c.record_time)))
+        telemetry = {row.uav_id: dict(row._mapping) for row in telemetry_rows}
+        missions = dict(session.execute(select(models.Mission.uav_id, models.Mission.is_accepted)).all())
+        return {
+            uav.id: VehicleState(uav.is_armed, uav.state, uav.kill_switch_state, uav.delay, missions.get(uav.id),
+                                 telemetry.get(uav.id), 0)
+            for uav in session.query(models.Uav).order_by(models.Uav.created_date).all()
+        }
+
+    def check(self, session) -> list:
+        """
+        Сверяет кэш с БД и заменяет его содержимое состоянием из БД.
+        Последняя телеметрия из кэша сохраняется, если она новее записанной в БД.
+        Вызывается в контексте приложения; буфер телеметрии должен быть сброшен.
+
+        Args:
+            session (Session): Сессия БД.
+
+        Returns:
+            list: Идентификаторы БПЛА, состояние которых в кэше расходилось с БД.
+        """
+        with self._commit_lock:
+            return self._check(session)
+
+    def _check(self, session) -> list:
+        loaded = self._load(session)
+        with self._lock:
+            mismatched = []
+            version = self._next_version()
+            for id in set(self._states) | set(loaded):
+                cached, stored = self._states.get(id), loaded.get(id)
+                if cached is not None and stored is not None and cached.telemetry is not None and \
+                        (stored.telemetry is None or stored.telemetry['record_time'] < cached.telemetry['record_time']):
+                    stored = stored._replace(telemetry=cached.telemetry)
+                if stored is not None:
+                    loaded[id] = stored = stored._replace(version=version)
+                if cached is not None and (stored is None or cached[:-1] != stored[:-1]):
+                    mismatched.append(id)
+            self._states = loaded
+            self._reset_version = version
+        if mismatched:
+            print(f'Vehicle state cache mismatch for {sorted(mismatched)}, reloaded from DB', file=sys.stderr)
+        return mismatched
+
+    def start(self, app):
+        """
+        Заполняет кэш из БД при запуске сервера. Если БД еще не создана,
+        кэш остается пустым и заполняется при обращении к БПЛА.
+
+        Args:
+            app (Flask): Приложение, в контексте которого выполняется чтение.
+        """
+        with app.app_context():
+            try:
+                self.check(db.session)
+            except Exception as e:
+                db.session.rollback()
+                print(f'Error loading vehicle state cache: {e}', file=sys.stderr)
+
+
+vehicle_state_cache = VehicleStateCache()
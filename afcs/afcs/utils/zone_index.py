@@ -0,0 +1,210 @@
+import math
+
+import numpy as np
+
+
+# зона, занимающая больше ячеек сетки, проверяется отдельно по ограничивающему прямоугольнику
+MAX_CELLS_PER_ZONE = 4096
+# допуск для проверки попадания точки на границу зоны, градусы
+BOUNDARY_EPS = 1e-12
+
+
+class ForbiddenZonesIndex:
+    """
+    Пространственный индекс запрещенных зон.
+
+    Строится один раз по GeoJSON с зонами: для каждой зоны вычисляется ограничивающий
+    прямоугольник, зоны раскладываются по ячейкам равномерной сетки, рёбра полигонов
+    хранятся в массивах NumPy. Проверка точки затрагивает только зоны из её ячейки,
+    пересечения с рёбрами считаются векторно. Точка на границе зоны считается
+    находящейся внутри зоны, как и в is_point_in_polygon.
+
+    Координаты зон в GeoJSON задаются в порядке [lon, lat], методы индекса
+    принимают широту и долготу отдельными аргументами.
+    """
+
+    def __init__(self, forbidden_zones: dict):
+        """
+        Строит индекс по GeoJSON с запрещенными зонами.
+
+        Args:
+            forbidden_zones (dict): GeoJSON FeatureCollection с полигонами зон.
+        """
+        self.names = []
+        self._edges = []
+        boxes = []
+        for zone in forbidden_zones.get('features', []):
+            coordinates = np.asarray(zone['geometry']['coordinates'][0], dtype=float)
+            if len(coordinates) < 3:
+                continue
+            if not np.array_equal(coordinates[0], coordinates[-1]):
+                coordinates = np.vstack([coordinates, coordinates[:1]])
+            self.names.append(zone['properties'].get('name'))
+            # рёбра полигона: x1, y1, x2, y2 (x - долгота, y - широта)
+            self._edges.append(np.hstack([coordinates[:-1], coordinates[1:]]))
+            boxes.append((coordinates[:, 0].min(), coordinates[:, 1].min(),
+                          coordinates[:, 0].max(), coordinates[:, 1].max()))
+
+        self._boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        self._build_grid()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _build_grid(self):
+        """
+        Раскладывает зоны по ячейкам равномерной сетки. Размер ячейки равен
+        медианному размеру зоны, поэтому типичная зона занимает несколько ячеек.
+        """
+        self._grid = {}
+        self._large_zones = []
+        if len(self.names) == 0:
+            self._origin = (0.0, 0.0)
+            self._cell_size = 1.0
+            return
+
+        sizes = np.maximum(self._boxes[:, 2] - self._boxes[:, 0],
+                           self._boxes[:, 3] - self._boxes[:, 1])
+        self._cell_size = max(float(np.median(sizes)), 1e-6)
+        self._origin = (float(self._boxes[:, 0].min()), float(self._boxes[:, 1].min()))
+
+        for zone_id, box in enumerate(self._boxes):
+            x1, y1 = self._cell(box[0], box[1])
+            x2, y2 = self._cell(box[2], box[3])
+            if (x2 - x1 + 1) * (y2 - y1 + 1) > MAX_CELLS_PER_ZONE:
+                self._large_zones.append(zone_id)
+                continue
+            for cx in range(x1, x2 + 1):
+                for cy in range(y1, y2 + 1):
+                    self._grid.setdefault((cx, cy), []).append(zone_id)
+
+    def _cell(self, x: float, y: float) -> tuple:
+        return (math.floor((x - self._origin[0]) / self._cell_size),
+                math.floor((y - self._origin[1]) / self._cell_size))
+
+    def _candidates(self, min_x: float, min_y: float, max_x: float, max_y: float) -> list:
+        """
+        Возвращает зоны, ограничивающие прямоугольники которых пересекаются с заданным.
+        """
+        if len(self.names) == 0:
+            return []
+        x1, y1 = self._cell(min_x, min_y)
+        x2, y2 = self._cell(max_x, max_y)
+        if (x2 - x1 + 1) * (y2 - y1 + 1) > MAX_CELLS_PER_ZONE:
+            # запрос покрывает слишком много ячеек, фильтруем все зоны векторно
+            candidates = np.arange(len(self.names))
+        else:
+            ids = set(self._large_zones)
+            for cx in range(x1, x2 + 1):
+                for cy in range(y1, y2 + 1):
+                    ids.update(self._grid.get((cx, cy), ()))
+            if not ids:
+                return []
+            candidates = np.fromiter(ids, dtype=int, count=len(ids))
+        boxes = self._boxes[candidates]
+        mask = (boxes[:, 0] <= max_x) & (boxes[:, 2] >= min_x) & \
+            (boxes[:, 1] <= max_y) & (boxes[:, 3] >= min_y)
+        return sorted(candidates[mask].tolist())
+
+    def _contains(self, zone_id: int, x: float, y: float) -> bool:
+        """
+        Проверяет попадание точки в зону: чётность числа пересечений луча с рёбрами
+        или попадание на одно из рёбер.
+        """
+        e = self._edges[zone_id]
+        x1, y1, x2, y2 = e[:, 0], e[:, 1], e[:, 2], e[:, 3]
+
+        # точка на ребре
+        cross = (x2 - x1) * (y - y1) - (y2 - y1) * (x - x1)
+        on_edge = (np.abs(cross) <= BOUNDARY_EPS) & \
+            (np.minimum(x1, x2) - BOUNDARY_EPS <= x) & (x <= np.maximum(x1, x2) + BOUNDARY_EPS) & \
+            (np.minimum(y1, y2) - BOUNDARY_EPS <= y) & (y <= np.maximum(y1, y2) + BOUNDARY_EPS)
+        if on_edge.any():
+            return True
+
+        # пересечения луча, идущего из точки вправо
+        straddles = (y1 > y) != (y2 > y)
+        if not straddles.any():
+            return False
+        dy = np.where(straddles, y2 - y1, 1.0)
+        x_cross = x1 + (y - y1) * (x2 - x1) / dy
+        return bool(np.count_nonzero(straddles & (x < x_cross)) % 2)
+
+    def zones_containing_point(self, lat: float, lon: float) -> list:
+        """
+        Возвращает имена зон, в которые попадает точка.
+
+        Args:
+            lat (float): Широта.
+            lon (float): Долгота.
+
+        Returns:
+            list: Имена зон.
+        """
+        return [self.names[zone_id] for zone_id in self._candidates(lon, lat, lon, lat)
+                if self._contains(zone_id, lon, lat)]
+
+    def is_point_forbidden(self, lat: float, lon: float) -> bool:
+        """
+        Проверяет, находится ли точка хотя бы в одной запрещенной зоне.
+
+        Args:
+            lat (float): Широта.
+            lon (float): Долгота.
+
+        Returns:
+            bool: True, если точка в запрещенной зоне.
+        """
+        return any(self._contains(zone_id, lon, lat)
+                   for zone_id in self._candidates(lon, lat, lon, lat))
+
+    def _segment_intersects(self, zone_id: int, ax: float, ay: float, bx: float, by: float) -> bool:
+        """
+        Проверяет пересечение отрезка AB с зоной: конец отрезка внутри зоны
+        или пересечение (касание) хотя бы одного ребра.
+        """
+        if self._contains(zone_id, ax, ay) or self._contains(zone_id, bx, by):
+            return True
+        e = self._edges[zone_id]
+        x1, y1, x2, y2 = e[:, 0], e[:, 1], e[:, 2], e[:, 3]
+
+        def orientation(px, py, qx, qy, rx, ry):
+            return (qx - px) * (ry - py) - (qy - py) * (rx - px)
+
+        d1 = orientation(ax, ay, bx, by, x1, y1)
+        d2 = orientation(ax, ay, bx, by, x2, y2)
+        d3 = orientation(x1, y1, x2, y2, ax, ay)
+        d4 = orientation(x1, y1, x2, y2, bx, by)
+        # касания с коллинеарными рёбрами уже учтены проверкой концов отрезка
+        # и проверкой вершин зоны ниже
+        proper = (d1 * d2 < 0) & (d3 * d4 < 0)
+        if proper.any():
+            return True
+        # вершина зоны лежит на отрезке
+        on_segment = (np.abs(d1) <= BOUNDARY_EPS) & \
+            (min(ax, bx) - BOUNDARY_EPS <= x1) & (x1 <= max(ax, bx) + BOUNDARY_EPS) & \
+            (min(ay, by) - BOUNDARY_EPS <= y1) & (y1 <= max(ay, by) + BOUNDARY_EPS)
+        return bool(on_segment.any())
+
+    def check_path(self, points: list) -> list:
+        """
+        Проверяет маршрут (ломаную) на пересечение с запрещенными зонами.
+
+        Args:
+            points (list): Точки маршрута [(lat, lon), ...].
+
+        Returns:
+            list: Нарушения в виде пар (индекс отрезка, имя зоны); для маршрута
+                из одной точки индекс равен 0.
+        """
+        violations = []
+        if len(points) == 1:
+            lat, lon = points[0]
+            return [(0, name) for name in self.zones_containing_point(lat, lon)]
+        for idx in range(len(points) - 1):
+            (ay, ax), (by, bx) = points[idx], points[idx + 1]
+            for zone_id in self._candidates(min(ax, bx), min(ay, by), max(ax, bx), max(ay, by)):
+                if self._segment_intersects(zone_id, ax, ay, bx, by):
+                    violations.append((idx, self.names[zone_id]))
+        return violations
+
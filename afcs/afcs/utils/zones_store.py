@@ -0,0 +1,154 @@
+import copy
+import json
+import os
+from threading import RLock
+# utils.utils импортирует модели и сервер, а сервер - обработчики запросов,
+# поэтому функции модуля берутся из него в момент вызова
+import utils.utils as afcs_utils
+from utils.zone_index import ForbiddenZonesIndex
+
+
+class ForbiddenZonesSnapshot:
+    """
+    Неизменяемое состояние запрещенных зон одной версии с заранее вычисленными
+    производными данными.
+
+    Attributes:
+        version: номер версии хранилища
+        zones: GeoJSON с зонами (только для чтения)
+        zones_string: строка $ForbiddenZones для БПЛА
+        zones_hash: SHA-256 строки зон
+        names: имена зон в порядке хранения
+        coordinates_by_name: координаты полигонов по именам зон
+    """
+    def __init__(self, version: int, zones: dict):
+        self.version = version
+        self.zones = zones
+        self.zones_string = afcs_utils.generate_forbidden_zones_string(zones)
+        self.zones_hash = afcs_utils.get_sha256_hex(self.zones_string)
+        self.names = tuple(zone['properties'].get('name') for zone in zones['features'])
+        self.coordinates_by_name = {}
+        for zone in zones['features']:
+            self.coordinates_by_name.setdefault(zone['properties'].get('name'), zone['geometry']['coordinates'][0])
+        self._index = None
+        self._index_lock = RLock()
+
+    @property
+    def index(self) -> ForbiddenZonesIndex:
+        """
+        Пространственный индекс зон, строится при первом обращении.
+        """
+        with self._index_lock:
+            if self._index is None:
+                self._index = ForbiddenZonesIndex(self.zones)
+            return self._index
+
+
+class ForbiddenZonesStore:
+    """
+    Хранилище запрещенных зон в памяти процесса.
+
+    Файл с зонами читается один раз, дальше чтения обслуживаются из памяти.
+    Каждое изменение записывает файл, увеличивает номер версии и сбрасывает
+    закэшированное состояние (строку зон, хэш, имена, индекс).
+    """
+    def __init__(self, path: str = None):
+        """
+        Args:
+            path (str): Путь к файлу с зонами, по умолчанию FORBIDDEN_ZONES_PATH.
+        """
+        self._path = path
+        self._lock = RLock()
+        self._zones = None
+        self._snapshot = None
+        self.version = 0
+
+    @property
+    def path(self) -> str:
+        return self._path or afcs_utils.FORBIDDEN_ZONES_PATH
+
+    def _load(self) -> dict:
+        if self._zones is None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._zones = json.load(f)
+            self.version += 1
+        return self._zones
+
+    def _save(self, zones: dict):
+        """
+        Записывает зоны в файл через временный файл, затем публикует новую версию.
+        """
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(zones, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, self.path)
+
+        old_zones = self._zones
+        self._zones = zones
+        self._snapshot = None
+        self.version += 1
+        # вычисление дельты дописывает в зоны тип изменения, поэтому передаём копии
+        afcs_utils.compute_and_save_forbidden_zones_delta(copy.deepcopy(old_zones), copy.deepcopy(zones))
+
+    def snapshot(self) -> ForbiddenZonesSnapshot:
+        """
+        Возвращает текущее состояние зон.
+
+        Returns:
+            ForbiddenZonesSnapshot: Состояние текущей версии.
+        """
+        with self._lock:
+            if self._snapshot is None:
+                zones = self._load()
+                self._snapshot = ForbiddenZonesSnapshot(self.version, zones)
+            return self._snapshot
+
+    def set_zone(self, name: str, geometry: list):
+        """
+        Добавляет зону или заменяет координаты существующей зоны с тем же именем.
+
+        Args:
+            name (str): Имя зоны.
+            geometry (list): Массив координат зоны.
+        """
+        with self._lock:
+            zones = copy.deepcopy(self._load())
+            existing_zone = False
+            for zone in zones['features']:
+                if zone['properties'].get('name') == name:
+                    zone['geometry']['coordinates'][0] = geometry
+                    existing_zone = True
+            if not existing_zone:
+                zones['features'].append(afcs_utils.get_new_polygon_feature(name, geometry))
+            self._save(zones)
+
+    def delete_zone(self, name: str) -> bool:
+        """
+        Удаляет зону по имени.
+
+        Args:
+            name (str): Имя зоны.
+
+        Returns:
+            bool: True, если зона найдена и удалена.
+        """
+        with self._lock:
+            zones = copy.deepcopy(self._load())
+            for idx, zone in enumerate(zones['features']):
+                if zone['properties'].get('name') == name:
+                    zones['features'].pop(idx)
+                    self._save(zones)
+                    return True
+            return False
+
+    def reload(self):
+        """
+        Сбрасывает состояние, следующее чтение заново загрузит файл
+        (например, после замены файла зон вне сервера).
+        """
+        with self._lock:
+            self._zones = None
+            self._snapshot = None
+
+
+forbidden_zones_store = ForbiddenZonesStore()
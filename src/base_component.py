@@ -0,0 +1,245 @@
+""" модуль базового компонента системы
+
+содержит общую для всех блоков логику: очереди событий и управляющих команд,
+журналирование и цикл обработки событий с блокирующим ожиданием
+"""
+from multiprocessing import Queue, Process
+from multiprocessing.connection import wait
+from queue import Empty
+from time import monotonic
+from typing import Dict, List, Optional
+
+from src.config import CRITICALITY_STR, DEFAULT_LOG_LEVEL, LOG_DEBUG, LOG_ERROR
+from src.queues_dir import QueuesDirectory, SharedMemoryQueue
+from src.event_types import ControlEvent, Event
+from src.sim_clock import RealClock
+
+
+def wait_for_queues(queues: list, timeout: Optional[float] = None) -> bool:
+    """wait_for_queues блокирующее ожидание появления данных хотя бы в одной из очередей
+
+    Args:
+        queues (list): очереди multiprocessing.Queue или SharedMemoryQueue
+        timeout (Optional[float]): максимальное время ожидания в секундах,
+            None - ждать без ограничения
+
+    Returns:
+        bool: True, если хотя бы в одной очереди есть данные
+    """
+    # у multiprocessing.Queue данные передаются через канал (pipe),
+    # у SharedMemoryQueue читатель ждёт на канале-"звонке",
+    # поэтому ждать можно сразу на нескольких читающих концах каналов
+    readers = []
+    for q in queues:
+        if isinstance(q, SharedMemoryQueue) and q._prepare_wait():  # pylint: disable=protected-access
+            return True
+        readers.append(q._reader)  # pylint: disable=protected-access
+    return len(wait(readers, timeout=timeout)) > 0
+
+
+class BaseComponent(Process):
+    """BaseComponent базовый класс компонента системы
+
+    Каждый компонент работает в отдельном процессе и обрабатывает события
+    из своей очереди сразу по их поступлению. Если задан интервал периодической
+    обработки (tick_interval_sec), между событиями вызывается метод _on_tick.
+    Без интервала свободный компонент блокируется в ожидании и не расходует процессор.
+
+    Входящие события забираются пачкой (_drain_events_q). Для операций из
+    coalesced_operations в пачке остаётся только последнее событие,
+    устаревшие команды отбрасываются и учитываются в счётчиках.
+    """
+    log_prefix = "[COMPONENT]"
+    event_source_name = ""
+    events_q_name = event_source_name
+    log_level = DEFAULT_LOG_LEVEL
+    # операции, для которых важно только последнее значение ("побеждает последний")
+    coalesced_operations: tuple = ()
+    # ограничение размера пачки, чтобы поток событий не блокировал управляющие команды
+    max_batch_size = 1024
+
+    def __init__(
+            self, queues_dir: QueuesDirectory,
+            log_level: Optional[int] = None,
+            tick_interval_sec: Optional[float] = None):
+        # вызываем конструктор базового класса
+        super().__init__()
+
+        self._queues_dir = queues_dir
+
+        # создаём и регистрируем в каталоге очередь для сообщений на обработку,
+        # реализация очереди выбирается каталогом по её имени
+        self._events_q_name = self.events_q_name
+        self._events_q = self._queues_dir.create_queue(self._events_q_name)
+
+        self._quit = False
+        # очередь управляющих команд (например, для остановки работы модуля)
+        self._control_q = Queue()
+
+        # интервал периодической обработки, None - только по событиям
+        self._tick_interval_sec = tick_interval_sec
+
+        # количество отброшенных устаревших событий по операциям
+        self._coalesced_counters: Dict[str, int] = {}
+
+        # часы компонента, при пошаговой симуляции заменяются виртуальными
+        self._clock = RealClock()
+
+        if log_level is not None:
+            self.log_level = log_level
+
+    def _log_message(self, criticality: int, message: str):
+        """_log_message печатает сообщение заданного уровня критичности
+
+        Args:
+            criticality (int): уровень критичности
+            message (str): текст сообщения
+        """
+        if criticality <= self.log_level:
+            print(f"[{CRITICALITY_STR[criticality]}]{self.log_prefix} {message}")
+
+    def _check_control_q(self):
+        """_check_control_q проверка наличия новых управляющих команд
+        """
+        try:
+            request: ControlEvent = self._control_q.get_nowait()
+            self._log_message(LOG_DEBUG, f"проверяем запрос {request}")
+            if isinstance(request, ControlEvent) and request.operation == 'stop':
+                # поступил запрос на остановку, поднимаем "красный флаг"
+                self._quit = True
+        except Empty:
+            # никаких команд не поступило, ну и ладно
+            pass
+
+    def _check_events_q(self):
+        """_check_events_q обработка входящих событий,
+        переопределяется в компонентах
+        """
+
+    def _drain_events_q(self, q=None, coalesce: bool = True) -> List[Event]:
+        """_drain_events_q забирает из очереди все доступные события за один вызов
+
+        События неправильного типа пропускаются. Для операций из coalesced_operations
+        остаётся только последнее событие, оно занимает место последнего вхождения,
+        поэтому порядок относительно остальных операций сохраняется.
+
+        Args:
+            q: очередь, по умолчанию - очередь событий компонента
+            coalesce (bool): отбрасывать устаревшие события
+
+        Returns:
+            List[Event]: события для обработки в порядке поступления
+        """
+        if q is None:
+            q = self._events_q
+        batch = []
+        while len(batch) < self.max_batch_size:
+            try:
+                event = q.get_nowait()
+            except Empty:
+                break
+            if isinstance(event, Event):
+                batch.append(event)
+            else:
+                self._log_message(LOG_DEBUG, f"пропущено событие неправильного типа {event}")
+
+        if not coalesce or not self.coalesced_operations or len(batch) < 2:
+            return batch
+
+        # идём с конца: первое встреченное событие операции - самое свежее
+        seen = set()
+        result = []
+        for event in reversed(batch):
+            operation = event.operation
+            if operation in self.coalesced_operations:
+                if operation in seen:
+                    self._coalesced_counters[operation] = \
+                        self._coalesced_counters.get(operation, 0) + 1
+                    continue
+                seen.add(operation)
+            result.append(event)
+        result.reverse()
+        if len(result) != len(batch):
+            self._log_message(
+                LOG_DEBUG, f"отброшено устаревших событий: {len(batch) - len(result)}")
+        return result
+
+    def coalesced_counters(self) -> Dict[str, int]:
+        """coalesced_counters количество отброшенных устаревших событий по операциям
+
+        Returns:
+            Dict[str, int]: счётчики процесса компонента
+        """
+        return dict(self._coalesced_counters)
+
+    def attach_clock(self, clock):
+        """attach_clock установка часов компонента (например, VirtualClock для симуляции)
+
+        Args:
+            clock: часы с методами monotonic() и time()
+        """
+        self._clock = clock
+
+    def tick_interval_sec(self) -> Optional[float]:
+        """tick_interval_sec интервал периодической обработки
+
+        Returns:
+            Optional[float]: интервал в секундах, None - только по событиям
+        """
+        return self._tick_interval_sec
+
+    def _has_pending_events(self) -> bool:
+        """_has_pending_events проверка наличия необработанных событий
+
+        Returns:
+            bool: True, если в очереди событий компонента есть данные
+        """
+        return not self._events_q.empty()
+
+    def _on_tick(self):
+        """_on_tick периодическая обработка, вызывается раз в tick_interval_sec
+        """
+
+    def _wait_for_events(self, timeout: Optional[float]) -> bool:
+        """_wait_for_events ожидание события или управляющей команды
+
+        Args:
+            timeout (Optional[float]): максимальное время ожидания в секундах
+
+        Returns:
+            bool: True, если есть что обрабатывать
+        """
+        return wait_for_queues([self._events_q, self._control_q], timeout)
+
+    def stop(self):
+        """stop запрос остановки работы компонента
+        """
+        self._control_q.put(ControlEvent(operation='stop'))
+
+    def _event_loop(self):
+        """_event_loop цикл обработки событий до получения команды остановки
+        """
+        tick = self._tick_interval_sec
+        next_tick = monotonic() + tick if tick else None
+
+        while self._quit is False:
+            timeout = None
+            if next_tick is not None:
+                timeout = max(0.0, next_tick - monotonic())
+
+            try:
+                if self._wait_for_events(timeout):
+                    self._check_events_q()
+                    self._check_control_q()
+
+                if next_tick is not None and monotonic() >= next_tick:
+                    self._on_tick()
+                    next_tick += tick
+                    if next_tick < monotonic():
+                        # не успеваем, не пытаемся нагнать пропущенные такты
+                        next_tick = monotonic() + tick
+            except Exception as e:
+                self._log_message(LOG_ERROR, f"ошибка обработки событий: {e}")
+
+    def run(self):
+        self._event_loop()
@@ -7,6 +7,7 @@ NAVIGATION_QUEUE_NAME = "navigation"
 SITL_QUEUE_NAME = "sitl"
 CARGO_BAY_QUEUE_NAME = "cargo"
 SITL_TELEMETRY_QUEUE_NAME = "sitl.mqtt"
+FLEET_SITL_QUEUE_NAME = "sitl.fleet"
 MISSION_SENDER_QUEUE_NAME = "planner.mqtt"
 SAFETY_BLOCK_QUEUE_NAME = "safety"
 SECURITY_MONITOR_QUEUE_NAME = "security"
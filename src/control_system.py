@@ -4,49 +4,34 @@
 
 from abc import abstractmethod
 import datetime
-from multiprocessing import Queue, Process
-from queue import Empty
-import math
-from time import sleep
 from typing import Optional
 
 from geopy import Point as GeoPoint
 
+from src import geo
+from src.base_component import BaseComponent
 from src.queues_dir import QueuesDirectory
 from src.mission_type import Mission
-from src.event_types import Event, ControlEvent
 from src.config import CONTROL_SYSTEM_QUEUE_NAME, \
-    CRITICALITY_STR, DEFAULT_LOG_LEVEL, LOG_DEBUG, LOG_ERROR, LOG_INFO
+    DEFAULT_LOG_LEVEL, LOG_DEBUG, LOG_INFO
 from src.route import Route
 
 
-class BaseControlSystem(Process):
+class BaseControlSystem(BaseComponent):
     """ базовый класс для блока управления """
     log_prefix = "[CONTROL]"
     event_source_name = CONTROL_SYSTEM_QUEUE_NAME
     events_q_name = event_source_name
+    # управление пересчитывается только по самым свежим координатам
+    coalesced_operations = ("position_update",)
 
     def __init__(self, queues_dir: QueuesDirectory, log_level=DEFAULT_LOG_LEVEL):
-        # вызываем конструктор базового класса
-        super().__init__()
-        self._queues_dir = queues_dir
+        # вызываем конструктор базового класса,
+        # управление пересчитывается сразу по приходу новых координат
+        super().__init__(queues_dir, log_level=log_level)
 
-        # создаём очередь для сообщений на обработку
-        self._events_q = Queue()
-        self._events_q_name = self.events_q_name
         self._tolerance_meters = 5  # радиус достижения путевой точки
 
-        self._queues_dir.register(
-            queue=self._events_q, name=self._events_q_name)
-
-        self._quit = False
-        # очередь управляющих команд (например, для остановки работы модуля)
-        self._control_q = Queue()
-
-        # инициализируем интервал обновления
-        self._recalc_interval_sec = 0.1
-
-        self.log_level = log_level
         self._position = None
         self._route: Optional[Route] = None
         self._mission: Optional[Mission] = None
@@ -57,16 +42,6 @@ class BaseControlSystem(Process):
 
         self._log_message(LOG_INFO, "создана система управления")
 
-    def _log_message(self, criticality: int, message: str):
-        """_log_message печатает сообщение заданного уровня критичности
-
-        Args:
-            criticality (int): уровень критичности
-            message (str): текст сообщения
-        """
-        if criticality <= self.log_level:
-            print(f"[{CRITICALITY_STR[criticality]}]{self.log_prefix} {message}")
-
     def _set_speed(self, speed_kmh: float):
         """
         Устанавливает текущую скорость перемещения.
@@ -106,19 +81,11 @@ class BaseControlSystem(Process):
             LOG_DEBUG, f"получено маршрутное задание: {self._mission}")
         self._log_message(
             LOG_INFO, "установлена новая задача, начинаем следовать по маршруту, " +
-            f"текущее время {datetime.datetime.now().time()}")
-
-    # проверка наличия новых управляющих команд
-    def _check_control_q(self):
-        try:
-            request: ControlEvent = self._control_q.get_nowait()
-            self._log_message(LOG_DEBUG, f"проверяем запрос {request}")
-            if isinstance(request, ControlEvent) and request.operation == 'stop':
-                # поступил запрос на остановку монитора, поднимаем "красный флаг"
-                self._quit = True
-        except Empty:
-            # никаких команд не поступило, ну и ладно
-            pass
+            f"текущее время {self._current_time()}")
+
+    def _current_time(self) -> datetime.time:
+        """ текущее время по часам компонента (виртуальное при симуляции) """
+        return datetime.datetime.fromtimestamp(self._clock.time()).time()
 
     def _calculate_bearing(self, start: GeoPoint, end: GeoPoint) -> float:
         """_calculate_bearing возвращает направление перемещения
@@ -130,22 +97,7 @@ class BaseControlSystem(Process):
         Returns:
             float: направление в градусах 0..360
         """
-        delta_longitude = end.longitude - start.longitude
-        x = math.sin(math.radians(delta_longitude)) * \
-            math.cos(math.radians(end.latitude))
-        y = math.cos(math.radians(start.latitude)) * math.sin(math.radians(end.latitude)) - \
-            math.sin(math.radians(start.latitude)) * math.cos(math.radians(end.latitude)) * \
-            math.cos(math.radians(delta_longitude))
-
-        initial_bearing_rad = math.atan2(x, y)
-
-        # Преобразуем радианы в градусы
-        initial_bearing_deg = math.degrees(initial_bearing_rad)
-
-        # Нормализуем значение в диапазоне [0, 360]
-        compass_bearing = (initial_bearing_deg + 360) % 360
-
-        return compass_bearing
+        return geo.bearing_deg(start.latitude, start.longitude, end.latitude, end.longitude)
 
     def _calculate_current_bearing(self) -> float:
         """_calculate_bearing пересчёт направления с учётом текущих координат (self._position)
@@ -157,8 +109,7 @@ class BaseControlSystem(Process):
         if self._route.route_finished:
             return 0.0
         pos: GeoPoint = self._position
-        dst: GeoPoint = self._route.next_point()
-        bearing = self._calculate_bearing(pos, dst)
+        bearing = self._route.calculate_bearing_to_next_point(pos)
         if self._surprises_enabled and (self._route.current_index == 1):
             bearing += 180
             bearing = bearing % 360
@@ -204,7 +155,7 @@ class BaseControlSystem(Process):
             if self._route.route_finished:
                 self._log_message(
                     LOG_INFO, "маршрут пройден, " +
-                    f"текущее время {datetime.datetime.now().time()}")
+                    f"текущее время {self._current_time()}")
                 # оставить груз
                 self._release_cargo()
             else:
@@ -237,37 +188,20 @@ class BaseControlSystem(Process):
 
     def _check_events_q(self):
         """_check_events_q
-        проверяет входящие события до их полного исчерпания
+        обрабатывает все поступившие события, из устаревших координат
+        используется только последнее значение
         """
 
-        while True:
-            try:
-                event: Event = self._events_q.get_nowait()
-                if not isinstance(event, Event):
-                    return
-                if event.operation == 'set_mission':
-                    self._set_mission(event.parameters)
-                    self._lock_cargo()
-                elif event.operation == "position_update":
-                    self._position = event.parameters
-                    if self._route is not None:
-                        # пересчитаем направление движения и скорость, если уже есть маршрут
-                        self._recalc_control()
-            except Empty:
-                # никаких команд не поступило, ну и ладно
-                break
-
-    def stop(self):
-        """ запрос остановки работы """
-        self._control_q.put(ControlEvent(operation='stop'))
+        for event in self._drain_events_q():
+            if event.operation == 'set_mission':
+                self._set_mission(event.parameters)
+                self._lock_cargo()
+            elif event.operation == "position_update":
+                self._position = event.parameters
+                if self._route is not None:
+                    # пересчитаем направление движения и скорость, если уже есть маршрут
+                    self._recalc_control()
 
     def run(self):
         self._log_message(LOG_INFO, "старт системы управления")
-
-        while self._quit is False:
-            sleep(self._recalc_interval_sec)
-            try:
-                self._check_events_q()
-                self._check_control_q()
-            except Exception as e:
-                self._log_message(LOG_ERROR, f"ошибка системы управления: {e}")
+        self._event_loop()
@@ -1,9 +1,120 @@
 """ типы данных для информационных и управляющих сообщений """
+import pickle
+import struct
 from dataclasses import dataclass
 from typing import Any, Optional
 
+from geopy import Point as GeoPoint
 
-@dataclass
+from src.config import PLANNER_QUEUE_NAME, COMMUNICATION_GATEWAY_QUEUE_NAME, \
+    CONTROL_SYSTEM_QUEUE_NAME, SENSORS_QUEUE_NAME, SERVOS_QUEUE_NAME, NAVIGATION_QUEUE_NAME, \
+    SITL_QUEUE_NAME, CARGO_BAY_QUEUE_NAME, SITL_TELEMETRY_QUEUE_NAME, MISSION_SENDER_QUEUE_NAME, \
+    SAFETY_BLOCK_QUEUE_NAME, SECURITY_MONITOR_QUEUE_NAME, RECEIVER_QUEUE_NAME, \
+    MISSION_RECEIVER_QUEUE_NAME, TELEMETRY_TRANSMITTER_QUEUE_NAME, OPERATOR_QUEUE_NAME
+
+# таблица кодов имён очередей (отправителей и получателей),
+# новые имена добавляются только в конец, чтобы не менять существующие коды
+QUEUE_NAMES = (
+    PLANNER_QUEUE_NAME, COMMUNICATION_GATEWAY_QUEUE_NAME, CONTROL_SYSTEM_QUEUE_NAME,
+    SENSORS_QUEUE_NAME, SERVOS_QUEUE_NAME, NAVIGATION_QUEUE_NAME, SITL_QUEUE_NAME,
+    CARGO_BAY_QUEUE_NAME, SITL_TELEMETRY_QUEUE_NAME, MISSION_SENDER_QUEUE_NAME,
+    SAFETY_BLOCK_QUEUE_NAME, SECURITY_MONITOR_QUEUE_NAME, RECEIVER_QUEUE_NAME,
+    MISSION_RECEIVER_QUEUE_NAME, TELEMETRY_TRANSMITTER_QUEUE_NAME, OPERATOR_QUEUE_NAME
+)
+
+# таблица кодов известных операций, пополняется так же - только в конец
+OPERATIONS = (
+    "position_update", "set_speed", "set_direction", "post_position",
+    "post_telemetry", "set_mission", "post_mission", "lock_cargo",
+    "release_cargo", "post_coordinates"
+)
+
+QUEUE_CODES = {name: code for code, name in enumerate(QUEUE_NAMES)}
+OPERATION_CODES = {name: code for code, name in enumerate(OPERATIONS)}
+
+_CODEC_VERSION = 1
+_INLINE_STRING = 0xFF   # вместо кода передаётся сама строка
+
+# виды значений параметров
+_VALUE_NONE = 0
+_VALUE_FLOAT = 1
+_VALUE_INT = 2
+_VALUE_POINT = 3
+_VALUE_MOTION = 4   # {"bearing": float, "speed": float} из телеметрии симулятора
+_VALUE_STR = 5
+_VALUE_PICKLE = 6
+
+_HEADER = struct.Struct("<BBBB")
+_BYTE = struct.Struct("<B")
+_LENGTH = struct.Struct("<I")
+_FLOAT = struct.Struct("<d")
+_INT = struct.Struct("<q")
+_POINT = struct.Struct("<ddd")
+_MOTION = struct.Struct("<dd")
+
+
+def _encode_str(value: str) -> bytes:
+    data = value.encode()
+    return _LENGTH.pack(len(data)) + data
+
+
+def _decode_str(data, offset: int):
+    length = _LENGTH.unpack_from(data, offset)[0]
+    offset += _LENGTH.size
+    return bytes(data[offset:offset + length]).decode(), offset + length
+
+
+def _encode_value(value) -> bytes:
+    """ кодирование параметра события, редкие типы передаются через pickle """
+    # pylint: disable=unidiomatic-typecheck
+    if value is None:
+        return _BYTE.pack(_VALUE_NONE)
+    if type(value) is float:
+        return _BYTE.pack(_VALUE_FLOAT) + _FLOAT.pack(value)
+    if type(value) is int and -(1 << 63) <= value < (1 << 63):
+        return _BYTE.pack(_VALUE_INT) + _INT.pack(value)
+    if type(value) is GeoPoint:
+        return _BYTE.pack(_VALUE_POINT) + \
+            _POINT.pack(value.latitude, value.longitude, value.altitude)
+    if type(value) is dict and value.keys() == {"bearing", "speed"} \
+            and type(value["bearing"]) is float and type(value["speed"]) is float:
+        return _BYTE.pack(_VALUE_MOTION) + _MOTION.pack(value["bearing"], value["speed"])
+    if type(value) is str:
+        return _BYTE.pack(_VALUE_STR) + _encode_str(value)
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    return _BYTE.pack(_VALUE_PICKLE) + _LENGTH.pack(len(data)) + data
+
+
+def _decode_value(data, offset: int):
+    """ декодирование параметра, возвращает значение и смещение за ним """
+    tag = data[offset]
+    offset += 1
+    if tag == _VALUE_NONE:
+        return None, offset
+    if tag == _VALUE_FLOAT:
+        return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+    if tag == _VALUE_INT:
+        return _INT.unpack_from(data, offset)[0], offset + _INT.size
+    if tag == _VALUE_POINT:
+        return GeoPoint(*_POINT.unpack_from(data, offset)), offset + _POINT.size
+    if tag == _VALUE_MOTION:
+        bearing, speed = _MOTION.unpack_from(data, offset)
+        return {"bearing": bearing, "speed": speed}, offset + _MOTION.size
+    if tag == _VALUE_STR:
+        return _decode_str(data, offset)
+    if tag == _VALUE_PICKLE:
+        length = _LENGTH.unpack_from(data, offset)[0]
+        offset += _LENGTH.size
+        return pickle.loads(data[offset:offset + length]), offset + length
+    raise ValueError(f"неизвестный тип параметра {tag}")
+
+
+def _decode_event(data) -> "Event":
+    """ восстановление события из компактного представления (используется pickle) """
+    return Event.from_bytes(data)
+
+
+@dataclass(slots=True)
 class Event:
     """ формат событий для обработки """
     source: str       # отправитель
@@ -15,8 +126,66 @@ class Event:
     signature: Optional[str] = None   # цифровая подпись или аналог\
                                       # для проверки целостности и аутентичности сообщения
 
+    def to_bytes(self) -> bytes:
+        """to_bytes компактное двоичное представление события
+
+        Имена очередей и операции из таблиц QUEUE_NAMES и OPERATIONS передаются кодами,
+        координаты, числа и строки - в упакованном виде, прочие параметры - через pickle.
+
+        Returns:
+            bytes: закодированное событие
+        """
+        source = QUEUE_CODES.get(self.source, _INLINE_STRING)
+        destination = QUEUE_CODES.get(self.destination, _INLINE_STRING)
+        operation = OPERATION_CODES.get(self.operation, _INLINE_STRING)
+        parts = [_HEADER.pack(_CODEC_VERSION, operation, source, destination)]
+        for code, value in ((source, self.source),
+                            (destination, self.destination),
+                            (operation, self.operation)):
+            if code == _INLINE_STRING:
+                parts.append(_encode_str(value))
+        parts.append(_encode_value(self.parameters))
+        parts.append(_encode_value(self.extra_parameters))
+        parts.append(_encode_value(self.signature))
+        return b"".join(parts)
+
+    @staticmethod
+    def from_bytes(data) -> "Event":
+        """from_bytes восстановление события из двоичного представления
+
+        Args:
+            data (bytes): результат Event.to_bytes()
+
+        Returns:
+            Event: событие
+        """
+        version, operation, source, destination = _HEADER.unpack_from(data, 0)
+        if version != _CODEC_VERSION:
+            raise ValueError(f"неподдерживаемая версия формата события {version}")
+        offset = _HEADER.size
+        names = []
+        for code, table in ((source, QUEUE_NAMES),
+                            (destination, QUEUE_NAMES),
+                            (operation, OPERATIONS)):
+            if code == _INLINE_STRING:
+                name, offset = _decode_str(data, offset)
+            else:
+                name = table[code]
+            names.append(name)
+        parameters, offset = _decode_value(data, offset)
+        extra_parameters, offset = _decode_value(data, offset)
+        signature, _ = _decode_value(data, offset)
+        return Event(source=names[0], destination=names[1], operation=names[2],
+                     parameters=parameters, extra_parameters=extra_parameters,
+                     signature=signature)
+
+    def __reduce__(self):
+        # multiprocessing.Queue и прочие пользователи pickle
+        # получают компактное представление вместо полного описания класса
+        return (_decode_event, (self.to_bytes(),))
+
 
-@dataclass
+@dataclass(slots=True)
 class ControlEvent:
     """ формат управляющих команд для сущностей (например, для остановки работы) """
     operation: str  # код операции
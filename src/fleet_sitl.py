@@ -0,0 +1,255 @@
+""" модуль векторного симулятора движения группы машинок
+
+Все машинки парка моделируются в одном процессе: положения, скорости и направления
+хранятся в массивах NumPy и пересчитываются одной векторной операцией.
+Для каждой машинки сохраняется протокол очереди симулятора (sitl):
+post_position, set_speed, set_direction.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+from geopy import Point
+
+from src.config import LOG_DEBUG, LOG_ERROR, LOG_INFO, SITL_QUEUE_NAME, \
+    NAVIGATION_QUEUE_NAME, SITL_TELEMETRY_QUEUE_NAME, FLEET_SITL_QUEUE_NAME, DEFAULT_LOG_LEVEL
+from src.geo import WGS84_A, WGS84_E2
+from src.base_component import BaseComponent, wait_for_queues
+from src.queues_dir import QueuesDirectory
+from src.event_types import Event
+
+
+def destination(
+        latitude: np.ndarray, longitude: np.ndarray,
+        bearing: np.ndarray, distance_m: np.ndarray):
+    """destination векторный расчёт конечных точек перемещения,
+    векторный аналог src.geo.destination
+
+    Используются радиусы кривизны эллипсоида WGS-84 в начальной точке,
+    для перемещений за такт симуляции (единицы метров) расхождение
+    с geopy.distance.distance(...).destination() не превышает миллиметров.
+
+    Args:
+        latitude (np.ndarray): широты в градусах
+        longitude (np.ndarray): долготы в градусах
+        bearing (np.ndarray): направления движения в градусах
+        distance_m (np.ndarray): пройденные расстояния в метрах
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: новые широты и долготы в градусах
+    """
+    lat_rad = np.radians(latitude)
+    bearing_rad = np.radians(bearing)
+    sin_lat = np.sin(lat_rad)
+    w2 = 1.0 - WGS84_E2 * sin_lat * sin_lat
+    # радиусы кривизны меридиана и первого вертикала
+    meridian = WGS84_A * (1.0 - WGS84_E2) / (w2 * np.sqrt(w2))
+    prime_vertical = WGS84_A / np.sqrt(w2)
+
+    # смещение считаем в середине пути, это убирает ошибку первого порядка
+    d_lat = distance_m * np.cos(bearing_rad) / meridian
+    mid_lat = lat_rad + d_lat / 2
+    d_lon = distance_m * np.sin(bearing_rad) / (prime_vertical * np.cos(mid_lat))
+
+    new_latitude = np.degrees(lat_rad + d_lat)
+    new_longitude = (np.degrees(np.radians(longitude) + d_lon) + 180.0) % 360.0 - 180.0
+    return new_latitude, new_longitude
+
+
+class FleetSITL(BaseComponent):
+    """FleetSITL симулятор движения парка машинок в одном процессе
+
+    Каждая машинка добавляется методом add_car до запуска симулятора.
+    Если для машинки указан собственный каталог очередей, в нём регистрируется
+    очередь симулятора SITL_QUEUE_NAME, и компоненты машинки работают с ней
+    так же, как с обычным SITL: ответы на post_position уходят в очередь
+    навигации, телеметрия - в очередь SITL_TELEMETRY_QUEUE_NAME этого каталога.
+    Машинкам без своего каталога команды передаются через общую очередь парка,
+    идентификатор машинки указывается в extra_parameters["car_id"].
+    """
+    log_prefix = "[FLEET.SITL]"
+    event_source_name = SITL_QUEUE_NAME
+    events_q_name = FLEET_SITL_QUEUE_NAME
+    coalesced_operations = ("set_speed", "set_direction")
+
+    def __init__(
+            self, queues_dir: QueuesDirectory,
+            recalc_interval_sec: float = 0.1,
+            post_telemetry: bool = False,
+            log_level = DEFAULT_LOG_LEVEL
+    ):
+        self._recalc_interval_sec = recalc_interval_sec
+
+        # вызываем конструктор базового класса,
+        # положения всех машинок пересчитываются одновременно раз в такт
+        super().__init__(queues_dir, log_level=log_level,
+                         tick_interval_sec=self._recalc_interval_sec)
+
+        self._post_telemetry_enabled = post_telemetry
+
+        # идентификаторы машинок и их индексы в массивах состояния
+        self._car_ids: List[str] = []
+        self._car_index: Dict[str, int] = {}
+        # каталоги и очереди симулятора отдельных машинок
+        self._car_dirs: List[Optional[QueuesDirectory]] = []
+        self._car_queues = []
+
+        # состояние парка
+        self._latitude = np.zeros(0)
+        self._longitude = np.zeros(0)
+        self._altitude = np.zeros(0)
+        self._speed_kmph = np.zeros(0)
+        self._bearing = np.zeros(0)
+
+        self._log_message(LOG_INFO, "создан симулятор парка машинок")
+
+    def add_car(
+            self, car_id: str, position: Point = None,
+            queues_dir: Optional[QueuesDirectory] = None) -> int:
+        """add_car добавление машинки в парк, вызывается до запуска симулятора
+
+        Args:
+            car_id (str): идентификатор машинки
+            position (Point, optional): начальное положение. Defaults to Point(0.0, 0.0).
+            queues_dir (Optional[QueuesDirectory]): каталог очередей компонентов машинки,
+                None - машинка управляется через общую очередь парка
+
+        Returns:
+            int: индекс машинки в массивах состояния
+        """
+        if car_id in self._car_index:
+            raise ValueError(f"машинка {car_id} уже добавлена")
+        if position is None:
+            position = Point(0.0, 0.0)
+
+        index = len(self._car_ids)
+        self._car_ids.append(car_id)
+        self._car_index[car_id] = index
+        self._car_dirs.append(queues_dir)
+        if queues_dir is not None:
+            self._car_queues.append((index, queues_dir.create_queue(SITL_QUEUE_NAME)))
+
+        self._latitude = np.append(self._latitude, position.latitude)
+        self._longitude = np.append(self._longitude, position.longitude)
+        self._altitude = np.append(self._altitude, position.altitude)
+        self._speed_kmph = np.append(self._speed_kmph, 0.0)
+        self._bearing = np.append(self._bearing, 0.0)
+
+        self._log_message(LOG_DEBUG, f"добавлена машинка {car_id}")
+        return index
+
+    def car_ids(self) -> List[str]:
+        """car_ids выдаёт идентификаторы машинок парка
+
+        Returns:
+            List[str]: идентификаторы в порядке добавления
+        """
+        return list(self._car_ids)
+
+    def position(self, car_id: str) -> Point:
+        """position выдаёт текущее положение машинки
+
+        Args:
+            car_id (str): идентификатор машинки
+
+        Returns:
+            Point: координаты
+        """
+        i = self._car_index[car_id]
+        return Point(float(self._latitude[i]), float(self._longitude[i]),
+                     float(self._altitude[i]))
+
+    def _post_position(self, index: int):
+        position = self.position(self._car_ids[index])
+        queues_dir = self._car_dirs[index]
+        if queues_dir is None:
+            queues_dir = self._queues_dir
+        try:
+            nav_q = queues_dir.get_queue(NAVIGATION_QUEUE_NAME)
+            nav_q.put(Event(source=FleetSITL.event_source_name,
+                            destination=NAVIGATION_QUEUE_NAME,
+                            operation="position_update",
+                            parameters=position,
+                            extra_parameters=None if self._car_dirs[index] is not None
+                            else {"car_id": self._car_ids[index]}))
+        except Exception as e:
+            self._log_message(LOG_ERROR, f"ошибка отправки координат: {e}")
+        if self._post_telemetry_enabled:
+            self._post_telemetry(index, position, queues_dir)
+
+    def _post_telemetry(self, index: int, position: Point, queues_dir: QueuesDirectory):
+        event = Event(source=FleetSITL.event_source_name,
+                      destination=SITL_TELEMETRY_QUEUE_NAME,
+                      operation="post_telemetry",
+                      parameters=position,
+                      extra_parameters={
+                          "bearing": float(self._bearing[index]),
+                          "speed": float(self._speed_kmph[index])}
+                      )
+        try:
+            queues_dir.get_queue(SITL_TELEMETRY_QUEUE_NAME).put(event)
+        except Exception as e:
+            self._log_message(LOG_ERROR, f"ошибка отправки телеметрии: {e}")
+
+    def _handle_event(self, index: int, event: Event):
+        if event.operation == 'post_position':
+            self._post_position(index)
+        elif event.operation == 'set_speed':
+            self._speed_kmph[index] = float(event.parameters)
+        elif event.operation == 'set_direction':
+            self._bearing[index] = float(event.parameters)
+
+    def _check_events_q(self):
+        # команды отдельных машинок
+        for index, q in self._car_queues:
+            for event in self._drain_events_q(q):
+                self._handle_event(index, event)
+
+        # команды через общую очередь парка, устаревшие команды
+        # объединяются отдельно для каждой машинки, как в _drain_events_q:
+        # остаётся последнее событие на месте последнего вхождения
+        events = []
+        for event in self._drain_events_q(coalesce=False):
+            try:
+                index = self._car_index[event.extra_parameters["car_id"]]
+            except (KeyError, TypeError):
+                self._log_message(LOG_ERROR, f"неизвестная машинка в событии {event}")
+                continue
+            events.append((index, event))
+        seen = set()
+        result = []
+        for index, event in reversed(events):
+            if event.operation in self.coalesced_operations:
+                key = (index, event.operation)
+                if key in seen:
+                    self._coalesced_counters[event.operation] = \
+                        self._coalesced_counters.get(event.operation, 0) + 1
+                    continue
+                seen.add(key)
+            result.append((index, event))
+        for index, event in reversed(result):
+            self._handle_event(index, event)
+
+    def _wait_for_events(self, timeout: Optional[float]) -> bool:
+        queues = [self._events_q, self._control_q] + [q for _, q in self._car_queues]
+        return wait_for_queues(queues, timeout)
+
+    def _has_pending_events(self) -> bool:
+        return not self._events_q.empty() or \
+            any(not q.empty() for _, q in self._car_queues)
+
+    def _recalc(self):
+        moving = self._speed_kmph != 0
+        if not moving.any():
+            return
+        distance_m = self._speed_kmph[moving] * (self._recalc_interval_sec / 3.6)
+        self._latitude[moving], self._longitude[moving] = destination(
+            self._latitude[moving], self._longitude[moving],
+            self._bearing[moving], distance_m)
+
+    def _on_tick(self):
+        self._recalc()
+
+    def run(self):
+        self._log_message(
+            LOG_INFO, f"старт симуляции парка, машинок: {len(self._car_ids)}")
+        self._event_loop()
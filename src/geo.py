@@ -0,0 +1,257 @@
+""" модуль геодезических расчётов для пересчёта положения и управления
+
+Расстояния и направления на коротких отрезках считаются в локальной касательной
+плоскости (ENU) с радиусами кривизны эллипсоида WGS-84 - без создания объектов geopy
+и с минимумом тригонометрии. На длинных отрезках, где погрешность приближения
+становится заметной, используется формула Винсенти.
+"""
+import math
+from typing import Tuple
+
+from geographiclib.geodesic import Geodesic
+from geopy import Point as GeoPoint
+
+# параметры эллипсоида WGS-84
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+
+# до этого расстояния погрешность касательной плоскости не превышает сантиметра
+LOCAL_APPROXIMATION_LIMIT_M = 2000.0
+
+_VINCENTY_TOLERANCE = 1e-12
+_VINCENTY_MAX_ITERATIONS = 200
+
+
+def radii_of_curvature(sin_lat: float) -> Tuple[float, float]:
+    """radii_of_curvature радиусы кривизны эллипсоида на заданной широте
+
+    Args:
+        sin_lat (float): синус широты
+
+    Returns:
+        Tuple[float, float]: радиусы кривизны меридиана и первого вертикала в метрах
+    """
+    w2 = 1.0 - WGS84_E2 * sin_lat * sin_lat
+    w = math.sqrt(w2)
+    return WGS84_A * (1.0 - WGS84_E2) / (w2 * w), WGS84_A / w
+
+
+def local_offset_m(
+        lat1: float, lon1: float, lat2: float, lon2: float) -> Tuple[float, float]:
+    """local_offset_m смещение второй точки относительно первой в касательной плоскости
+
+    Args:
+        lat1, lon1 (float): широта и долгота начальной точки в градусах
+        lat2, lon2 (float): широта и долгота конечной точки в градусах
+
+    Returns:
+        Tuple[float, float]: смещение на восток и на север в метрах
+    """
+    mid_lat = math.radians((lat1 + lat2) / 2)
+    sin_mid = math.sin(mid_lat)
+    meridian, prime_vertical = radii_of_curvature(sin_mid)
+    d_lon = (lon2 - lon1 + 180.0) % 360.0 - 180.0
+    east = math.radians(d_lon) * prime_vertical * math.cos(mid_lat)
+    north = math.radians(lat2 - lat1) * meridian
+    return east, north
+
+
+def vincenty_inverse(
+        lat1: float, lon1: float, lat2: float, lon2: float) -> Tuple[float, float]:
+    """vincenty_inverse обратная геодезическая задача по формуле Винсенти
+
+    Для почти диаметрально противоположных точек, где итерации не сходятся,
+    используется geographiclib (на ней основан geopy.distance.geodesic).
+
+    Args:
+        lat1, lon1 (float): широта и долгота начальной точки в градусах
+        lat2, lon2 (float): широта и долгота конечной точки в градусах
+
+    Returns:
+        Tuple[float, float]: расстояние в метрах и начальное направление в градусах 0..360
+    """
+    if lat1 == lat2 and lon1 == lon2:
+        return 0.0, 0.0
+
+    u1 = math.atan((1 - WGS84_F) * math.tan(math.radians(lat1)))
+    u2 = math.atan((1 - WGS84_F) * math.tan(math.radians(lat2)))
+    sin_u1, cos_u1 = math.sin(u1), math.cos(u1)
+    sin_u2, cos_u2 = math.sin(u2), math.cos(u2)
+    big_l = math.radians(lon2 - lon1)
+    lam = big_l
+
+    for _ in range(_VINCENTY_MAX_ITERATIONS):
+        sin_lam, cos_lam = math.sin(lam), math.cos(lam)
+        sin_sigma = math.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+        if sin_sigma == 0:
+            return 0.0, 0.0
+        cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+        sigma = math.atan2(sin_sigma, cos_sigma)
+        sin_alpha = cos_u1 * cos_u2 * sin_lam / sin_sigma
+        cos2_alpha = 1 - sin_alpha * sin_alpha
+        cos_2sigma_m = cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha if cos2_alpha else 0.0
+        c = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+        lam_prev = lam
+        lam = big_l + (1 - c) * WGS84_F * sin_alpha * (
+            sigma + c * sin_sigma * (
+                cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m * cos_2sigma_m)))
+        if abs(lam - lam_prev) < _VINCENTY_TOLERANCE:
+            break
+    else:
+        result = Geodesic.WGS84.Inverse(lat1, lon1, lat2, lon2)
+        return result["s12"], (result["azi1"] + 360.0) % 360.0
+
+    u_sq = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = big_b * sin_sigma * (
+        cos_2sigma_m + big_b / 4 * (
+            cos_sigma * (-1 + 2 * cos_2sigma_m * cos_2sigma_m) -
+            big_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma * sin_sigma) *
+            (-3 + 4 * cos_2sigma_m * cos_2sigma_m)))
+    distance = WGS84_B * big_a * (sigma - delta_sigma)
+    bearing = math.degrees(math.atan2(
+        cos_u2 * math.sin(lam), cos_u1 * sin_u2 - sin_u1 * cos_u2 * math.cos(lam)))
+    return distance, (bearing + 360.0) % 360.0
+
+
+def distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """distance_m расстояние между точками по поверхности эллипсоида
+
+    Args:
+        lat1, lon1 (float): широта и долгота начальной точки в градусах
+        lat2, lon2 (float): широта и долгота конечной точки в градусах
+
+    Returns:
+        float: расстояние в метрах
+    """
+    east, north = local_offset_m(lat1, lon1, lat2, lon2)
+    distance = math.hypot(east, north)
+    if distance <= LOCAL_APPROXIMATION_LIMIT_M:
+        return distance
+    return vincenty_inverse(lat1, lon1, lat2, lon2)[0]
+
+
+def bearing_deg(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """bearing_deg начальное направление от первой точки на вторую
+
+    Args:
+        lat1, lon1 (float): широта и долгота начальной точки в градусах
+        lat2, lon2 (float): широта и долгота конечной точки в градусах
+
+    Returns:
+        float: направление в градусах 0..360
+    """
+    east, north = local_offset_m(lat1, lon1, lat2, lon2)
+    if math.hypot(east, north) > LOCAL_APPROXIMATION_LIMIT_M:
+        return vincenty_inverse(lat1, lon1, lat2, lon2)[1]
+    return (math.degrees(math.atan2(east, north)) + 360.0) % 360.0
+
+
+def destination(
+        lat: float, lon: float, bearing: float, distance: float) -> Tuple[float, float]:
+    """destination конечная точка перемещения на заданное расстояние
+
+    Предназначена для шагов симуляции (единицы и десятки метров),
+    более длинные перемещения считаются через geographiclib.
+
+    Args:
+        lat, lon (float): широта и долгота начальной точки в градусах
+        bearing (float): направление движения в градусах
+        distance (float): расстояние в метрах
+
+    Returns:
+        Tuple[float, float]: широта и долгота конечной точки в градусах
+    """
+    if distance > LOCAL_APPROXIMATION_LIMIT_M:
+        result = Geodesic.WGS84.Direct(lat, lon, bearing, distance)
+        return result["lat2"], result["lon2"]
+
+    lat_rad = math.radians(lat)
+    bearing_rad = math.radians(bearing)
+    meridian, prime_vertical = radii_of_curvature(math.sin(lat_rad))
+    # смещение по долготе считаем на средней широте пути
+    d_lat = distance * math.cos(bearing_rad) / meridian
+    d_lon = distance * math.sin(bearing_rad) / (prime_vertical * math.cos(lat_rad + d_lat / 2))
+    new_lon = (math.degrees(math.radians(lon) + d_lon) + 180.0) % 360.0 - 180.0
+    return math.degrees(lat_rad + d_lat), new_lon
+
+
+class Segment:
+    """Segment отрезок маршрута с заранее вычисленной тригонометрией конечной точки
+
+    Используется для многократного расчёта расстояния и направления
+    от текущего положения до конца отрезка: на каждый запрос приходится
+    одно извлечение корня и, для направления, один atan2.
+    """
+    __slots__ = ("start", "end", "length_m", "bearing_deg",
+                 "_lat", "_lon", "_sin_lat", "_cos_lat", "_meridian", "_prime_vertical")
+
+    def __init__(self, start: GeoPoint, end: GeoPoint):
+        """__init__ создание отрезка
+
+        Args:
+            start (GeoPoint): начальная точка
+            end (GeoPoint): конечная точка
+        """
+        self.start = start
+        self.end = end
+        self._lat = end.latitude
+        self._lon = end.longitude
+        lat_rad = math.radians(self._lat)
+        self._sin_lat = math.sin(lat_rad)
+        self._cos_lat = math.cos(lat_rad)
+        self._meridian, self._prime_vertical = radii_of_curvature(self._sin_lat)
+        self.length_m = distance_m(start.latitude, start.longitude, self._lat, self._lon)
+        self.bearing_deg = bearing_deg(start.latitude, start.longitude, self._lat, self._lon)
+
+    def offset_to_end(self, position: GeoPoint) -> Tuple[float, float]:
+        """offset_to_end смещение конца отрезка относительно положения
+
+        Косинус средней широты получается разложением от широты конечной
+        точки, поэтому тригонометрия не вычисляется на каждом запросе.
+
+        Args:
+            position (GeoPoint): текущее положение
+
+        Returns:
+            Tuple[float, float]: смещение на восток и на север в метрах
+        """
+        d_lat = math.radians(self._lat - position.latitude)
+        d_lon = math.radians((self._lon - position.longitude + 180.0) % 360.0 - 180.0)
+        half = d_lat / 2
+        # cos(lat - d_lat/2) ~ cos(lat) * (1 - half^2/2) + sin(lat) * half
+        cos_mid = self._cos_lat * (1 - half * half / 2) + self._sin_lat * half
+        return d_lon * self._prime_vertical * cos_mid, d_lat * self._meridian
+
+    def distance_to_end(self, position: GeoPoint) -> float:
+        """distance_to_end расстояние от положения до конца отрезка
+
+        Args:
+            position (GeoPoint): текущее положение
+
+        Returns:
+            float: расстояние в метрах
+        """
+        east, north = self.offset_to_end(position)
+        distance = math.hypot(east, north)
+        if distance <= LOCAL_APPROXIMATION_LIMIT_M:
+            return distance
+        return vincenty_inverse(position.latitude, position.longitude, self._lat, self._lon)[0]
+
+    def bearing_to_end(self, position: GeoPoint) -> float:
+        """bearing_to_end направление от положения на конец отрезка
+
+        Args:
+            position (GeoPoint): текущее положение
+
+        Returns:
+            float: направление в градусах 0..360
+        """
+        east, north = self.offset_to_end(position)
+        if math.hypot(east, north) > LOCAL_APPROXIMATION_LIMIT_M:
+            return vincenty_inverse(
+                position.latitude, position.longitude, self._lat, self._lon)[1]
+        return (math.degrees(math.atan2(east, north)) + 360.0) % 360.0
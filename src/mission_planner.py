@@ -1,45 +1,33 @@
 """ модуль работы с маршрутным заданием
 """
-from time import sleep
 from queue import Empty
 from typing import Optional, List
-from multiprocessing import Queue, Process
+from multiprocessing import Queue
 from geopy import Point
 
-from src.config import CRITICALITY_STR, LOG_DEBUG, \
+from src.config import LOG_DEBUG, \
     LOG_ERROR, LOG_INFO, PLANNER_QUEUE_NAME, DEFAULT_LOG_LEVEL, MISSION_SENDER_QUEUE_NAME
+from src.base_component import BaseComponent
 from src.queues_dir import QueuesDirectory
-from src.event_types import Event, ControlEvent
+from src.event_types import Event
 from src.mission_type import Mission
 
 
-class MissionPlanner(Process):
+class MissionPlanner(BaseComponent):
     """MissionPlanner обработчик и хранитель маршрутного задания
        как и остальные компоненты работает в отдельном процессе
     """
     log_prefix = "[MISSION PLANNER]"
     event_source_name = PLANNER_QUEUE_NAME
     event_q_name = event_source_name
+    events_q_name = event_source_name
     log_level = DEFAULT_LOG_LEVEL
 
     def __init__(
             self, queues_dir: QueuesDirectory, afcs_present: bool = False, mission: Mission = None):
-        # вызываем конструктор базового класса
-        super().__init__()
-
-        self._queues_dir = queues_dir
-
-        # создаём очередь для сообщений на обработку
-        self._events_q = Queue()
-        self._events_q_name = MissionPlanner.event_q_name
-        self._queues_dir.register(
-            queue=self._events_q, name=self._events_q_name)
-        # инициализируем интервал обновления
-        self._recalc_interval_sec = 0.1
-
-        self._quit = False
-        # очередь управляющих команд (например, для остановки работы модуля)
-        self._control_q = Queue()
+        # вызываем конструктор базового класса,
+        # задания обрабатываются сразу по поступлению
+        super().__init__(queues_dir)
 
         # есть ли система управления парком автомобилей
         # (нужно ли отправлять туда маршрутное задание)
@@ -54,16 +42,6 @@ class MissionPlanner(Process):
 
         self._log_message(LOG_INFO, "создана система планирования заданий")
 
-    def _log_message(self, criticality: int, message: str):
-        """_log_message печатает сообщение заданного уровня критичности
-
-        Args:
-            criticality (int): уровень критичности
-            message (str): текст сообщения
-        """
-        if criticality <= self.log_level:
-            print(f"[{CRITICALITY_STR[criticality]}]{self.log_prefix} {message}")
-
     def _get_mission(self) -> Optional[Mission]:
         self._log_message(LOG_INFO, "получен запрос новой миссии")
         return self._mission
@@ -140,19 +118,6 @@ class MissionPlanner(Process):
             self._log_message(
                 LOG_ERROR, f"ошибка отправки задачи в коммуникационный шлюз: {e}")
 
-    # проверка наличия новых управляющих команд
-
-    def _check_control_q(self):
-        try:
-            request: ControlEvent = self._control_q.get_nowait()
-            self._log_message(LOG_DEBUG, f"проверяем запрос {request}")
-            if isinstance(request, ControlEvent) and request.operation == 'stop':
-                # поступил запрос на остановку монитора, поднимаем "красный флаг"
-                self._quit = True
-        except Empty:
-            # никаких команд не поступило, ну и ладно
-            pass
-
     def _check_events_q(self):
         try:
             event: Event = self._events_q.get_nowait()
@@ -168,19 +133,7 @@ class MissionPlanner(Process):
             # никаких команд не поступило, ну и ладно
             pass
 
-    def stop(self):
-        """ запрос на остановку работы """
-        self._control_q.put(ControlEvent(operation='stop'))
-
     def run(self):
         """ начало работы """
         self._log_message(LOG_INFO, "старт системы планирования заданий")
-
-        while self._quit is False:
-            sleep(self._recalc_interval_sec)
-            try:
-                self._check_events_q()
-                self._check_control_q()
-            except Exception as e:
-                self._log_message(
-                    LOG_ERROR, f"ошибка обновления координат: {e}")
+        self._event_loop()
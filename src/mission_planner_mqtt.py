@@ -1,61 +1,46 @@
 """ модуль отправки телеметрии в систему мониторинга """
-from multiprocessing import Queue, Process
 from queue import Empty
 import json
-from time import sleep, time
+from concurrent.futures import Future
 
 import paho.mqtt.client as mqtt
 
-from src.config import CRITICALITY_STR, \
+from src.config import \
     LOG_DEBUG, LOG_ERROR, LOG_INFO, MISSION_SENDER_QUEUE_NAME, DEFAULT_LOG_LEVEL
 from src.mission_type import Mission
+from src.base_component import BaseComponent
 from src.queues_dir import QueuesDirectory
-from src.event_types import Event, ControlEvent
+from src.event_types import Event
+from src.mqtt_publisher import PublishTracker, PublishTimeoutError
 
 
-class MissionSender(Process):
+class MissionSender(BaseComponent):
     """ класс отправки маршрутного задания в систему мониторинга по mqtt """
     MQTT_BROKER = "localhost"
     MQTT_PORT = 1883
     MQTT_MISSION_TOPIC = 'api/mission'
     TIMEOUT = 5
+    # окно: предельное число сообщений, ожидающих подтверждения брокера
+    MAX_INFLIGHT = 20
+    # период проверки сообщений без подтверждения, секунды
+    EXPIRE_INTERVAL_SEC = 1.0
 
     log_prefix = "[MISSION_PLANNER.MQTT]"
     event_source_name = MISSION_SENDER_QUEUE_NAME
     events_q_name = event_source_name    
 
-    def __init__(self, queues_dir: QueuesDirectory, client_id='', log_level = DEFAULT_LOG_LEVEL):
-        super().__init__()
+    def __init__(
+            self, queues_dir: QueuesDirectory, client_id='',
+            log_level = DEFAULT_LOG_LEVEL, max_inflight: int = MAX_INFLIGHT):
+        # по таймеру обнаруживаются сообщения без подтверждения
+        super().__init__(queues_dir, log_level=log_level,
+                         tick_interval_sec=MissionSender.EXPIRE_INTERVAL_SEC)
 
-        self._queues_dir = queues_dir
         self._client_id = client_id
 
-        # создаём очередь для сообщений на обработку
-        self._events_q = Queue()
-        self._events_q_name = self.events_q_name
-        self._queues_dir.register(
-            queue=self._events_q, name=self._events_q_name)
-
-        self._quit = False
-        # очередь управляющих команд (например, для остановки симуляции)
-        self._control_q = Queue()
-
         self._mqttc = None
-        self._published = False
-
-        # инициализируем интервал обновления
-        self._recalc_interval_sec = 0.5
-        self.log_level = log_level
-
-    def _log_message(self, criticality: int, message: str):
-        """_log_message печатает сообщение заданного уровня критичности
-
-        Args:
-            criticality (int): уровень критичности
-            message (str): текст сообщения
-        """
-        if criticality <= self.log_level:
-            print(f"[{CRITICALITY_STR[criticality]}]{self.log_prefix} {message}")
+        # отправленные сообщения, ожидающие подтверждения, по их идентификаторам
+        self._publishes = PublishTracker(max_inflight, self.TIMEOUT)
 
     # The callback for when the client receives a CONNACK response from the server.
     def _on_connect(self, _, userdata, flags, reason_code):
@@ -70,26 +55,8 @@ class MissionSender(Process):
     def _on_message(self, _, __, msg):
         print(msg.topic+" "+str(msg.payload))
 
-    def _on_publish(self, _, __, ___):
-        self._published = True
-
-    def stop(self):
-        """ запрос остановки работы """
-        self._control_q.put(ControlEvent(operation='stop'))
-
-    # проверка наличия новых управляющих команд
-    def _check_control_q(self):
-        try:
-            request: ControlEvent = self._control_q.get_nowait()
-            self._log_message(LOG_DEBUG, "проверяем запрос {request}")
-            if not isinstance(request, ControlEvent):
-                return
-            if request.operation == 'stop':
-                # поступил запрос на остановку монитора, поднимаем "красный флаг"
-                self._quit = True
-        except Empty:
-            # никаких команд не поступило, ну и ладно
-            pass
+    def _on_publish(self, _, __, mid):
+        self._publishes.ack(mid)
 
     def _mission_to_mavlink_waypoints(self, mission: Mission):
         result = "QGC WPL 110\n"
@@ -106,18 +73,23 @@ class MissionSender(Process):
                 'id': self._client_id,
                 'mission_str': self._mission_to_mavlink_waypoints(mission)
             })
-            self._mqttc.publish(
-                self.MQTT_MISSION_TOPIC, payload, qos=1)
-            start_time = time()
-            while not self._published and time() - start_time < self.TIMEOUT:
-                sleep(0.1)
-            if self._published:
-                self._log_message(LOG_INFO, f"отправлен маршрут: {payload}")
-            else:
-                self._log_message(LOG_INFO, "таймаут отправки маршрута")
+            future = self._publishes.publish(self._mqttc, self.MQTT_MISSION_TOPIC, payload)
+            future.add_done_callback(lambda f: self._on_mission_delivered(f, payload))
         except Exception as e:
             self._log_message(LOG_ERROR, f"ошибка отправки маршрута: {e}")
 
+    def _on_mission_delivered(self, future: Future, payload: str):
+        try:
+            latency = future.result()
+        except PublishTimeoutError as e:
+            self._log_message(LOG_INFO, f"таймаут отправки маршрута: {e}")
+            return
+        self._log_message(
+            LOG_INFO, f"отправлен маршрут: {payload}, задержка {latency * 1000:.0f} мс")
+
+    def _on_tick(self):
+        self._publishes.expire()
+
     def _check_events_q(self):
         while True:
             try:
@@ -142,7 +114,7 @@ class MissionSender(Process):
 
         mqttc.on_message = self._on_message
 
-        self._published = False
+        mqttc.max_inflight_messages_set(self._publishes.max_inflight)
 
         mqttc.on_publish = self._on_publish
 
@@ -154,10 +126,7 @@ class MissionSender(Process):
         self._log_message(
             LOG_INFO, "клиент отправки маршрута создан и запущен")
 
-        while self._quit is False:
-            self._check_events_q()
-            self._check_control_q()
-            sleep(self._recalc_interval_sec)
+        self._event_loop()
 
         self._mqttc.loop_stop()
         self._mqttc.disconnect()
@@ -0,0 +1,199 @@
+""" модуль учёта публикаций MQTT с подтверждением доставки (qos=1)
+
+Публикация не блокирует компонент: сообщение отправляется сразу,
+подтверждение (PUBACK) сопоставляется с сообщением по его идентификатору (mid).
+Число неподтверждённых сообщений ограничено окном, для каждого сообщения
+измеряется задержка доставки.
+"""
+from concurrent.futures import Future
+from threading import Condition
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+
+class PublishTimeoutError(Exception):
+    """ подтверждение публикации не получено за отведённое время """
+
+
+class PublishTracker:
+    """PublishTracker неподтверждённые публикации MQTT по идентификаторам сообщений
+
+    Для каждой публикации выдаётся Future, который завершается задержкой доставки
+    в секундах при получении подтверждения или исключением PublishTimeoutError.
+    Подтверждение может прийти из сетевого потока paho раньше, чем публикация
+    будет зарегистрирована, такие подтверждения запоминаются.
+    """
+
+    def __init__(
+            self, max_inflight: int = 20, timeout_sec: float = 5.0,
+            clock: Callable[[], float] = monotonic):
+        """__init__ создание учёта публикаций
+
+        Args:
+            max_inflight (int): окно - предельное число неподтверждённых сообщений
+            timeout_sec (float): время ожидания подтверждения в секундах
+            clock (Callable[[], float]): источник монотонного времени
+        """
+        self.max_inflight = max_inflight
+        self.timeout_sec = timeout_sec
+        self._clock = clock
+        self._condition = Condition()
+        self._inflight: Dict[int, Tuple[Future, float]] = {}
+        self._early_acks: Dict[int, float] = {}
+        self.acked = 0
+        self.timed_out = 0
+        self.total_latency_sec = 0.0
+        self.last_latency_sec: Optional[float] = None
+
+    @property
+    def inflight(self) -> int:
+        """ число неподтверждённых сообщений """
+        with self._condition:
+            return len(self._inflight)
+
+    def mean_latency_sec(self) -> Optional[float]:
+        """mean_latency_sec средняя задержка доставки
+
+        Returns:
+            Optional[float]: задержка в секундах, None - подтверждений ещё не было
+        """
+        with self._condition:
+            return self.total_latency_sec / self.acked if self.acked else None
+
+    def _expire(self) -> List[Tuple[int, Future]]:
+        # вызывается под блокировкой, futures завершаются после её освобождения (_fail)
+        now = self._clock()
+        expired = [mid for mid, (_, sent) in self._inflight.items()
+                   if now - sent >= self.timeout_sec]
+        futures = []
+        for mid in expired:
+            future, _ = self._inflight.pop(mid)
+            self.timed_out += 1
+            futures.append((mid, future))
+        # подтверждения, для которых так и не появилась публикация, не храним вечно
+        for mid in [mid for mid, acked in self._early_acks.items()
+                    if now - acked >= self.timeout_sec]:
+            del self._early_acks[mid]
+        if futures:
+            self._condition.notify_all()
+        return futures
+
+    @staticmethod
+    def _fail(expired: List[Tuple[int, Future]]):
+        for mid, future in expired:
+            future.set_exception(PublishTimeoutError(f"нет подтверждения сообщения {mid}"))
+
+    def expire(self) -> int:
+        """expire завершение с ошибкой PublishTimeoutError сообщений без подтверждения
+        дольше timeout_sec, вызывается периодически компонентом-отправителем,
+        чтобы таймауты обнаруживались и без новых публикаций
+
+        Returns:
+            int: число сообщений с истёкшим сроком подтверждения
+        """
+        with self._condition:
+            expired = self._expire()
+        self._fail(expired)
+        return len(expired)
+
+    def wait_for_slot(self, timeout: Optional[float] = None) -> bool:
+        """wait_for_slot ожидание свободного места в окне
+
+        Сообщения без подтверждения дольше timeout_sec считаются потерянными
+        и освобождают окно.
+
+        Args:
+            timeout (Optional[float]): время ожидания в секундах, None - timeout_sec
+
+        Returns:
+            bool: True, если в окне есть место
+        """
+        if timeout is None:
+            timeout = self.timeout_sec
+        deadline = self._clock() + timeout
+        expired = []
+        try:
+            with self._condition:
+                while True:
+                    expired += self._expire()
+                    if len(self._inflight) < self.max_inflight:
+                        return True
+                    now = self._clock()
+                    if now >= deadline:
+                        return False
+                    # просыпаемся по подтверждению или к истечению срока самого старого сообщения
+                    self._condition.wait(min(deadline, self._oldest_deadline()) - now)
+        finally:
+            self._fail(expired)
+
+    def _oldest_deadline(self) -> float:
+        return min(sent for _, sent in self._inflight.values()) + self.timeout_sec
+
+    def add(self, mid: int, sent: Optional[float] = None) -> Future:
+        """add регистрация отправленного сообщения
+
+        Args:
+            mid (int): идентификатор сообщения, выданный клиентом paho
+            sent (Optional[float]): время отправки, None - текущее время
+
+        Returns:
+            Future: завершается задержкой доставки в секундах
+        """
+        future = Future()
+        if sent is None:
+            sent = self._clock()
+        with self._condition:
+            acked = self._early_acks.pop(mid, None)
+            if acked is None:
+                self._inflight[mid] = (future, sent)
+                return future
+            latency = max(acked - sent, 0.0)
+            self._record_latency(latency)
+        future.set_result(latency)
+        return future
+
+    def _record_latency(self, latency: float):
+        self.acked += 1
+        self.total_latency_sec += latency
+        self.last_latency_sec = latency
+
+    def publish(self, client, topic: str, payload: Union[str, bytes]) -> Future:
+        """publish отправка сообщения с qos=1 без ожидания подтверждения
+
+        Если окно заполнено, ждём освобождения места не дольше timeout_sec.
+        При разрыве соединения клиент paho оставляет сообщение в своей очереди
+        и отправляет его после переподключения, поэтому оно тоже учитывается.
+
+        Args:
+            client (mqtt.Client): клиент paho, подтверждения которого передаются в ack
+            topic (str): топик
+            payload (Union[str, bytes]): содержимое сообщения
+
+        Returns:
+            Future: завершается задержкой доставки в секундах или PublishTimeoutError
+        """
+        if not self.wait_for_slot():
+            future = Future()
+            future.set_exception(PublishTimeoutError("окно неподтверждённых сообщений заполнено"))
+            return future
+        sent = self._clock()
+        info = client.publish(topic, payload, qos=1)
+        return self.add(info.mid, sent)
+
+    def ack(self, mid: int):
+        """ack обработка подтверждения, вызывается из on_publish клиента paho
+
+        Args:
+            mid (int): идентификатор подтверждённого сообщения
+        """
+        now = self._clock()
+        with self._condition:
+            entry = self._inflight.pop(mid, None)
+            if entry is None:
+                self._early_acks[mid] = now
+                return
+            future, sent = entry
+            latency = now - sent
+            self._record_latency(latency)
+            self._condition.notify_all()
+        future.set_result(latency)
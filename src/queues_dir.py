@@ -1,8 +1,211 @@
 """ модуль каталога очередей сообщений """
-from multiprocessing import Queue
-from typing import Union
+import os
+import pickle
+import struct
+from multiprocessing import Queue, Lock, Pipe
+from multiprocessing.connection import wait
+from multiprocessing.shared_memory import SharedMemory
+from queue import Empty, Full
+from time import monotonic, sleep
+from typing import Callable, Dict, Optional, Union
 
 from src.config import CRITICALITY_STR, DEFAULT_LOG_LEVEL, LOG_ERROR, LOG_INFO
+from src.event_types import Event
+
+# виды записей в кольцевом буфере
+_RECORD_PICKLE = 0
+_RECORD_EVENT = 1
+
+
+def _encode_record(obj) -> bytes:
+    """ кодирование объекта для записи в кольцевой буфер """
+    if isinstance(obj, Event):
+        return bytes((_RECORD_EVENT,)) + obj.to_bytes()
+    return bytes((_RECORD_PICKLE,)) + pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode_record(data: memoryview):
+    """ декодирование записи из кольцевого буфера """
+    if data[0] == _RECORD_EVENT:
+        return Event.from_bytes(data[1:])
+    return pickle.loads(data[1:])
+
+
+class SharedMemoryQueue:
+    """SharedMemoryQueue очередь сообщений на кольцевом буфере в разделяемой памяти
+
+    Совместима с multiprocessing.Queue по методам put/get/get_nowait/empty/qsize.
+    События записываются компактным двоичным представлением Event.to_bytes()
+    без pickle, остальные объекты - через pickle.
+    Запись защищена общей блокировкой, поэтому писателей может быть несколько,
+    читатель должен быть один (владелец очереди).
+    Читатель засыпает на канале-"звонке", писатель звонит только если читатель ждёт.
+    """
+    # заголовок буфера: позиции записи и чтения (в байтах с начала работы),
+    # количество записей, признак ожидания читателем
+    _HEADER = struct.Struct("<QQQI")
+    _HEADER_SIZE = 32
+    _LENGTH = struct.Struct("<I")
+    _PADDING = 0xFFFFFFFF   # маркер пропуска хвоста буфера
+    _ALIGN = 8
+
+    def __init__(self, capacity: int = 1 << 20):
+        """__init__ создание очереди
+
+        Args:
+            capacity (int): размер кольцевого буфера в байтах
+        """
+        capacity -= capacity % self._ALIGN
+        self._capacity = capacity
+        self._shm = SharedMemory(create=True, size=self._HEADER_SIZE + capacity)
+        self._HEADER.pack_into(self._shm.buf, 0, 0, 0, 0, 0)
+        self._owner_pid = os.getpid()
+        self._lock = Lock()
+        self._reader, self._writer = Pipe(duplex=False)
+
+    def __getstate__(self):
+        return (self._shm.name, self._capacity, self._owner_pid,
+                self._lock, self._reader, self._writer)
+
+    def __setstate__(self, state):
+        name, self._capacity, self._owner_pid, \
+            self._lock, self._reader, self._writer = state
+        self._shm = SharedMemory(name=name)
+
+    def _read_header(self):
+        return self._HEADER.unpack_from(self._shm.buf, 0)
+
+    def _try_put(self, data: bytes) -> Optional[bool]:
+        """ запись в буфер, None - нет места, иначе признак ожидания читателем """
+        buf = self._shm.buf
+        size = self._LENGTH.size + len(data)
+        size += -size % self._ALIGN
+        with self._lock:
+            head, tail, count, waiting = self._read_header()
+            pos = head % self._capacity
+            contiguous = self._capacity - pos
+            needed = size if size <= contiguous else contiguous + size
+            if self._capacity - (head - tail) < needed:
+                return None
+            if size > contiguous:
+                # запись не помещается до конца буфера, переходим в начало
+                self._LENGTH.pack_into(buf, self._HEADER_SIZE + pos, self._PADDING)
+                head += contiguous
+                pos = 0
+            offset = self._HEADER_SIZE + pos
+            self._LENGTH.pack_into(buf, offset, len(data))
+            buf[offset + self._LENGTH.size:offset + self._LENGTH.size + len(data)] = data
+            self._HEADER.pack_into(buf, 0, head + size, tail, count + 1, 0)
+        return waiting != 0
+
+    def put(self, obj, block: bool = True, timeout: Optional[float] = None):
+        """put помещает объект в очередь
+
+        Args:
+            obj: объект для передачи
+            block (bool): ждать освобождения места, если буфер заполнен
+            timeout (Optional[float]): максимальное время ожидания в секундах
+
+        Raises:
+            Full: в буфере нет места
+            ValueError: объект больше половины буфера
+        """
+        data = _encode_record(obj)
+        if self._LENGTH.size + len(data) > self._capacity // 2:
+            raise ValueError(f"сообщение слишком велико для очереди: {len(data)} байт")
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            waiting = self._try_put(data)
+            if waiting is not None:
+                break
+            if not block or (deadline is not None and monotonic() >= deadline):
+                raise Full
+            sleep(0.001)
+        if waiting:
+            self._writer.send_bytes(b"\x01")
+
+    def put_nowait(self, obj):
+        """put_nowait помещает объект в очередь без ожидания"""
+        self.put(obj, block=False)
+
+    def get_nowait(self):
+        """get_nowait забирает объект из очереди без ожидания
+
+        Raises:
+            Empty: очередь пуста
+        """
+        buf = self._shm.buf
+        with self._lock:
+            head, tail, count, waiting = self._read_header()
+            if head == tail:
+                raise Empty
+            pos = tail % self._capacity
+            length = self._LENGTH.unpack_from(buf, self._HEADER_SIZE + pos)[0]
+            if length == self._PADDING:
+                tail += self._capacity - pos
+                pos = 0
+                length = self._LENGTH.unpack_from(buf, self._HEADER_SIZE)[0]
+            offset = self._HEADER_SIZE + pos + self._LENGTH.size
+            data = bytes(buf[offset:offset + length])
+            size = self._LENGTH.size + length
+            size += -size % self._ALIGN
+            self._HEADER.pack_into(buf, 0, head, tail + size, count - 1, waiting)
+        return _decode_record(memoryview(data))
+
+    def get(self, block: bool = True, timeout: Optional[float] = None):
+        """get забирает объект из очереди
+
+        Args:
+            block (bool): ждать появления объекта
+            timeout (Optional[float]): максимальное время ожидания в секундах
+
+        Raises:
+            Empty: очередь пуста
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            try:
+                return self.get_nowait()
+            except Empty:
+                if not block:
+                    raise
+            remaining = None if deadline is None else deadline - monotonic()
+            if remaining is not None and remaining <= 0:
+                raise Empty
+            if not self._prepare_wait():
+                wait([self._reader], timeout=remaining)
+
+    def _prepare_wait(self) -> bool:
+        """_prepare_wait подготовка читателя к ожиданию на канале self._reader
+
+        Returns:
+            bool: True, если в очереди уже есть данные и ждать не нужно
+        """
+        while self._reader.poll():
+            self._reader.recv_bytes()
+        with self._lock:
+            head, tail, count, _ = self._read_header()
+            if head != tail:
+                return True
+            self._HEADER.pack_into(self._shm.buf, 0, head, tail, count, 1)
+        return False
+
+    def qsize(self) -> int:
+        """qsize количество объектов в очереди"""
+        return self._read_header()[2]
+
+    def empty(self) -> bool:
+        """empty проверка очереди на пустоту"""
+        head, tail, _, _ = self._read_header()
+        return head == tail
+
+    def close(self):
+        """close освобождение разделяемой памяти,
+        память удаляется только процессом, создавшим очередь
+        """
+        self._shm.close()
+        if os.getpid() == self._owner_pid:
+            self._shm.unlink()
 
 
 class QueuesDirectory:
@@ -10,11 +213,25 @@ class QueuesDirectory:
     log_prefix = "[QUEUES]"
     log_level = DEFAULT_LOG_LEVEL
 
-    def __init__(self):
+    def __init__(
+            self, transports: Optional[Dict[str, Callable]] = None,
+            default_transport: Callable = Queue):
+        """__init__ создание каталога
+
+        Args:
+            transports (Optional[Dict[str, Callable]]): фабрики очередей для отдельных имён,
+                например {SITL_QUEUE_NAME: SharedMemoryQueue}
+            default_transport (Callable): фабрика очередей для остальных имён,
+                по умолчанию multiprocessing.Queue; для пошаговой симуляции
+                в одном процессе - queue.SimpleQueue
+        """
         self._log_message(LOG_INFO, "создан каталог очередей")
 
         # словарь с очередями компонентов
         self.queues = {}
+        # словарь с фабриками очередей
+        self.transports = dict(transports) if transports else {}
+        self.default_transport = default_transport
 
     def _log_message(self, criticality: int, message: str):
         """_log_message печатает сообщение заданного уровня критичности
@@ -26,6 +243,30 @@ class QueuesDirectory:
         if criticality <= self.log_level:
             print(f"[{CRITICALITY_STR[criticality]}]{self.log_prefix} {message}")
 
+    def set_transport(self, name: str, transport: Callable):
+        """set_transport выбор реализации очереди для заданного имени,
+        действует на очереди, создаваемые после вызова
+
+        Args:
+            name (str): имя очереди
+            transport (Callable): фабрика очереди, например SharedMemoryQueue
+        """
+        self.transports[name] = transport
+
+    def create_queue(self, name: str) -> Union[Queue, SharedMemoryQueue]:
+        """create_queue создаёт очередь выбранной для имени реализации и регистрирует её
+
+        Args:
+            name (str): имя очереди
+
+        Returns:
+            Union[Queue, SharedMemoryQueue]: созданная очередь
+        """
+        transport = self.transports.get(name, self.default_transport)
+        queue = transport()
+        self.register(queue=queue, name=name)
+        return queue
+
     def register(self, queue: Queue, name: str):
         """register регистрация очереди с заданным именем
 
@@ -36,17 +277,24 @@ class QueuesDirectory:
         self._log_message(LOG_INFO, f"регистрируем очередь {name}")
         self.queues[name] = queue
 
-    def get_queue(self, name:str) -> Union[Queue, None]:
+    def get_queue(self, name:str) -> Union[Queue, SharedMemoryQueue, None]:
         """get_queue выдаёт из каталога очередь с указанным именем
 
         Args:
             name (str): имя очереди
 
         Returns:
-            Union[Queue, None]: очередь или None если такой очереди нет
+            Union[Queue, SharedMemoryQueue, None]: очередь или None если такой очереди нет
         """
         try:
             return self.queues[name]
         except KeyError as e:
             self._log_message(LOG_ERROR, f"очередь не найдена {e}")
             return None
+
+    def close(self):
+        """close освобождение ресурсов очередей в разделяемой памяти
+        """
+        for queue in self.queues.values():
+            if isinstance(queue, SharedMemoryQueue):
+                queue.close()
@@ -1,7 +1,25 @@
 """ код представления маршрута """
-from geopy.distance import great_circle
+from dataclasses import dataclass
+from typing import Tuple
+
 from geopy.point import Point as GeoPoint
 
+from src.geo import Segment
+
+
+@dataclass(frozen=True)
+class RouteSegment:
+    """ отрезок маршрута, все величины вычисляются один раз при создании маршрута """
+    index: int              # индекс начальной путевой точки отрезка
+    start: GeoPoint         # начальная точка
+    end: GeoPoint           # конечная точка
+    length_m: float         # длина, м
+    bearing_deg: float      # направление из начальной точки, градусы 0..360
+    speed_limit: float      # действующее на отрезке ограничение скорости, км/ч
+    travel_time_sec: float  # время прохождения с ограничением скорости, с (inf при нулевом)
+    distance_before_m: float  # расстояние от начала маршрута до начала отрезка, м
+    time_before_sec: float  # время от начала маршрута до начала отрезка, с
+
 
 class Route:
     """
@@ -11,6 +29,9 @@ class Route:
         points (list): Список точек маршрута (GeoPoint).
         speed_limits (list): Список ограничений скорости для каждого отрезка маршрута.
         current_index (int): Индекс текущей точки маршрута.
+        segments (tuple): Таблица отрезков RouteSegment, не меняется после создания.
+        total_distance_m (float): Длина маршрута в метрах.
+        total_travel_time_sec (float): Время прохождения маршрута с ограничениями скорости.
     """
     
 
@@ -33,7 +54,47 @@ class Route:
         self.speed_limits = speed_limits
         self.current_index = 0
         self.route_finished = False
-        self._last_speed_limit = 0.0
+
+        # ограничение действует с путевой точки waypoint_index до следующего ограничения,
+        # при нескольких ограничениях для одной точки действует первое из списка
+        first_limits = {}
+        for limit in speed_limits:
+            first_limits.setdefault(limit.waypoint_index, limit.speed_limit)
+        limits = []
+        current_limit = 0.0
+        for i in range(len(points)):
+            current_limit = first_limits.get(i, current_limit)
+            limits.append(current_limit)
+        self._speed_limit_by_waypoint: Tuple[float, ...] = tuple(limits)
+
+        # геометрия отрезков с заранее вычисленной тригонометрией для запросов от положения
+        self._geometry = tuple(
+            Segment(points[i], points[i + 1]) for i in range(len(points) - 1))
+
+        # таблица отрезков с накопленными расстояниями и временем
+        segments = []
+        distance_before = 0.0
+        time_before = 0.0
+        for i, geometry in enumerate(self._geometry):
+            speed_limit = self._speed_limit_by_waypoint[i]
+            travel_time = geometry.length_m / (speed_limit / 3.6) \
+                if speed_limit > 0 else float('inf')
+            segments.append(RouteSegment(
+                index=i, start=points[i], end=points[i + 1],
+                length_m=geometry.length_m, bearing_deg=geometry.bearing_deg,
+                speed_limit=speed_limit, travel_time_sec=travel_time,
+                distance_before_m=distance_before, time_before_sec=time_before))
+            distance_before += geometry.length_m
+            time_before += travel_time
+        self.segments: Tuple[RouteSegment, ...] = tuple(segments)
+        self.total_distance_m = distance_before
+        self.total_travel_time_sec = time_before
+
+        # время прохождения отрезков после каждого из отрезков, с
+        time_after = [0.0] * len(segments)
+        for i in range(len(segments) - 2, -1, -1):
+            time_after[i] = time_after[i + 1] + segments[i + 1].travel_time_sec
+        self._time_after: Tuple[float, ...] = tuple(time_after)
 
     def next_point(self) -> GeoPoint:
         """
@@ -85,12 +146,7 @@ class Route:
             float: Расстояние до следующей точки в метрах.
         """
         if self.current_index < len(self.points) - 1:
-            return great_circle(
-                (self.points[self.current_index].latitude,
-                 self.points[self.current_index].longitude),
-                (self.points[self.current_index + 1].latitude,
-                 self.points[self.current_index + 1].longitude)
-            ).meters
+            return self.segments[self.current_index].length_m
         return 0
 
     def calculate_remaining_distance_to_next_point(self, position: GeoPoint):
@@ -104,13 +160,23 @@ class Route:
             float: Расстояние до следующей точки в метрах.
         """
         if self.current_index < len(self.points) - 1:
-            return great_circle(
-                position,
-                (self.points[self.current_index + 1].latitude,
-                 self.points[self.current_index + 1].longitude)
-            ).meters
+            return self._geometry[self.current_index].distance_to_end(position)
         return 0
 
+    def calculate_bearing_to_next_point(self, position: GeoPoint) -> float:
+        """
+        Вычисляет направление от текущего положения на следующую точку маршрута.
+
+        Args:
+            position (GeoPoint): текущее положение
+
+        Returns:
+            float: Направление в градусах 0..360.
+        """
+        if self.current_index < len(self.points) - 1:
+            return self._geometry[self.current_index].bearing_to_end(position)
+        return 0.0
+
     def calculate_speed(self) -> float:
         """calculate_speed вычисляет скорость для текущего участка
 
@@ -119,12 +185,7 @@ class Route:
         """
         if self.route_finished:
             return 0.0
-
-        for limit in self.speed_limits:
-            if limit.waypoint_index == self.current_index:
-                self._last_speed_limit = limit.speed_limit
-                break
-        return self._last_speed_limit
+        return self._speed_limit_by_waypoint[self.current_index]
 
     def calculate_travel_time_to_next_point(self):
         """
@@ -133,10 +194,26 @@ class Route:
         Returns:
             float: Время в пути до следующей точки в секундах.
         """
-        distance = self.calculate_distance_to_next_point()
-        if self.current_index < len(self.speed_limits):
-            # Скорость в км/ч
-            speed_limit = self.speed_limits[self.current_index]
-            # Преобразуем скорость в м/с
-            return distance / (speed_limit * 1000 / 3600)
+        if self.current_index < len(self.segments):
+            return self.segments[self.current_index].travel_time_sec
         return float('inf')
+
+    def calculate_remaining_travel_time(self, position: GeoPoint) -> float:
+        """
+        Вычисляет время до конца маршрута от текущего положения
+        с учётом ограничений скорости на оставшихся отрезках.
+
+        Args:
+            position (GeoPoint): текущее положение
+
+        Returns:
+            float: Время в секундах, inf если на каком-то отрезке скорость не задана.
+        """
+        if self.route_finished or self.current_index >= len(self.segments):
+            return 0.0
+        segment = self.segments[self.current_index]
+        if segment.speed_limit <= 0:
+            return float('inf')
+        remaining = self.calculate_remaining_distance_to_next_point(position) / \
+            (segment.speed_limit / 3.6)
+        return remaining + self._time_after[self.current_index]
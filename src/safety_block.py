@@ -3,53 +3,36 @@
 
 from abc import abstractmethod
 from queue import Empty
-from multiprocessing import Queue, Process
-from time import sleep
 from typing import Optional
 from geopy import Point as GeoPoint
 
-from src.config import CRITICALITY_STR, DEFAULT_LOG_LEVEL, SAFETY_BLOCK_QUEUE_NAME, \
+from src.config import DEFAULT_LOG_LEVEL, SAFETY_BLOCK_QUEUE_NAME, \
     LOG_ERROR, LOG_DEBUG, LOG_INFO
+from src.base_component import BaseComponent
 from src.mission_type import Mission
 from src.queues_dir import QueuesDirectory
-from src.event_types import Event, ControlEvent
+from src.event_types import Event
 from src.route import Route
 
 
-class BaseSafetyBlock(Process):
+class BaseSafetyBlock(BaseComponent):
     """SafetyBlock класс для реализации блока "Ограничитель"""
     log_prefix = "[SAFETY]"
     event_source_name = SAFETY_BLOCK_QUEUE_NAME
     events_q_name = event_source_name
 
     def __init__(self, queues_dir: QueuesDirectory, log_level = DEFAULT_LOG_LEVEL):
-        # вызываем конструктор базового класса
-        super().__init__()
+        # вызываем конструктор базового класса,
+        # команды проверяются сразу по поступлению
+        super().__init__(queues_dir, log_level=log_level)
 
-        self._queues_dir = queues_dir
-
-        # создаём очередь для сообщений на обработку
-        self._events_q = Queue()
-        self._events_q_name = self.event_source_name
-
-        # регистрируем очередь в каталоге
-        self._queues_dir.register(
-            queue=self._events_q, name=self._events_q_name)
-
-        # инициализируем интервал обновления
         self._tolerance_meters = 5
-        self._recalc_interval_sec = 0.5
-
-        self._quit = False
-        # очередь управляющих команд (например, для остановки работы модуля)
-        self._control_q = Queue()
 
         self._speed: int = 0
         self._direction: float = 0.0
         self._mission : Optional[Mission] = None
         self._position : Optional[GeoPoint] = None
 
-        self.log_level = log_level
         self._log_message(LOG_INFO, "создан ограничитель")
         self._enabled_handlers = {
             "set_mission": self._set_mission,
@@ -61,28 +44,6 @@ class BaseSafetyBlock(Process):
         }
         self._route: Optional[Route] = None
 
-    def _log_message(self, criticality: int, message: str):
-        """_log_message печатает сообщение заданного уровня критичности
-
-        Args:
-            criticality (int): уровень критичности
-            message (str): текст сообщения
-        """
-        if criticality <= self.log_level:
-            print(f"[{CRITICALITY_STR[criticality]}]{self.log_prefix} {message}")
-
-    def _check_control_q(self):
-        try:
-            request: ControlEvent = self._control_q.get_nowait()
-            self._log_message(LOG_DEBUG, f"проверяем запрос {request}")
-            if isinstance(request, ControlEvent) and request.operation == 'stop':
-                # поступил запрос на остановку монитора, поднимаем "красный флаг"
-                self._quit = True
-        except Empty:
-            # никаких команд не поступило, ну и ладно
-            pass
-
-
     def _set_mission(self, mission: Mission):
         """ установка нового маршрутного задания """
         self._mission = mission
@@ -123,6 +84,13 @@ class BaseSafetyBlock(Process):
             else:
                 self._log_message(LOG_INFO, "сегмент пройден")
 
+    def _calculate_direction(self) -> float:
+        """ направление от текущего положения на следующую точку маршрута,
+        по которому проверяется команда на смену направления
+        (геодезический расчёт src.geo через маршрут)
+        """
+        return self._route.calculate_bearing_to_next_point(self._position)
+
     def _check_events_q(self):
         """_check_events_q
         проверяет входящие события до их полного исчерпания
@@ -165,19 +133,7 @@ class BaseSafetyBlock(Process):
     def _send_release_cargo_to_consumers(self):
         pass
 
-    def stop(self):
-        """ метод для остановки работы блока,
-        отправляет управляющий запрос на остановку во внутреннюю очередь"""
-        self._control_q.put(ControlEvent(operation='stop'))
-
     def run(self):
         """ вызывается при запуске процесса """
         self._log_message(LOG_INFO, "старт ограничителя")
-
-        while self._quit is False:
-            sleep(self._recalc_interval_sec)
-            try:
-                self._check_events_q()
-                self._check_control_q()
-            except Exception as e:
-                self._log_message(LOG_ERROR, f"ошибка обработки команд: {e}")
\ No newline at end of file
+        self._event_loop()
@@ -1,18 +1,16 @@
 """ модуль монитора безопасности """
 from abc import abstractmethod
-from multiprocessing import Queue, Process
 from queue import Empty
 
-from time import sleep
-
 from src.config import LOG_ERROR, SECURITY_MONITOR_QUEUE_NAME,\
-    CRITICALITY_STR, DEFAULT_LOG_LEVEL, \
+    DEFAULT_LOG_LEVEL, \
     LOG_DEBUG, LOG_INFO
+from src.base_component import BaseComponent
 from src.queues_dir import QueuesDirectory
-from src.event_types import Event, ControlEvent
+from src.event_types import Event
 
 
-class BaseSecurityMonitor(Process):
+class BaseSecurityMonitor(BaseComponent):
     """ класс монитора безопасности """
     log_prefix = "[SECURITY]"
     event_source_name = SECURITY_MONITOR_QUEUE_NAME
@@ -20,53 +18,14 @@ class BaseSecurityMonitor(Process):
     log_level = DEFAULT_LOG_LEVEL
 
     def __init__(self, queues_dir: QueuesDirectory):
-        # вызываем конструктор базового класса
-        super().__init__()
-
-        self._queues_dir = queues_dir
-
-        # создаём очередь для сообщений на обработку
-        self._events_q = Queue()
-        self._events_q_name = self.event_source_name
-
-        # регистрируем очередь в каталоге
-        self._queues_dir.register(
-            queue=self._events_q, name=self._events_q_name)
-
-        # инициализируем интервал обновления
-        self._recalc_interval_sec = 0.1
-
-        self._quit = False
-        # очередь управляющих команд (например, для остановки работы модуля)
-        self._control_q = Queue()
+        # вызываем конструктор базового класса,
+        # запросы проверяются сразу по поступлению
+        super().__init__(queues_dir)
 
         self._security_policies = {}
 
         self._log_message(LOG_INFO, "создан монитор безопасности")
 
-    def _log_message(self, criticality: int, message: str):
-        """_log_message печатает сообщение заданного уровня критичности
-
-        Args:
-            criticality (int): уровень критичности
-            message (str): текст сообщения
-        """
-        if criticality <= self.log_level:
-            print(f"[{CRITICALITY_STR[criticality]}]{self.log_prefix} {message}")
-
-    def _check_control_q(self):
-        """_check_control_q проверка наличия новых управляющих команд
-        """
-        try:
-            request: ControlEvent = self._control_q.get_nowait()
-            self._log_message(LOG_DEBUG, f"проверяем запрос {request}")
-            if isinstance(request, ControlEvent) and request.operation == 'stop':
-                # поступил запрос на остановку монитора, поднимаем "красный флаг"
-                self._quit = True
-        except Empty:
-            # никаких команд не поступило, ну и ладно
-            pass
-
     def _check_events_q(self):
         """_check_events_q в цикле проверим все входящие сообщения,
         выход из цикла по условию отсутствия новых сообщений
@@ -103,15 +62,7 @@ class BaseSecurityMonitor(Process):
             self._log_message(
                 LOG_DEBUG, f"запрос отправлен получателю {event}")
 
-    def stop(self):
-        """stop запрос остановки работы блока
-        """
-        self._control_q.put(ControlEvent(operation='stop'))
-
     def run(self):
         self._log_message(LOG_INFO, "старт блока грузового отсека")
+        self._event_loop()
 
-        while self._quit is False:
-            sleep(self._recalc_interval_sec)
-            self._check_events_q()
-            self._check_control_q()
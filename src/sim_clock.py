@@ -0,0 +1,70 @@
+""" модуль часов системы: реального и виртуального (симуляционного) времени """
+import time
+
+
+class RealClock:
+    """ часы реального времени, используются компонентами по умолчанию """
+
+    def monotonic(self) -> float:
+        """monotonic монотонное время в секундах
+
+        Returns:
+            float: показания монотонных часов
+        """
+        return time.monotonic()
+
+    def time(self) -> float:
+        """time календарное время в секундах от начала эпохи
+
+        Returns:
+            float: текущее время
+        """
+        return time.time()
+
+
+class VirtualClock:
+    """VirtualClock часы виртуального времени для пошаговой симуляции
+
+    Время не идёт само по себе, его продвигает планировщик симуляции
+    (SystemComponentsContainer.simulate), поэтому результат прогона
+    не зависит от загрузки машины и скорости выполнения.
+    """
+
+    def __init__(self, start_time: float = 0.0):
+        """__init__ создание часов
+
+        Args:
+            start_time (float): календарное время начала симуляции
+                в секундах от начала эпохи, влияет только на метод time()
+        """
+        self._start_time = start_time
+        self._now = 0.0
+
+    def monotonic(self) -> float:
+        """monotonic время от начала симуляции в секундах
+
+        Returns:
+            float: виртуальное время
+        """
+        return self._now
+
+    def time(self) -> float:
+        """time календарное время симуляции
+
+        Returns:
+            float: время начала симуляции плюс прошедшее виртуальное время
+        """
+        return self._start_time + self._now
+
+    def advance_to(self, moment: float):
+        """advance_to перевод часов вперёд
+
+        Args:
+            moment (float): новое значение виртуального времени
+
+        Raises:
+            ValueError: попытка перевести часы назад
+        """
+        if moment < self._now:
+            raise ValueError(f"виртуальное время не может идти назад: {moment} < {self._now}")
+        self._now = moment
@@ -1,61 +1,78 @@
 """ модуль отправки телеметрии в систему мониторинга
 """
-from multiprocessing import Queue, Process
+from concurrent.futures import Future
 from queue import Empty
-from time import sleep, time
+from typing import Optional, Union
 
 from geopy import Point as GeoPoint
 import paho.mqtt.client as mqtt
 
-from src.config import CRITICALITY_STR, LOG_DEBUG, LOG_ERROR, LOG_INFO, \
+from src.config import LOG_DEBUG, LOG_ERROR, LOG_INFO, \
     SITL_TELEMETRY_QUEUE_NAME, DEFAULT_LOG_LEVEL
+from src.base_component import BaseComponent
 from src.queues_dir import QueuesDirectory
-from src.event_types import Event, ControlEvent
+from src.event_types import Event
+from src.mqtt_publisher import PublishTracker, PublishTimeoutError
+from src.telemetry_frame import encode_telemetry_frame, encode_telemetry_batch
 
 
-class TelemetrySender(Process):
-    """ класс отправки телеметрии в систему мониторинга """
+class TelemetrySender(BaseComponent):
+    """ класс отправки телеметрии в систему мониторинга
+
+    В пакетном режиме (задан batch_size больше 1 или batch_window_sec) кадры
+    телеметрии накапливаются и отправляются одним сообщением, когда набирается
+    batch_size кадров или с первого кадра пакета проходит batch_window_sec секунд.
+    """
     MQTT_BROKER = "localhost"
     MQTT_PORT = 1883
     MQTT_TOPIC = "api/telemetry"
     TIMEOUT = 5
+    # окно: предельное число сообщений, ожидающих подтверждения брокера
+    MAX_INFLIGHT = 20
+    MAX_BATCH_SIZE = 0xFFFF
+    # период проверки сообщений без подтверждения, секунды
+    EXPIRE_INTERVAL_SEC = 1.0
+    # число проверок незаполненного пакета за окно batch_window_sec
+    BATCH_TICKS_PER_WINDOW = 4
 
     log_prefix = "[SITL.MQTT]"
     event_source_name = SITL_TELEMETRY_QUEUE_NAME
     events_q_name = event_source_name
 
-    def __init__(self, queues_dir: QueuesDirectory, client_id='', log_level = DEFAULT_LOG_LEVEL):
-        super().__init__()
+    def __init__(
+            self, queues_dir: QueuesDirectory, client_id='',
+            log_level = DEFAULT_LOG_LEVEL, max_inflight: int = MAX_INFLIGHT,
+            binary_payload: bool = True,
+            batch_size: Optional[int] = None, batch_window_sec: Optional[float] = None):
+        batch_enabled = bool(batch_size and batch_size > 1 or batch_window_sec)
+        if batch_enabled and not binary_payload:
+            raise ValueError("пакетная отправка поддерживается только для двоичных кадров")
+        # незаполненный пакет отправляется по таймеру, по нему же
+        # обнаруживаются сообщения без подтверждения; такт - доля окна,
+        # чтобы пакет задерживался не дольше batch_window_sec * (1 + 1 / BATCH_TICKS_PER_WINDOW)
+        tick_interval_sec = TelemetrySender.EXPIRE_INTERVAL_SEC
+        if batch_window_sec:
+            tick_interval_sec = min(batch_window_sec / TelemetrySender.BATCH_TICKS_PER_WINDOW,
+                                    tick_interval_sec)
+        super().__init__(queues_dir, log_level=log_level, tick_interval_sec=tick_interval_sec)
 
-        self._queues_dir = queues_dir
         self._client_id = client_id
-
-        # создаём очередь для сообщений на обработку
-        self._events_q = Queue()
-        self._events_q_name = TelemetrySender.events_q_name
-        self._queues_dir.register(
-            queue=self._events_q, name=self._events_q_name)
-
-        self._quit = False
-        # очередь управляющих команд (например, для остановки симуляции)
-        self._control_q = Queue()
+        # двоичный кадр (src.telemetry_frame) или прежняя строка запроса
+        self._binary_payload = binary_payload
+        self._seq = 0
+
+        self._batch_enabled = batch_enabled
+        # размер пакета ограничен полем числа кадров в его заголовке
+        self._batch_size = min(batch_size or TelemetrySender.MAX_BATCH_SIZE,
+                               TelemetrySender.MAX_BATCH_SIZE)
+        self._batch_window_sec = batch_window_sec
+        # накопленные кадры пакета и время добавления первого из них
+        self._batch = []
+        self._batch_started = None
 
         self._mqttc = None
-        self._published = False
-
-        # инициализируем интервал обновления
-        self._recalc_interval_sec = 0.5
-        self.log_level = log_level
-
-    def _log_message(self, criticality: int, message: str):
-        """_log_message печатает сообщение заданного уровня критичности
-
-        Args:
-            criticality (int): уровень критичности
-            message (str): текст сообщения
-        """
-        if criticality <= self.log_level:
-            print(f"[{CRITICALITY_STR[criticality]}]{self.log_prefix} {message}")
+        # отправленные сообщения, ожидающие подтверждения, по их идентификаторам
+        self._publishes = PublishTracker(max_inflight, self.TIMEOUT)
 
     # The callback for when the client receives a CONNACK response from the server.
     def _on_connect(self, _, userdata, flags, reason_code):
@@ -73,26 +90,8 @@ class TelemetrySender(Process):
     def _on_message(self, _, __, msg):
         print(msg.topic+" "+str(msg.payload))
 
-    def _on_publish(self, _, __, ___):
-        self._published = True
-
-    def stop(self):
-        """ запрос остановки работы """
-        self._control_q.put(ControlEvent(operation='stop'))
-
-    # проверка наличия новых управляющих команд
-    def _check_control_q(self):
-        try:
-            request: ControlEvent = self._control_q.get_nowait()
-            # print(f"{self.log_prefix} проверяем запрос {request}")
-            if not isinstance(request, ControlEvent):
-                return
-            if request.operation == 'stop':
-                # поступил запрос на остановку монитора, поднимаем "красный флаг"
-                self._quit = True
-        except Empty:
-            # никаких команд не поступило, ну и ладно
-            pass
+    def _on_publish(self, _, __, mid):
+        self._publishes.ack(mid)
 
     def _post_telemetry(self, event: Event):
         try:
@@ -100,26 +99,69 @@ class TelemetrySender(Process):
             bearing = int(event.extra_parameters["bearing"])
             speed = int(event.extra_parameters["speed"])
 
-            payload = f'id={self._client_id}&lat={int(position.latitude*(1E+7))}&' +\
-                f'lon={int(position.longitude*(1E+7))}&alt={int(position.altitude*100)}&' +\
-                f'azimuth={bearing*(1E+7)}&dop={1.2}&sats={12}&speed={speed}'
-
-            self._mqttc.publish(
-                TelemetrySender.MQTT_TOPIC, payload, qos=1)
-            start_time = time()
+            if self._binary_payload:
+                self._seq += 1
+                payload = encode_telemetry_frame(
+                    self._client_id, self._seq, int(self._clock.time() * 1000),
+                    position.latitude, position.longitude, position.altitude,
+                    event.extra_parameters["bearing"], event.extra_parameters["speed"],
+                    dop=1.2, sats=12)
+                if self._batch_enabled:
+                    self._add_to_batch(payload)
+                    return
+                description = f"кадр seq={self._seq}, {len(payload)} байт"
+            else:
+                payload = f'id={self._client_id}&lat={int(position.latitude*(1E+7))}&' +\
+                    f'lon={int(position.longitude*(1E+7))}&alt={int(position.altitude*100)}&' +\
+                    f'azimuth={bearing*(1E+7)}&dop={1.2}&sats={12}&speed={speed}'
+                description = payload
 
-            while not self._published and time() - start_time < TelemetrySender.TIMEOUT:
-                sleep(0.1)
+            self._publish_telemetry(payload, description)
 
-            if self._published:
-                self._log_message(
-                    LOG_DEBUG, f"отправлена телеметрия: {payload}")
-            else:
-                self._log_message(LOG_ERROR, "таймаут отправки телеметрии")
+        except Exception as e:
+            self._log_message(LOG_ERROR, f"ошибка отправки телеметрии: {e}")
 
+    def _publish_telemetry(self, payload: Union[str, bytes], description: str):
+        future = self._publishes.publish(self._mqttc, TelemetrySender.MQTT_TOPIC, payload)
+        future.add_done_callback(lambda f: self._on_telemetry_delivered(f, description))
+
+    def _add_to_batch(self, frame: bytes):
+        if not self._batch:
+            self._batch_started = self._clock.monotonic()
+        self._batch.append(frame)
+        if len(self._batch) >= self._batch_size:
+            self._flush_batch()
+
+    def _flush_batch(self):
+        """_flush_batch отправка накопленных кадров одним сообщением """
+        if not self._batch:
+            return
+        payload = encode_telemetry_batch(self._batch)
+        # кадры пакета пронумерованы подряд, последний из них - текущий
+        description = f"пакет из {len(self._batch)} кадров " + \
+            f"seq={self._seq - len(self._batch) + 1}..{self._seq}, {len(payload)} байт"
+        self._batch = []
+        self._batch_started = None
+        try:
+            self._publish_telemetry(payload, description)
         except Exception as e:
             self._log_message(LOG_ERROR, f"ошибка отправки телеметрии: {e}")
 
+    def _on_tick(self):
+        self._publishes.expire()
+        if self._batch and \
+                self._clock.monotonic() - self._batch_started >= self._batch_window_sec:
+            self._flush_batch()
+
+    def _on_telemetry_delivered(self, future: Future, description: str):
+        try:
+            latency = future.result()
+        except PublishTimeoutError as e:
+            self._log_message(LOG_ERROR, f"таймаут отправки телеметрии: {e}")
+            return
+        self._log_message(
+            LOG_DEBUG, f"отправлена телеметрия: {description}, задержка {latency * 1000:.0f} мс")
+
     def _check_events_q(self):
         while True:
             try:
@@ -144,7 +186,7 @@ class TelemetrySender(Process):
 
         mqttc.on_message = self._on_message
 
-        self._published = False
+        mqttc.max_inflight_messages_set(self._publishes.max_inflight)
 
         mqttc.on_publish = self._on_publish
 
@@ -156,10 +198,8 @@ class TelemetrySender(Process):
         self._log_message(
             LOG_INFO, "клиент отправки телеметрии создан и запущен")
 
-        while self._quit is False:
-            self._check_events_q()
-            self._check_control_q()
-            sleep(self._recalc_interval_sec)
+        self._event_loop()
 
+        self._flush_batch()
         self._mqttc.loop_stop()
         self._mqttc.disconnect()
@@ -2,8 +2,10 @@
 
 
 from multiprocessing import Process
-from typing import List
+from time import monotonic, sleep
+from typing import Callable, List, Optional
 from src.config import LOG_ERROR, LOG_INFO, CRITICALITY_STR
+from src.sim_clock import VirtualClock
 
 
 class SystemComponentsContainer:
@@ -41,6 +43,88 @@ class SystemComponentsContainer:
         for component in self._components:
             component.join()
 
+    def simulate(
+            self, duration_sec: float,
+            clock: Optional[VirtualClock] = None,
+            speedup: Optional[float] = None,
+            until: Optional[Callable[[], bool]] = None,
+            max_delivery_rounds: int = 10000) -> VirtualClock:
+        """simulate пошаговая детерминированная симуляция в текущем процессе
+
+        Компоненты не запускаются как процессы: планировщик продвигает виртуальные
+        часы до ближайшего такта, вызывает периодическую обработку компонентов
+        в порядке их перечисления в контейнере и после каждого такта доставляет
+        все события, пока очереди не опустеют. Очереди каталога должны передавать
+        данные синхронно, например QueuesDirectory(default_transport=queue.SimpleQueue).
+
+        Args:
+            duration_sec (float): продолжительность симуляции в виртуальных секундах
+            clock (Optional[VirtualClock]): часы симуляции, по умолчанию новые с нуля
+            speedup (Optional[float]): во сколько раз виртуальное время идёт быстрее
+                реального, None - без ожидания, с максимальной скоростью
+            until (Optional[Callable[[], bool]]): условие досрочного завершения,
+                проверяется после каждого такта
+            max_delivery_rounds (int): ограничение числа кругов доставки событий
+                после одного такта, защита от бесконечного обмена сообщениями
+
+        Returns:
+            VirtualClock: часы симуляции, monotonic() - достигнутое виртуальное время
+        """
+        if clock is None:
+            clock = VirtualClock()
+        for component in self._components:
+            component.attach_clock(clock)
+
+        start = clock.monotonic()
+        end = start + duration_sec
+        wall_start = monotonic()
+        # номер следующего такта каждого компонента, время такта считается
+        # умножением, чтобы не накапливать ошибку сложения
+        ticks = [1 if c.tick_interval_sec() else None for c in self._components]
+
+        self._deliver_events(max_delivery_rounds)
+        while until is None or not until():
+            moments = [start + n * c.tick_interval_sec()
+                       for n, c in zip(ticks, self._components) if n is not None]
+            if not moments or min(moments) > end:
+                break
+            moment = min(moments)
+            if speedup:
+                delay = wall_start + (moment - start) / speedup - monotonic()
+                if delay > 0:
+                    sleep(delay)
+            clock.advance_to(moment)
+
+            for i, component in enumerate(self._components):
+                if ticks[i] is not None and start + ticks[i] * component.tick_interval_sec() == moment:
+                    ticks[i] += 1
+                    component._on_tick()    # pylint: disable=protected-access
+                    self._deliver_events(max_delivery_rounds)
+
+        if until is None or not until():
+            clock.advance_to(max(end, clock.monotonic()))
+        self._log_message(
+            LOG_INFO, f"симуляция завершена, виртуальное время {clock.monotonic() - start:.3f} с")
+        return clock
+
+    def _deliver_events(self, max_rounds: int):
+        """_deliver_events обработка событий компонентами до опустошения очередей
+
+        Args:
+            max_rounds (int): максимальное число кругов обхода компонентов
+
+        Raises:
+            RuntimeError: события не закончились за max_rounds кругов
+        """
+        # pylint: disable=protected-access
+        for _ in range(max_rounds):
+            pending = [c for c in self._components if c._has_pending_events()]
+            if not pending:
+                return
+            for component in pending:
+                component._check_events_q()
+        raise RuntimeError("обмен событиями не завершился, возможно зацикливание")
+
     def clean(self):
         """ очистка всех компонентов """
         for component in self._components:
@@ -0,0 +1,127 @@
+""" модуль двоичного кадра телеметрии для топика api/telemetry
+
+Кадр (порядок байтов little-endian):
+    magic (B) = 0xA7, версия формата (B), номер кадра (I), время в мс от начала эпохи (q),
+    широта и долгота в 1e-7 градуса (i, i), высота в см (i), азимут в сотых долях градуса (H),
+    скорость в сотых долях км/ч (H), снижение точности (dop) в сотых долях (H),
+    число спутников (B), длина идентификатора (B), идентификатор в UTF-8.
+
+Пакет кадров: magic (B) = 0xA8, число кадров (H), далее кадры подряд
+(длина каждого кадра определяется длиной идентификатора в его заголовке).
+
+Декодер на стороне АСУ (afcs/afcs/utils/telemetry_frame.py) повторяет этот формат,
+кадры, не начинающиеся с magic, разбираются как прежняя строка запроса.
+"""
+import struct
+from typing import List, Optional
+
+TELEMETRY_FRAME_MAGIC = 0xA7
+TELEMETRY_FRAME_VERSION = 1
+TELEMETRY_BATCH_MAGIC = 0xA8
+
+_HEADER = struct.Struct("<BBIqiiiHHHBB")
+_BATCH_HEADER = struct.Struct("<BH")
+
+
+def encode_telemetry_frame(
+        client_id: str, seq: int, timestamp_ms: int,
+        latitude: float, longitude: float, altitude: float,
+        azimuth: float, speed: float, dop: float, sats: int) -> bytes:
+    """encode_telemetry_frame упаковка телеметрии в двоичный кадр
+
+    Args:
+        client_id (str): идентификатор машинки
+        seq (int): номер кадра
+        timestamp_ms (int): время измерения в мс от начала эпохи
+        latitude, longitude (float): координаты в градусах
+        altitude (float): высота в метрах
+        azimuth (float): направление движения в градусах
+        speed (float): скорость в км/ч
+        dop (float): снижение точности
+        sats (int): число спутников
+
+    Returns:
+        bytes: кадр телеметрии
+    """
+    id_bytes = client_id.encode()
+    return _HEADER.pack(
+        TELEMETRY_FRAME_MAGIC, TELEMETRY_FRAME_VERSION,
+        seq & 0xFFFFFFFF, timestamp_ms,
+        round(latitude * 1e7), round(longitude * 1e7), round(altitude * 100),
+        round((azimuth % 360.0) * 100) % 36000,
+        min(max(round(speed * 100), 0), 0xFFFF),
+        min(max(round(dop * 100), 0), 0xFFFF),
+        min(max(sats, 0), 0xFF), len(id_bytes)) + id_bytes
+
+
+def decode_telemetry_frame(frame: bytes) -> Optional[dict]:
+    """decode_telemetry_frame разбор двоичного кадра телеметрии
+
+    Args:
+        frame (bytes): кадр телеметрии
+
+    Returns:
+        Optional[dict]: значения в единицах кадра (широта и долгота в 1e-7 градуса,
+            высота в см, азимут в сотых долях градуса, скорость и dop в сотых долях),
+            None - кадр другого формата или повреждён
+    """
+    if len(frame) < _HEADER.size or frame[0] != TELEMETRY_FRAME_MAGIC \
+            or frame[1] != TELEMETRY_FRAME_VERSION:
+        return None
+    (_, _, seq, timestamp_ms, lat, lon, alt, azimuth, speed, dop, sats,
+     id_len) = _HEADER.unpack_from(frame)
+    if len(frame) != _HEADER.size + id_len:
+        return None
+    return {
+        "id": frame[_HEADER.size:].decode(),
+        "seq": seq,
+        "timestamp_ms": timestamp_ms,
+        "lat": lat,
+        "lon": lon,
+        "alt": alt,
+        "azimuth": azimuth,
+        "speed": speed,
+        "dop": dop,
+        "sats": sats,
+    }
+
+
+def encode_telemetry_batch(frames: List[bytes]) -> bytes:
+    """encode_telemetry_batch упаковка нескольких кадров в одно сообщение
+
+    Args:
+        frames (List[bytes]): кадры, созданные encode_telemetry_frame
+
+    Returns:
+        bytes: пакет кадров
+    """
+    return _BATCH_HEADER.pack(TELEMETRY_BATCH_MAGIC, len(frames)) + b"".join(frames)
+
+
+def decode_telemetry_batch(payload: bytes) -> Optional[List[dict]]:
+    """decode_telemetry_batch разбор пакета кадров телеметрии
+
+    Args:
+        payload (bytes): пакет кадров
+
+    Returns:
+        Optional[List[dict]]: разобранные кадры (как в decode_telemetry_frame),
+            None - сообщение другого формата или повреждено
+    """
+    if len(payload) < _BATCH_HEADER.size or payload[0] != TELEMETRY_BATCH_MAGIC:
+        return None
+    _, count = _BATCH_HEADER.unpack_from(payload)
+    frames = []
+    offset = _BATCH_HEADER.size
+    for _ in range(count):
+        if len(payload) < offset + _HEADER.size:
+            return None
+        end = offset + _HEADER.size + payload[offset + _HEADER.size - 1]
+        frame = decode_telemetry_frame(payload[offset:end])
+        if frame is None:
+            return None
+        frames.append(frame)
+        offset = end
+    if offset != len(payload):
+        return None
+    return frames
@@ -0,0 +1,80 @@
+""" тесты базового компонента """
+from multiprocessing import Queue
+from time import monotonic, sleep
+
+from src.base_component import BaseComponent, wait_for_queues
+from src.event_types import Event
+
+
+class EchoComponent(BaseComponent):
+    """ компонент, запоминающий полученные события """
+    events_q_name = "echo"
+
+    def __init__(self, queues_dir):
+        super().__init__(queues_dir, tick_interval_sec=0.01)
+        self.received = []
+        self.ticks = 0
+
+    def _check_events_q(self):
+        while not self._events_q.empty():
+            self.received.append(self._events_q.get_nowait())
+
+    def _on_tick(self):
+        self.ticks += 1
+        if self.ticks >= 3:
+            self.stop()
+
+
+def test_wait_for_queues_timeout():
+    """ пустые очереди - ожидание завершается по таймауту """
+    started = monotonic()
+    assert wait_for_queues([Queue(), Queue()], timeout=0.05) is False
+    assert monotonic() - started >= 0.04
+
+
+def test_wait_for_queues_wakes_on_put():
+    """ ожидание завершается сразу при появлении данных в любой из очередей """
+    first, second = Queue(), Queue()
+    second.put(1)
+    sleep(0.05)
+    started = monotonic()
+    assert wait_for_queues([first, second], timeout=5) is True
+    assert monotonic() - started < 1
+
+
+def test_event_loop_dispatch_and_stop(queues_dir):
+    """ события обрабатываются в цикле, остановка по управляющей команде """
+    component = EchoComponent(queues_dir)
+    event = Event(source="test", destination="echo", operation="ping", parameters=None)
+    queues_dir.get_queue("echo").put(event)
+    sleep(0.05)
+
+    component._event_loop()     # pylint: disable=protected-access
+
+    assert component.received == [event]
+    assert component.ticks == 3
+
+
+class CoalescingComponent(BaseComponent):
+    """ компонент с объединением устаревших команд """
+    events_q_name = "coalescing"
+    coalesced_operations = ("set_speed", "set_direction")
+
+
+def test_drain_coalesces_superseded_events(queues_dir):
+    """ из пачки команд остаются только последние, порядок остальных событий сохраняется """
+    component = CoalescingComponent(queues_dir)
+    q = queues_dir.get_queue("coalescing")
+    ops = [("set_speed", 10), ("set_direction", 1.0), ("set_mission", "m"),
+           ("set_speed", 20), ("set_direction", 2.0), ("set_speed", 30)]
+    for operation, parameters in ops:
+        q.put(Event(source="test", destination="coalescing",
+                    operation=operation, parameters=parameters))
+    q.put("not an event")
+    sleep(0.05)
+
+    batch = component._drain_events_q()     # pylint: disable=protected-access
+
+    assert [(e.operation, e.parameters) for e in batch] == \
+        [("set_mission", "m"), ("set_direction", 2.0), ("set_speed", 30)]
+    assert component.coalesced_counters() == {"set_speed": 2, "set_direction": 1}
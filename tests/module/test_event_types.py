@@ -0,0 +1,40 @@
+""" тесты двоичного представления событий """
+import pickle
+
+import pytest
+from geopy import Point as GeoPoint
+
+from src.config import CONTROL_SYSTEM_QUEUE_NAME, NAVIGATION_QUEUE_NAME, \
+    SITL_QUEUE_NAME, SITL_TELEMETRY_QUEUE_NAME
+from src.event_types import Event
+from src.mission_type import GeoSpecificSpeedLimit, Mission
+
+
+@pytest.mark.parametrize("event", [
+    Event(source=NAVIGATION_QUEUE_NAME, destination=CONTROL_SYSTEM_QUEUE_NAME,
+          operation="position_update", parameters=GeoPoint(59.8746946, 29.8298710, 12.5)),
+    Event(source=CONTROL_SYSTEM_QUEUE_NAME, destination="servos",
+          operation="set_speed", parameters=20),
+    Event(source="servos", destination=SITL_QUEUE_NAME,
+          operation="set_direction", parameters=177.25),
+    Event(source=SITL_QUEUE_NAME, destination=SITL_TELEMETRY_QUEUE_NAME,
+          operation="post_telemetry", parameters=GeoPoint(1.0, 2.0),
+          extra_parameters={"bearing": 90.0, "speed": 20.0}),
+    Event(source="custom", destination="other", operation="hello",
+          parameters="text", signature="a1b2"),
+    Event(source="planner", destination="communication", operation="set_mission",
+          parameters=Mission(home=GeoPoint(1, 2), waypoints=[GeoPoint(1, 2)],
+                             speed_limits=[GeoSpecificSpeedLimit(0, 20)], armed=True)),
+])
+def test_event_roundtrip(event):
+    """ событие восстанавливается из двоичного представления и через pickle """
+    assert Event.from_bytes(event.to_bytes()) == event
+    assert pickle.loads(pickle.dumps(event)) == event
+
+
+def test_hot_event_is_compact():
+    """ частые события кодируются существенно компактнее pickle исходного класса """
+    event = Event(source=NAVIGATION_QUEUE_NAME, destination=CONTROL_SYSTEM_QUEUE_NAME,
+                  operation="position_update", parameters=GeoPoint(59.87, 29.83))
+    assert len(event.to_bytes()) <= 32
+    assert not hasattr(event, "__dict__")
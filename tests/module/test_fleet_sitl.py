@@ -0,0 +1,90 @@
+""" тесты векторного симулятора парка машинок """
+from time import sleep
+
+import numpy as np
+from geopy import Point as GeoPoint, distance
+
+from src.config import NAVIGATION_QUEUE_NAME, SITL_QUEUE_NAME, FLEET_SITL_QUEUE_NAME
+from src.event_types import Event
+from src.fleet_sitl import FleetSITL, destination
+from src.queues_dir import QueuesDirectory
+
+
+def test_destination_matches_geopy():
+    """ векторный расчёт совпадает с geopy для шагов симуляции """
+    rng = np.random.default_rng(1)
+    lat = rng.uniform(-70, 70, 100)
+    lon = rng.uniform(-179, 179, 100)
+    bearing = rng.uniform(0, 360, 100)
+    dist_m = rng.uniform(0, 50, 100)
+
+    new_lat, new_lon = destination(lat, lon, bearing, dist_m)
+
+    for i in range(100):
+        expected = distance.distance(meters=dist_m[i]).destination(
+            point=GeoPoint(lat[i], lon[i]), bearing=bearing[i])
+        got = GeoPoint(new_lat[i], new_lon[i])
+        assert distance.distance(expected, got).meters < 0.01
+
+
+def test_fleet_sitl_queue_protocol():
+    """ машинка со своим каталогом очередей управляется по протоколу sitl """
+    fleet_dir = QueuesDirectory()
+    car_dir = QueuesDirectory()
+    car_dir.create_queue(NAVIGATION_QUEUE_NAME)
+    fleet = FleetSITL(fleet_dir, log_level=0)
+    fleet_dir.create_queue(NAVIGATION_QUEUE_NAME)
+    fleet.add_car("C1", GeoPoint(59.87, 29.83), queues_dir=car_dir)
+    fleet.add_car("C2", GeoPoint(59.88, 29.84))
+
+    car_q = car_dir.get_queue(SITL_QUEUE_NAME)
+    car_q.put(Event("servos", SITL_QUEUE_NAME, "set_speed", 10.0))
+    car_q.put(Event("servos", SITL_QUEUE_NAME, "set_speed", 36.0))
+    car_q.put(Event("servos", SITL_QUEUE_NAME, "set_direction", 90.0))
+    fleet_dir.get_queue(FLEET_SITL_QUEUE_NAME).put(
+        Event("load", SITL_QUEUE_NAME, "post_position", None,
+              extra_parameters={"car_id": "C2"}))
+    sleep(0.05)
+    fleet._check_events_q()     # pylint: disable=protected-access
+    fleet._recalc()             # pylint: disable=protected-access
+
+    # 36 км/ч за 0.1 с - один метр на восток, вторая машинка стоит
+    moved = distance.distance(GeoPoint(59.87, 29.83), fleet.position("C1")).meters
+    assert abs(moved - 1.0) < 1e-3
+    assert fleet.position("C2") == GeoPoint(59.88, 29.84)
+    assert fleet.coalesced_counters() == {"set_speed": 1}
+
+    car_q.put(Event("navigation", SITL_QUEUE_NAME, "post_position", None))
+    sleep(0.05)
+    fleet._check_events_q()     # pylint: disable=protected-access
+    reply = car_dir.get_queue(NAVIGATION_QUEUE_NAME).get(timeout=1)
+    assert reply.operation == "position_update"
+    assert reply.parameters == fleet.position("C1")
+    fleet_reply = fleet_dir.get_queue(NAVIGATION_QUEUE_NAME).get(timeout=1)
+    assert fleet_reply.extra_parameters == {"car_id": "C2"}
+
+
+def test_fleet_queue_keeps_arrival_order():
+    """ команды общей очереди применяются в порядке поступления """
+    fleet_dir = QueuesDirectory()
+    fleet = FleetSITL(fleet_dir, log_level=0)
+    fleet.add_car("C1")
+    fleet.add_car("C2")
+    handled = []
+    fleet._handle_event = lambda index, event: handled.append(  # pylint: disable=protected-access
+        (index, event.operation, event.parameters))
+
+    fleet_q = fleet_dir.get_queue(FLEET_SITL_QUEUE_NAME)
+    for car_id, operation, value in (
+            ("C1", "set_speed", 10.0), ("C2", "set_direction", 90.0),
+            ("C1", "post_position", None), ("C1", "set_speed", 20.0),
+            ("C2", "set_speed", 5.0), ("C1", "set_direction", 45.0)):
+        fleet_q.put(Event("load", SITL_QUEUE_NAME, operation, value,
+                          extra_parameters={"car_id": car_id}))
+    sleep(0.05)
+    fleet._check_events_q()     # pylint: disable=protected-access
+
+    assert handled == [
+        (1, "set_direction", 90.0), (0, "post_position", None), (0, "set_speed", 20.0),
+        (1, "set_speed", 5.0), (0, "set_direction", 45.0)]
+    assert fleet.coalesced_counters() == {"set_speed": 1}
@@ -0,0 +1,105 @@
+""" тесты модуля геодезических расчётов """
+import random
+
+import pytest
+from geographiclib.geodesic import Geodesic
+from geopy import Point as GeoPoint
+
+from src import geo
+from src.mission_type import GeoSpecificSpeedLimit, Mission
+from src.queues_dir import QueuesDirectory
+from src.route import Route
+from src.safety_block import BaseSafetyBlock
+
+
+def _angle_diff(a: float, b: float) -> float:
+    diff = abs(a - b) % 360
+    return min(diff, 360 - diff)
+
+
+@pytest.mark.parametrize("distance", [5.0, 200.0, 1900.0, 20000.0, 3e6])
+def test_distance_and_bearing_match_geodesic(distance):
+    """ расстояние и направление совпадают с эталонной геодезической задачей """
+    rnd = random.Random(7)
+    for _ in range(200):
+        lat, lon, azimuth = rnd.uniform(-75, 75), rnd.uniform(-180, 180), rnd.uniform(0, 360)
+        end = Geodesic.WGS84.Direct(lat, lon, azimuth, distance)
+        lat2, lon2 = end["lat2"], end["lon2"]
+
+        assert geo.distance_m(lat, lon, lat2, lon2) == pytest.approx(distance, abs=0.01)
+        assert _angle_diff(geo.bearing_deg(lat, lon, lat2, lon2), azimuth) < 0.05
+
+        segment = geo.Segment(GeoPoint(lat, lon), GeoPoint(lat2, lon2))
+        assert segment.distance_to_end(GeoPoint(lat, lon)) == pytest.approx(distance, abs=0.01)
+
+
+def test_vincenty_antipodal_fallback():
+    """ для почти противоположных точек результат остаётся корректным """
+    expected = Geodesic.WGS84.Inverse(0, 0, 0.5, 179.7)["s12"]
+    assert geo.vincenty_inverse(0, 0, 0.5, 179.7)[0] == pytest.approx(expected, abs=0.01)
+
+
+def test_destination_step():
+    """ шаг симуляции совпадает с эталонной прямой задачей """
+    lat, lon = geo.destination(59.87, 29.83, 135.0, 5.5)
+    end = Geodesic.WGS84.Direct(59.87, 29.83, 135.0, 5.5)
+    assert Geodesic.WGS84.Inverse(lat, lon, end["lat2"], end["lon2"])["s12"] < 1e-3
+
+
+def test_route_uses_segments():
+    """ маршрут выдаёт расстояния и направления по отрезкам """
+    points = [GeoPoint(59.8746946, 29.8298710), GeoPoint(59.8743984, 29.8298978),
+              GeoPoint(59.8743984, 29.8310000)]
+    route = Route(points=points, speed_limits=[GeoSpecificSpeedLimit(0, 30)])
+
+    expected = Geodesic.WGS84.Inverse(59.8746946, 29.8298710, 59.8743984, 29.8298978)
+    assert route.calculate_distance_to_next_point() == pytest.approx(expected["s12"], abs=0.01)
+    assert route.calculate_remaining_distance_to_next_point(points[0]) == \
+        pytest.approx(expected["s12"], abs=0.01)
+    assert _angle_diff(route.calculate_bearing_to_next_point(points[0]),
+                       expected["azi1"]) < 0.01
+
+
+def test_route_segment_table():
+    """ таблица отрезков: ограничения по waypoint_index, накопленные расстояния и время """
+    points = [GeoPoint(59.0, 30.0), GeoPoint(59.001, 30.0),
+              GeoPoint(59.002, 30.0), GeoPoint(59.003, 30.0)]
+    # ограничения в произвольном порядке, для точки 1 ограничения нет
+    route = Route(points=points, speed_limits=[GeoSpecificSpeedLimit(2, 36),
+                                               GeoSpecificSpeedLimit(0, 72)])
+    first, second, third = route.segments
+
+    assert [s.speed_limit for s in route.segments] == [72, 72, 36]
+    assert second.distance_before_m == pytest.approx(first.length_m)
+    assert third.time_before_sec == pytest.approx(first.length_m / 20 + second.length_m / 20)
+    assert route.total_travel_time_sec == pytest.approx(
+        third.time_before_sec + third.length_m / 10)
+    assert route.calculate_travel_time_to_next_point() == pytest.approx(first.length_m / 20)
+    assert route.calculate_remaining_travel_time(points[0]) == \
+        pytest.approx(route.total_travel_time_sec)
+
+    route.move_to_next_point()
+    assert route.calculate_speed() == 72
+    route.move_to_next_point()
+    assert route.calculate_speed() == 36
+    assert route.calculate_remaining_travel_time(points[2]) == pytest.approx(third.length_m / 10)
+    route.move_to_next_point()
+    assert route.route_finished and route.calculate_speed() == 0.0
+
+
+def test_safety_block_direction_uses_route():
+    """ ограничитель проверяет направление по геодезическому расчёту маршрута """
+    class SafetyBlock(BaseSafetyBlock):
+        """ ограничитель без проверок команд """
+        _set_new_direction = _set_new_speed = _lock_cargo = _release_cargo = \
+            lambda self, _: None
+
+    points = [GeoPoint(59.0, 30.0), GeoPoint(59.0, 30.01)]
+    safety_block = SafetyBlock(QueuesDirectory())
+    safety_block._set_mission(Mission(home=points[0], waypoints=points,
+                                      speed_limits=[GeoSpecificSpeedLimit(0, 30)],
+                                      armed=True))
+    safety_block._set_new_position(GeoPoint(58.999, 30.0))
+
+    expected = Geodesic.WGS84.Inverse(58.999, 30.0, 59.0, 30.01)["azi1"]
+    assert _angle_diff(safety_block._calculate_direction(), expected) < 0.01
@@ -0,0 +1,81 @@
+""" тесты учёта публикаций MQTT """
+import pytest
+
+from src.mqtt_publisher import PublishTracker, PublishTimeoutError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClient:
+    """ клиент paho, выдающий последовательные идентификаторы сообщений """
+    class Info:
+        def __init__(self, mid):
+            self.mid = mid
+            self.rc = 0
+
+    def __init__(self):
+        self.sent = []
+
+    def publish(self, topic, payload, qos=0):
+        self.sent.append((topic, payload, qos))
+        return FakeClient.Info(len(self.sent))
+
+
+def test_pipelined_publish_and_latency():
+    clock = FakeClock()
+    tracker = PublishTracker(max_inflight=10, timeout_sec=5, clock=clock)
+    client = FakeClient()
+    futures = [tracker.publish(client, "api/telemetry", str(i)) for i in range(3)]
+    assert len(client.sent) == 3 and tracker.inflight == 3
+
+    clock.now = 0.25
+    tracker.ack(2)
+    assert futures[1].result(0) == pytest.approx(0.25)
+    assert not futures[0].done()
+    assert tracker.inflight == 2 and tracker.acked == 1
+
+
+def test_ack_before_add():
+    clock = FakeClock()
+    tracker = PublishTracker(clock=clock)
+    tracker.ack(7)
+    assert tracker.add(7).result(0) == 0.0
+    assert tracker.inflight == 0
+
+
+def test_window_and_timeout():
+    clock = FakeClock()
+    tracker = PublishTracker(max_inflight=2, timeout_sec=5, clock=clock)
+    client = FakeClient()
+    first = tracker.publish(client, "api/telemetry", "1")
+    tracker.publish(client, "api/telemetry", "2")
+    assert not tracker.wait_for_slot(timeout=0)
+
+    clock.now = 5.0
+    assert tracker.wait_for_slot(timeout=0)
+    with pytest.raises(PublishTimeoutError):
+        first.result(0)
+    assert tracker.timed_out == 2 and tracker.inflight == 0
+
+
+def test_expire_without_publish():
+    clock = FakeClock()
+    tracker = PublishTracker(max_inflight=10, timeout_sec=5, clock=clock)
+    future = tracker.publish(FakeClient(), "api/telemetry", "1")
+    lock_held = []
+    future.add_done_callback(lambda _: lock_held.append(tracker._condition._is_owned()))  # pylint: disable=protected-access
+
+    assert tracker.expire() == 0
+    clock.now = 5.0
+    assert tracker.expire() == 1
+    with pytest.raises(PublishTimeoutError):
+        future.result(0)
+    # обработчики завершения вызываются без удержания блокировки учёта
+    assert lock_held == [False]
+    assert tracker.timed_out == 1 and tracker.inflight == 0
@@ -0,0 +1,87 @@
+""" тесты каталога очередей и очереди в разделяемой памяти """
+from multiprocessing import Process
+from queue import Empty
+
+import pytest
+from geopy import Point as GeoPoint
+
+from src.config import CONTROL_SYSTEM_QUEUE_NAME, NAVIGATION_QUEUE_NAME, \
+    SERVOS_QUEUE_NAME, SITL_QUEUE_NAME
+from src.event_types import Event
+from src.mission_type import GeoSpecificSpeedLimit, Mission
+from src.queues_dir import QueuesDirectory, SharedMemoryQueue
+
+
+@pytest.fixture
+def shm_queue():
+    """ очередь в разделяемой памяти с небольшим буфером """
+    queue = SharedMemoryQueue(capacity=1024)
+    yield queue
+    queue.close()
+
+
+def test_hot_events_roundtrip(shm_queue):
+    """ частые события проходят через очередь без искажений """
+    events = [
+        Event(source=NAVIGATION_QUEUE_NAME, destination=CONTROL_SYSTEM_QUEUE_NAME,
+              operation="position_update", parameters=GeoPoint(59.87, 29.83, 0.5)),
+        Event(source=CONTROL_SYSTEM_QUEUE_NAME, destination=SERVOS_QUEUE_NAME,
+              operation="set_speed", parameters=20),
+        Event(source=SERVOS_QUEUE_NAME, destination=SITL_QUEUE_NAME,
+              operation="set_direction", parameters=177.5),
+    ]
+    for event in events:
+        shm_queue.put(event)
+    assert shm_queue.qsize() == 3
+    assert [shm_queue.get_nowait() for _ in events] == events
+    assert shm_queue.empty()
+    with pytest.raises(Empty):
+        shm_queue.get_nowait()
+
+
+def test_other_objects_pickled(shm_queue):
+    """ прочие объекты передаются через pickle """
+    mission = Mission(home=GeoPoint(1, 2), waypoints=[GeoPoint(1, 2), GeoPoint(3, 4)],
+                      speed_limits=[GeoSpecificSpeedLimit(0, 20)], armed=True)
+    event = Event(source="planner", destination="communication",
+                  operation="set_mission", parameters=mission)
+    shm_queue.put(event)
+    assert shm_queue.get_nowait() == event
+
+
+def test_wraparound_and_full(shm_queue):
+    """ запись переходит через конец буфера, переполнение даёт ошибку """
+    for i in range(200):
+        shm_queue.put(i)
+        assert shm_queue.get_nowait() == i
+    with pytest.raises(Exception):
+        for i in range(200):
+            shm_queue.put(i, block=False)
+
+
+def _producer(queue, count):
+    for i in range(count):
+        queue.put(Event(source=SERVOS_QUEUE_NAME, destination=SITL_QUEUE_NAME,
+                        operation="set_speed", parameters=float(i)))
+
+
+def test_cross_process_blocking_get():
+    """ читатель засыпает и просыпается по записи из другого процесса """
+    queue = SharedMemoryQueue(capacity=4096)
+    producer = Process(target=_producer, args=(queue, 500))
+    producer.start()
+    received = [queue.get(timeout=5).parameters for _ in range(500)]
+    producer.join()
+    queue.close()
+    assert received == [float(i) for i in range(500)]
+
+
+def test_transport_selected_by_name():
+    """ каталог создаёт очередь выбранной для имени реализации """
+    queues_dir = QueuesDirectory(transports={SITL_QUEUE_NAME: SharedMemoryQueue})
+    sitl_q = queues_dir.create_queue(SITL_QUEUE_NAME)
+    servos_q = queues_dir.create_queue(SERVOS_QUEUE_NAME)
+    assert isinstance(sitl_q, SharedMemoryQueue)
+    assert not isinstance(servos_q, SharedMemoryQueue)
+    assert queues_dir.get_queue(SITL_QUEUE_NAME) is sitl_q
+    queues_dir.close()
@@ -0,0 +1,102 @@
+""" тесты пошаговой симуляции в виртуальном времени """
+from queue import SimpleQueue
+from time import monotonic
+
+import pytest
+from geopy import Point as GeoPoint
+
+from src.cargo_bay import CargoBay
+from src.communication_gateway import BaseCommunicationGateway
+from src.config import CARGO_BAY_QUEUE_NAME, CONTROL_SYSTEM_QUEUE_NAME, \
+    SERVOS_QUEUE_NAME, LOG_ERROR
+from src.control_system import BaseControlSystem
+from src.event_types import Event
+from src.mission_planner import MissionPlanner
+from src.mission_type import GeoSpecificSpeedLimit, Mission
+from src.navigation_system import BaseNavigationSystem
+from src.queues_dir import QueuesDirectory
+from src.servos import Servos
+from src.sim_clock import VirtualClock
+from src.sitl import SITL
+from src.system_wrapper import SystemComponentsContainer
+
+
+class CommunicationGateway(BaseCommunicationGateway):
+    """ шлюз, передающий задание в систему управления """
+    def _send_mission_to_consumers(self):
+        self._queues_dir.get_queue(CONTROL_SYSTEM_QUEUE_NAME).put(
+            Event(self.event_source_name, CONTROL_SYSTEM_QUEUE_NAME, "set_mission", self._mission))
+
+
+class NavigationSystem(BaseNavigationSystem):
+    """ навигация, передающая координаты в систему управления """
+    def _send_position_to_consumers(self):
+        self._queues_dir.get_queue(CONTROL_SYSTEM_QUEUE_NAME).put(
+            Event(self.event_source_name, CONTROL_SYSTEM_QUEUE_NAME,
+                  "position_update", self._position))
+
+
+class ControlSystem(BaseControlSystem):
+    """ система управления без монитора безопасности """
+    def _send_speed_and_direction_to_consumers(self, speed, direction):
+        servos_q = self._queues_dir.get_queue(SERVOS_QUEUE_NAME)
+        servos_q.put(Event(self.event_source_name, SERVOS_QUEUE_NAME, "set_speed", speed))
+        servos_q.put(Event(self.event_source_name, SERVOS_QUEUE_NAME, "set_direction", direction))
+
+    def _send_cargo_command(self, operation):
+        self._queues_dir.get_queue(CARGO_BAY_QUEUE_NAME).put(
+            Event(self.event_source_name, CARGO_BAY_QUEUE_NAME, operation, None))
+
+    def _lock_cargo(self):
+        self._send_cargo_command("lock_cargo")
+
+    def _release_cargo(self):
+        self._send_cargo_command("release_cargo")
+
+
+def run_mission():
+    """ прогон миссии из двух сегментов, возвращает время и конечное положение """
+    home = GeoPoint(59.8746946570238379, 29.8298710584640503)
+    waypoints = [home, GeoPoint(59.8743984958028932, 29.8298978805541992),
+                 GeoPoint(59.8743284958028932, 29.8302978805541992)]
+    mission = Mission(home=home, waypoints=waypoints,
+                      speed_limits=[GeoSpecificSpeedLimit(0, 60), GeoSpecificSpeedLimit(1, 30)],
+                      armed=True)
+
+    queues_dir = QueuesDirectory(default_transport=SimpleQueue)
+    sitl = SITL(queues_dir, position=home, log_level=LOG_ERROR)
+    control = ControlSystem(queues_dir, log_level=LOG_ERROR)
+    cargo = CargoBay(queues_dir, log_level=LOG_ERROR)
+    container = SystemComponentsContainer([
+        sitl, MissionPlanner(queues_dir, mission=mission),
+        CommunicationGateway(queues_dir, log_level=LOG_ERROR), control,
+        NavigationSystem(queues_dir, log_level=LOG_ERROR),
+        Servos(queues_dir, log_level=LOG_ERROR), cargo])
+
+    # pylint: disable=protected-access
+    def route_finished():
+        return control._route is not None and control._route.route_finished
+
+    clock = container.simulate(600, clock=VirtualClock(), until=route_finished)
+    return clock.monotonic(), sitl._position, cargo._is_cargo_released
+
+
+def test_mission_in_virtual_time():
+    """ маршрут проходится в виртуальном времени, быстрее реального и воспроизводимо """
+    started = monotonic()
+    elapsed, position, released = run_mission()
+    wall = monotonic() - started
+
+    assert released
+    assert 1 < elapsed < 60
+    assert wall < elapsed
+    assert run_mission() == (elapsed, position, released)
+
+
+def test_virtual_clock_only_moves_forward():
+    """ виртуальные часы продвигаются только вперёд """
+    clock = VirtualClock(start_time=100.0)
+    clock.advance_to(2.5)
+    assert (clock.monotonic(), clock.time()) == (2.5, 102.5)
+    with pytest.raises(ValueError):
+        clock.advance_to(1.0)
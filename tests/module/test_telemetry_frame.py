@@ -0,0 +1,107 @@
+""" тесты двоичного кадра телеметрии """
+from geopy import Point as GeoPoint
+
+from src.event_types import Event
+from src.sim_clock import VirtualClock
+from src.sitl_mqtt import TelemetrySender
+from src.telemetry_frame import encode_telemetry_frame, decode_telemetry_frame, \
+    encode_telemetry_batch, decode_telemetry_batch
+
+
+def test_roundtrip_and_size():
+    frame = encode_telemetry_frame(
+        "car-1", seq=42, timestamp_ms=1700000000123,
+        latitude=59.9386292, longitude=30.3141308, altitude=12.34,
+        azimuth=359.996, speed=36.5, dop=1.2, sats=12)
+    decoded = decode_telemetry_frame(frame)
+    assert decoded == {
+        "id": "car-1", "seq": 42, "timestamp_ms": 1700000000123,
+        "lat": 599386292, "lon": 303141308, "alt": 1234,
+        "azimuth": 0, "speed": 3650, "dop": 120, "sats": 12}
+
+    legacy = "id=car-1&lat=599386292&lon=303141308&alt=1234&" \
+        "azimuth=3599960000.0&dop=1.2&sats=12&speed=36"
+    assert len(frame) * 2 < len(legacy)
+
+
+def test_foreign_payload():
+    assert decode_telemetry_frame(b"id=car-1&lat=599386292") is None
+    assert decode_telemetry_frame(b"") is None
+
+
+class FakeClient:
+    """ клиент paho, запоминающий отправленные сообщения """
+    class Info:
+        def __init__(self, mid):
+            self.mid = mid
+
+    def __init__(self):
+        self.sent = []
+
+    def publish(self, topic, payload, qos=0):
+        self.sent.append(payload)
+        return FakeClient.Info(len(self.sent))
+
+
+def make_frame(client_id, seq):
+    return encode_telemetry_frame(
+        client_id, seq, timestamp_ms=1700000000000 + seq,
+        latitude=59.9, longitude=30.3, altitude=10.0,
+        azimuth=90.0, speed=20.0, dop=1.2, sats=12)
+
+
+def test_batch_roundtrip():
+    frames = [make_frame("car-1", 1), make_frame("car-1", 2), make_frame("car-22", 3)]
+    batch = encode_telemetry_batch(frames)
+    decoded = decode_telemetry_batch(batch)
+    assert [f["seq"] for f in decoded] == [1, 2, 3]
+    assert decoded[2]["id"] == "car-22"
+    assert len(batch) < sum(len(f) for f in frames) + 4
+
+    assert decode_telemetry_batch(frames[0]) is None
+    assert decode_telemetry_batch(batch[:-1]) is None
+    assert decode_telemetry_batch(batch + b"\x00") is None
+
+
+def test_sender_batches_by_size_and_window(queues_dir):
+    sender = TelemetrySender(queues_dir, client_id="car-1", batch_size=3, batch_window_sec=0.5)
+    # неполный пакет ждёт не дольше окна и одного такта
+    assert sender.tick_interval_sec() == 0.125
+    clock = VirtualClock()
+    sender.attach_clock(clock)
+    client = FakeClient()
+    sender._mqttc = client
+
+    def post():
+        sender._post_telemetry(Event(
+            source="sitl", destination="sitl.telemetry", operation="post_telemetry",
+            parameters=GeoPoint(59.9, 30.3, 0.01), extra_parameters={"bearing": 45, "speed": 30}))
+
+    for _ in range(4):
+        post()
+    assert len(client.sent) == 1
+    assert [f["seq"] for f in decode_telemetry_batch(client.sent[0])] == [1, 2, 3]
+
+    # неполный пакет уходит по истечении окна
+    clock.advance_to(0.4)
+    sender._on_tick()
+    assert len(client.sent) == 1
+    clock.advance_to(0.5)
+    sender._on_tick()
+    assert [f["seq"] for f in decode_telemetry_batch(client.sent[1])] == [4]
+
+
+def test_delivery_log_describes_frames(queues_dir):
+    sender = TelemetrySender(queues_dir, client_id="car-1", batch_size=2)
+    client = FakeClient()
+    sender._mqttc = client
+    logged = []
+    sender._log_message = lambda level, message: logged.append(message)
+
+    for _ in range(2):
+        sender._post_telemetry(Event(
+            source="sitl", destination="sitl.telemetry", operation="post_telemetry",
+            parameters=GeoPoint(59.9, 30.3, 0.01), extra_parameters={"bearing": 45, "speed": 30}))
+    sender._publishes.ack(1)
+    assert logged[-1].startswith(
+        f"отправлена телеметрия: пакет из 2 кадров seq=1..2, {len(client.sent[0])} байт")